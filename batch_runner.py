@@ -0,0 +1,232 @@
+# batch_runner.py
+"""
+Play many local games in parallel to evaluate a change, e.g. 100+ games overnight instead of one at a time.
+
+Games are spread over a map x race x AI build matrix and scheduled on a process pool, each worker runs one game (and so
+one SC2 instance) at a time. Every result is appended to a single json lines file as soon as its game finishes, so an
+interrupted batch keeps everything played so far.
+
+Playing a game goes through a backend, any picklable callable taking a `MatchSpec` and returning a `MatchResult`.
+`Sc2Backend` launches StarCraft II with `MyBot`, `FakeBackend` makes results up so the scheduler can be exercised on
+machines without SC2.
+
+Started from `run.py`: `python run.py --batch --games 100 --concurrency 4 [--backend fake]`
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from itertools import product
+from os import makedirs, path
+from typing import Callable, Optional
+
+from loguru import logger
+from sc2.data import AIBuild, Difficulty, Race
+
+DEFAULT_RACES: tuple[Race, ...] = (Race.Zerg, Race.Terran, Race.Protoss)
+DEFAULT_BUILDS: tuple[AIBuild, ...] = (AIBuild.Rush, AIBuild.Timing, AIBuild.Power, AIBuild.Macro, AIBuild.Air)
+DEFAULT_RESULTS_DIR: str = "data"
+
+
+@dataclass(frozen=True)
+class MatchSpec:
+    """One game of the batch
+
+    Attributes:
+        index: Position in the batch, also seeds the fake backend
+        map_name: Map to play on
+        enemy_race: Race of the built-in AI
+        enemy_build: Build of the built-in AI
+        difficulty: Difficulty of the built-in AI
+    """
+
+    index: int
+    map_name: str
+    enemy_race: Race
+    enemy_build: AIBuild
+    difficulty: Difficulty
+
+
+@dataclass
+class MatchResult:
+    """Outcome of one game, one line of the results file
+
+    Attributes:
+        result: `Result` name from our point of view, or "Crash" when the backend raised
+        duration: Game time in seconds
+        opening: Build order the bot chose
+        wall_time: Real time the game took in seconds
+        error: What went wrong for a crashed game
+    """
+
+    result: str
+    duration: float = 0.0
+    opening: Optional[str] = None
+    wall_time: float = 0.0
+    error: Optional[str] = None
+
+
+def build_matrix(
+    maps: list[str],
+    races: list[Race],
+    builds: list[AIBuild],
+    games: int,
+    difficulty: Difficulty = Difficulty.CheatInsane,
+    seed: Optional[int] = None,
+) -> list[MatchSpec]:
+    """Spread `games` games evenly over every map x race x build combination
+
+    The matrix is shuffled once and then cycled, so a batch cut short still covers the combinations evenly.
+    """
+    combinations = list(product(maps, races, builds))
+    random.Random(seed).shuffle(combinations)
+    return [
+        MatchSpec(index, *combinations[index % len(combinations)], difficulty=difficulty) for index in range(games)
+    ]
+
+
+class Sc2Backend:
+    """Launch StarCraft II and play `MyBot` against the built-in AI"""
+
+    def __init__(self, bot_name: str, race: Race, realtime: bool = False):
+        self.bot_name: str = bot_name
+        self.race: Race = race
+        self.realtime: bool = realtime
+
+    def __call__(self, spec: MatchSpec) -> MatchResult:
+        # imported in the worker, the parent process never needs SC2 or ares
+        from sc2 import maps
+        from sc2.main import run_game
+        from sc2.player import Bot, Computer
+
+        from bot.main import MyBot
+
+        bot = MyBot()
+        result = run_game(
+            maps.get(spec.map_name),
+            [
+                Bot(self.race, bot, self.bot_name),
+                Computer(spec.enemy_race, spec.difficulty, ai_build=spec.enemy_build),
+            ],
+            realtime=self.realtime,
+        )
+        runner = getattr(bot, "build_order_runner", None)
+        return MatchResult(
+            result=result.name,
+            duration=bot.time,
+            opening=runner.chosen_opening if runner else None,
+        )
+
+
+class FakeBackend:
+    """Made up results for exercising the scheduler without SC2, deterministic per game index"""
+
+    def __init__(self, win_rate: float = 0.5, delay: float = 0.1, seed: int = 0):
+        self.win_rate: float = win_rate
+        self.delay: float = delay
+        self.seed: int = seed
+
+    def __call__(self, spec: MatchSpec) -> MatchResult:
+        rng = random.Random(self.seed * 100_003 + spec.index)
+        time.sleep(self.delay * rng.uniform(0.5, 1.5))
+        return MatchResult(
+            result="Victory" if rng.random() < self.win_rate else "Defeat",
+            duration=rng.uniform(180.0, 1200.0),
+            opening=rng.choice(["1GateExpand", "4GateRush"]),
+        )
+
+
+def _play(backend: Callable[[MatchSpec], MatchResult], spec: MatchSpec) -> MatchResult:
+    """Worker entry point, a crash is reported as a result rather than taking the batch down"""
+    start = time.perf_counter()
+    try:
+        match_result = backend(spec)
+    except Exception as error:
+        match_result = MatchResult(result="Crash", error=repr(error))
+    match_result.wall_time = time.perf_counter() - start
+    return match_result
+
+
+def _result_line(spec: MatchSpec, match_result: MatchResult) -> str:
+    return json.dumps(
+        {
+            "index": spec.index,
+            "map": spec.map_name,
+            "enemy_race": spec.enemy_race.name,
+            "enemy_build": spec.enemy_build.name,
+            "difficulty": spec.difficulty.name,
+            **asdict(match_result),
+        }
+    )
+
+
+def run_batch(
+    specs: list[MatchSpec],
+    backend: Callable[[MatchSpec], MatchResult],
+    concurrency: int,
+    results_path: str,
+) -> Counter:
+    """Play every game on a pool of `concurrency` workers, appending each result to `results_path` as it finishes
+
+    Returns the number of games per result.
+    """
+    makedirs(path.dirname(results_path) or ".", exist_ok=True)
+    totals: Counter = Counter()
+    # a fresh process per game: SC2 clients and module level state never leak from one game into the next
+    with ProcessPoolExecutor(
+        max_workers=concurrency, mp_context=multiprocessing.get_context("spawn"), max_tasks_per_child=1
+    ) as pool, open(results_path, "a") as results_file:
+        futures = {pool.submit(_play, backend, spec): spec for spec in specs}
+        for future in as_completed(futures):
+            spec = futures[future]
+            match_result = future.result()
+            results_file.write(_result_line(spec, match_result) + "\n")
+            results_file.flush()
+
+            totals[match_result.result] += 1
+            logger.info(
+                f"[{sum(totals.values())}/{len(specs)}] {match_result.result} on {spec.map_name} vs "
+                f"{spec.enemy_race.name} {spec.enemy_build.name} ({match_result.duration:.0f}s)"
+            )
+    return totals
+
+
+def main(argv: list[str], map_list: list[str], bot_name: str, race: Race) -> None:
+    """Parse the batch options following `--batch` on the `run.py` command line and play the batch"""
+    parser = argparse.ArgumentParser(prog="run.py --batch", description="Play many local games in parallel")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=2, help="games played at the same time")
+    parser.add_argument("--maps", nargs="+", default=map_list)
+    parser.add_argument("--races", nargs="+", default=[r.name for r in DEFAULT_RACES], choices=[r.name for r in Race])
+    parser.add_argument(
+        "--builds", nargs="+", default=[b.name for b in DEFAULT_BUILDS], choices=[b.name for b in AIBuild]
+    )
+    parser.add_argument("--difficulty", default=Difficulty.CheatInsane.name, choices=[d.name for d in Difficulty])
+    parser.add_argument("--results", help="json lines file the results are appended to")
+    parser.add_argument("--backend", default="sc2", choices=["sc2", "fake"])
+    parser.add_argument("--seed", type=int, help="seed of the matrix shuffle")
+    args = parser.parse_args(argv)
+
+    specs = build_matrix(
+        args.maps,
+        [Race[name] for name in args.races],
+        [AIBuild[name] for name in args.builds],
+        args.games,
+        Difficulty[args.difficulty],
+        args.seed,
+    )
+    backend = FakeBackend(seed=args.seed or 0) if args.backend == "fake" else Sc2Backend(bot_name, race)
+    results_path = args.results or path.join(DEFAULT_RESULTS_DIR, f"batch-{int(time.time())}.jsonl")
+
+    logger.info(f"Playing {len(specs)} games, {args.concurrency} at a time, results in {results_path}")
+    totals = run_batch(specs, backend, args.concurrency, results_path)
+    played = sum(totals.values())
+    logger.info(
+        f"Batch done: {totals['Victory']}/{played} won"
+        + "".join(f", {count} {result}" for result, count in totals.items() if result != "Victory")
+    )
@@ -0,0 +1,271 @@
+# action_coalescer.py
+"""
+Frame level coalescing of unit commands. Everything the bot orders during a step, through `unit(...)` / `ai.do` as well
+as `ai.give_same_action`, is collected here instead of being sent as issued:
+
+- Commands for the same unit from different behaviors are resolved by the priority of the behavior that issued them,
+  so a unit kept safe this frame is not also a-moved back into the fight by a group behavior registered later. On equal
+  priority the later command wins, as it would in game.
+- Commands with the same (ability, target, queue) are merged into one raw action carrying every unit tag, whatever
+  order they were issued in, and sent in a single `RequestAction` at the end of the step.
+
+Queued commands keep their order per unit, the n-th command of every unit is sent before any (n+1)-th. Immediate
+commands are also handed to the `CommandMemory` if one is given, so group behaviors can tell on later frames which
+orders are already playing out.
+"""
+
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Union
+
+from s2clientprotocol import raw_pb2, sc2api_pb2
+from sc2.constants import COMBINEABLE_ABILITIES
+from sc2.ids.ability_id import AbilityId
+from sc2.position import Point2
+from sc2.unit import Unit
+from sc2.unit_command import UnitCommand
+
+from ares.behaviors.combat.group import AMoveGroup, KeepGroupSafe, PathGroupToTarget, StutterGroupBack
+from ares.behaviors.combat.individual import (
+    AMove,
+    AttackTarget,
+    KeepUnitSafe,
+    PathUnitToTarget,
+    ShootTargetInRange,
+    StutterUnitBack,
+    WorkerKiteBack,
+)
+
+from bot.combat.avoid_aoe_decision import AvoidAOEDecision
+from bot.combat.burrow_decision import BurrowDecision
+from bot.combat.command_memory import CommandMemory
+from bot.combat.group.group_a_move import GroupAMove
+from bot.combat.group.group_burrow_decision import GroupBurrowDecision
+from bot.combat.group.group_flow_field_move import GroupFlowFieldMove
+from bot.combat.group.group_priority_attack import GroupPriorityAttack
+from bot.combat.group.group_up import GroupUp
+from bot.combat.group.group_worker_kite_back import GroupWorkerKiteBack
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+# Commands issued outside of any behavior, e.g. by managers or the build order
+DEFAULT_PRIORITY: int = 0
+# Higher wins when behaviors command the same unit in one frame, subclasses get the priority of their closest listed
+# base class
+BEHAVIOR_PRIORITY: dict[type, int] = {
+    # staying alive
+    KeepUnitSafe: 40,
+    KeepGroupSafe: 40,
+    AvoidAOEDecision: 40,
+    BurrowDecision: 40,
+    GroupBurrowDecision: 40,
+    WorkerKiteBack: 40,
+    GroupWorkerKiteBack: 40,
+    # micro around targets in range
+    StutterUnitBack: 30,
+    StutterGroupBack: 30,
+    ShootTargetInRange: 30,
+    AttackTarget: 20,
+    GroupPriorityAttack: 20,
+    # moving the army
+    AMove: 10,
+    AMoveGroup: 10,
+    GroupAMove: 10,
+    GroupFlowFieldMove: 10,
+    PathUnitToTarget: 10,
+    PathGroupToTarget: 10,
+    GroupUp: 5,
+}
+
+# (ability, target, queue) with unit targets as their tag
+CommandKey = tuple[AbilityId, Union[Point2, int, None], bool]
+
+
+# behavior class -> priority, resolved through the MRO once per class
+_class_priorities: dict[type, int] = {}
+
+
+def behavior_priority(behavior) -> int:
+    """Priority of a behavior, the micros of a combat maneuver each keep their own, see `ActionCoalescer.issued_by`"""
+    cls = type(behavior)
+    priority = _class_priorities.get(cls)
+    if priority is None:
+        listed = (BEHAVIOR_PRIORITY[base] for base in cls.__mro__ if base in BEHAVIOR_PRIORITY)
+        priority = _class_priorities[cls] = next(listed, DEFAULT_PRIORITY)
+    return priority
+
+
+class ActionCoalescer:
+    """Collect the commands of one frame and send them as one request
+
+    Attributes:
+        priority: Priority given to commands issued now, set while a behavior executes
+        frames: Frames with at least one command sent
+        commands: Unit commands received, one per unit tag
+        commands_dropped: Unit commands overruled by a higher priority behavior or replaced by a later command
+        actions_sent: Raw actions sent after merging
+        bytes_sent: Size of the action requests sent
+        memory: Where the immediate commands sent are remembered, if given
+    """
+
+    def __init__(self, ai: "AresBot", memory: Optional[CommandMemory] = None):
+        self.ai: "AresBot" = ai
+        self.memory: Optional[CommandMemory] = memory
+        self.priority: int = DEFAULT_PRIORITY
+        self.frames: int = 0
+        self.commands: int = 0
+        self.commands_dropped: int = 0
+        self.actions_sent: int = 0
+        self.bytes_sent: int = 0
+
+        # tag -> (priority, commands in the order they are sent)
+        self._commands: dict[int, tuple[int, list[CommandKey]]] = {}
+
+    @contextmanager
+    def issued_by(self, behavior) -> Iterator[None]:
+        """Give the commands issued inside this block the priority of `behavior`
+
+        The micros of a combat maneuver give their commands their own priority, so an `AMove` after a `KeepUnitSafe`
+        in one maneuver does not overrule the dodges of other behaviors.
+        """
+        self._tag_micros(behavior)
+        previous = self.priority
+        self.priority = behavior_priority(behavior)
+        try:
+            yield
+        finally:
+            self.priority = previous
+
+    def _tag_micros(self, behavior) -> None:
+        """Run every micro of a combat maneuver, nested ones too, under its own priority
+
+        The `execute` of each micro instance is wrapped, once: like ares intends, maneuvers and their micros are built
+        fresh every frame, a micro instance is never shared between coalescers or reused with another priority.
+        """
+        for micro in getattr(behavior, "micros", None) or []:
+            self._tag_micros(micro)
+            execute = micro.execute
+            if getattr(execute, "coalesced", False):
+                continue
+
+            def tagged(
+                ai: "AresBot", config: dict, mediator, priority: int = behavior_priority(micro), execute=execute
+            ) -> bool:
+                previous, self.priority = self.priority, priority
+                try:
+                    return execute(ai, config, mediator)
+                finally:
+                    self.priority = previous
+
+            tagged.coalesced = True
+            micro.execute = tagged
+
+    def add(self, command: UnitCommand) -> None:
+        """A command issued through `unit(...)` or `ai.do`"""
+        target = command.target.tag if isinstance(command.target, Unit) else command.target
+        self._add(command.unit.tag, (command.ability, target, command.queue))
+
+    def add_same(
+        self,
+        ability: AbilityId,
+        unit_tags: Iterable[int],
+        target: Optional[Union[Point2, Unit, int]] = None,
+        queue: bool = False,
+    ) -> None:
+        """A command issued through `ai.give_same_action`"""
+        if isinstance(target, Unit):
+            target = target.tag
+        key: CommandKey = (ability, target, queue)
+        received = self.ai.unit_tags_received_action
+        for tag in unit_tags:
+            self._add(tag, key)
+            received.add(tag)
+
+    def _add(self, tag: int, key: CommandKey) -> None:
+        self.commands += 1
+        priority = self.priority
+        existing = self._commands.get(tag)
+        if existing is None:
+            self._commands[tag] = (priority, [key])
+        elif existing[0] > priority:
+            self.commands_dropped += 1
+        elif key[2] and existing[0] == priority:
+            existing[1].append(key)
+        else:
+            # an immediate command replaces whatever was issued before it, as it does in game
+            self.commands_dropped += len(existing[1])
+            self._commands[tag] = (priority, [key])
+
+    def build_actions(self) -> list[raw_pb2.ActionRaw]:
+        """Merge the commands of this frame into raw actions and forget them"""
+        commands, self._commands = self._commands, {}
+        unit_tag_dict: dict[int, Unit] = self.ai.unit_tag_dict
+        memory = self.memory
+        game_loop: int = self.ai.state.game_loop if memory else 0
+
+        actions: list[raw_pb2.ActionRaw] = []
+        for depth in range(max((len(keys) for _, keys in commands.values()), default=0)):
+            # tags of the n-th command of every unit, grouped by command, in the order first issued
+            groups: dict[CommandKey, list[int]] = {}
+            for tag, (_, keys) in commands.items():
+                if depth >= len(keys):
+                    continue
+                key = keys[depth]
+                unit = unit_tag_dict.get(tag)
+                if unit is None:
+                    continue
+                if not key[2]:
+                    if memory:
+                        memory.record(unit, key[0], key[1], game_loop)
+                    if self._already_doing(unit, key):
+                        continue
+                groups.setdefault(key, []).append(tag)
+
+            for (ability, target, queue), tags in groups.items():
+                if ability in COMBINEABLE_ABILITIES:
+                    actions.append(self._raw_action(ability, target, queue, tags))
+                else:
+                    # e.g. trains and builds, merging them would carry the order out once for the whole group
+                    actions.extend(self._raw_action(ability, target, queue, [tag]) for tag in tags)
+        return actions
+
+    @staticmethod
+    def _already_doing(unit: Unit, key: CommandKey) -> bool:
+        """Same check as `BotAI.prevent_double_actions`, the unit already carries out this exact order"""
+        if not unit.orders:
+            return False
+        order = unit.orders[0]
+        ability, target, _ = key
+        if ability not in {order.ability.id, order.ability.exact_id}:
+            return False
+        if isinstance(target, int):
+            return order.target == target
+        if isinstance(target, Point2) and isinstance(order.target, Point2):
+            return target.x == order.target.x and target.y == order.target.y
+        return False
+
+    @staticmethod
+    def _raw_action(
+        ability: AbilityId, target: Union[Point2, int, None], queue: bool, tags: list[int]
+    ) -> raw_pb2.ActionRaw:
+        command = raw_pb2.ActionRawUnitCommand(ability_id=ability.value, unit_tags=tags, queue_command=queue)
+        if isinstance(target, Point2):
+            command.target_world_space_pos.x = target.x
+            command.target_world_space_pos.y = target.y
+        elif target is not None:
+            command.target_unit_tag = target
+        return raw_pb2.ActionRaw(unit_command=command)
+
+    async def flush(self) -> None:
+        """Send the commands of this frame, call once at the end of the step"""
+        if not self._commands:
+            return
+        actions = self.build_actions()
+        if not actions:
+            return
+
+        request = sc2api_pb2.RequestAction(actions=[sc2api_pb2.Action(action_raw=action) for action in actions])
+        self.frames += 1
+        self.actions_sent += len(actions)
+        self.bytes_sent += request.ByteSize()
+        await self.ai.client._execute(action=request)
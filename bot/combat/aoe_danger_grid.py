@@ -0,0 +1,175 @@
+# aoe_danger_grid.py
+"""
+Danger from area of effect attacks, as grids aligned with the ground and air grids of ares (indexed [x, y]). Active
+effects (storms, biles, nukes, liberator zones, lurker spines) and the threat zones of enemy units (disruptor shots,
+sieged tanks, burrowed widow mines) are stamped into the grids as weighted discs, once per frame for the whole army, so
+each `AvoidAOEDecision` is a lookup at the unit's cell and, only when it is in danger, a search of a small window around
+it for the closest safe cell.
+
+The grids are kept up to date incrementally: each frame the current sources are compared with those of the last frame,
+only the sources that appeared are added and only those that expired or moved are subtracted. Weights are integers so
+overlapping sources add up and cancel out exactly.
+"""
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
+
+import numpy as np
+from sc2.ids.effect_id import EffectId
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.position import Point2
+from sc2.unit import Unit
+from sc2.units import Units
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+# Effects that deal damage right away, always dodged
+LETHAL_DANGER: int = 10
+# Zones that are dangerous to stand in but fine to fight through, e.g. siege tank range
+ZONE_DANGER: int = 1
+# Added to every radius, units are dodged out of the edge and not just the center
+SAFETY_MARGIN: float = 1.0
+# How far from a unit a safe cell is searched for
+SEARCH_RADIUS: int = 8
+
+
+class DangerSource(NamedTuple):
+    """A disc stamped into the grids"""
+
+    x: float
+    y: float
+    radius: float
+    weight: int
+    ground: bool
+    air: bool
+
+
+# effect -> (weight, hits ground, hits air), the radius comes with the effect
+AOE_EFFECTS: dict[Union[EffectId, str], tuple[int, bool, bool]] = {
+    EffectId.PSISTORMPERSISTENT: (LETHAL_DANGER, True, True),
+    EffectId.RAVAGERCORROSIVEBILECP: (LETHAL_DANGER, True, True),
+    EffectId.NUKEPERSISTENT: (LETHAL_DANGER, True, True),
+    EffectId.LIBERATORTARGETMORPHDELAYPERSISTENT: (LETHAL_DANGER, True, False),
+    EffectId.LIBERATORTARGETMORPHPERSISTENT: (LETHAL_DANGER, True, False),
+    EffectId.LURKERMP: (LETHAL_DANGER, True, False),
+    "KD8CHARGE": (LETHAL_DANGER, True, False),
+}
+# enemy unit -> (radius, weight, hits ground, hits air)
+AOE_UNITS: dict[UnitID, tuple[float, int, bool, bool]] = {
+    UnitID.DISRUPTORPHASED: (1.5, LETHAL_DANGER, True, False),
+    UnitID.SIEGETANKSIEGED: (13.0, ZONE_DANGER, True, False),
+    UnitID.WIDOWMINEBURROWED: (5.0, ZONE_DANGER, True, True),
+}
+
+
+def _offsets(radius: int) -> np.ndarray:
+    """Distance of every cell of a (2r+1, 2r+1) window to its center"""
+    span = np.arange(-radius, radius + 1)
+    return np.hypot(span[:, None], span[None, :])
+
+
+SEARCH_DISTANCES: np.ndarray = _offsets(SEARCH_RADIUS)
+
+
+@lru_cache(maxsize=None)
+def disc_mask(reach: float) -> np.ndarray:
+    """Cells of a (2r+1, 2r+1) window within `reach` of its center"""
+    return _offsets(int(np.ceil(reach))) <= reach
+
+
+def stamp_disc(grids: list[np.ndarray], x: float, y: float, reach: float, value: int) -> None:
+    """Add `value` to the cells within `reach` of (x, y) on each grid, clipped to the grid"""
+    disc = disc_mask(reach)
+    half = disc.shape[0] // 2
+    cx, cy = int(x), int(y)
+    width, height = grids[0].shape
+    x0, x1 = max(cx - half, 0), min(cx + half + 1, width)
+    y0, y1 = max(cy - half, 0), min(cy + half + 1, height)
+    if x0 >= x1 or y0 >= y1:
+        return
+    window = disc[x0 - (cx - half) : x1 - (cx - half), y0 - (cy - half) : y1 - (cy - half)]
+    for grid in grids:
+        grid[x0:x1, y0:y1][window] += grid.dtype.type(value)
+
+
+class AoeDangerGrid:
+    """Weighted danger of every cell for ground and air units
+
+    Attributes:
+        ground: Danger of each cell for ground units, indexed [x, y]
+        air: Danger of each cell for flying units, indexed [x, y]
+        stamps: Sources added or removed since the start of the game, how much work the incremental updates did
+    """
+
+    def __init__(self, shape: tuple[int, int]):
+        self.ground: np.ndarray = np.zeros(shape, dtype=np.int16)
+        self.air: np.ndarray = np.zeros(shape, dtype=np.int16)
+        self.stamps: int = 0
+
+        self._sources: dict[tuple, DangerSource] = {}
+
+    def update(self, ai: "AresBot") -> None:
+        """Bring the grids up to date with the effects and enemy units of this frame, call once per frame"""
+        sources: dict[tuple, DangerSource] = {}
+        for effect in ai.state.effects:
+            if not effect.is_enemy or effect.id not in AOE_EFFECTS:
+                continue
+            weight, ground, air = AOE_EFFECTS[effect.id]
+            for position in effect.positions:
+                x, y = round(position.x, 1), round(position.y, 1)
+                sources[(effect.id, x, y)] = DangerSource(x, y, effect.radius, weight, ground, air)
+
+        for unit in ai.enemy_units:
+            if zone := AOE_UNITS.get(unit.type_id):
+                x, y = round(unit.position.x, 1), round(unit.position.y, 1)
+                sources[(unit.tag, x, y)] = DangerSource(x, y, *zone)
+
+        previous = self._sources
+        for key in previous.keys() - sources.keys():
+            self._stamp(previous[key], -1)
+        for key in sources.keys() - previous.keys():
+            self._stamp(sources[key], 1)
+        self._sources = sources
+
+    def _stamp(self, source: DangerSource, sign: int) -> None:
+        grids = [grid for grid, hit in ((self.ground, source.ground), (self.air, source.air)) if hit]
+        if grids:
+            stamp_disc(grids, source.x, source.y, source.radius + SAFETY_MARGIN, sign * source.weight)
+        self.stamps += 1
+
+    def danger_at(self, position: Point2, flying: bool = False) -> int:
+        grid = self.air if flying else self.ground
+        x, y = int(position.x), int(position.y)
+        if 0 <= x < grid.shape[0] and 0 <= y < grid.shape[1]:
+            return int(grid[x, y])
+        return 0
+
+    def in_danger(self, units: Union[Units, list[Unit]], threshold: int = LETHAL_DANGER) -> list[Unit]:
+        """The units standing on a cell at least `threshold` dangerous"""
+        if not self._sources:
+            return []
+        return [unit for unit in units if self.danger_at(unit.position, unit.is_flying) >= threshold]
+
+    def nearest_safe(
+        self, position: Point2, pathing: np.ndarray, threshold: int = LETHAL_DANGER, flying: bool = False
+    ) -> Optional[Point2]:
+        """Center of the closest cell within `SEARCH_RADIUS` below `threshold` and pathable on `pathing`
+
+        `pathing` is an ares grid, the ground or air grid, with non pathable cells at inf.
+        """
+        grid = self.air if flying else self.ground
+        cx, cy = int(position.x), int(position.y)
+        width, height = grid.shape
+        x0, x1 = max(cx - SEARCH_RADIUS, 0), min(cx + SEARCH_RADIUS + 1, width)
+        y0, y1 = max(cy - SEARCH_RADIUS, 0), min(cy + SEARCH_RADIUS + 1, height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+
+        safe = (grid[x0:x1, y0:y1] < threshold) & np.isfinite(pathing[x0:x1, y0:y1])
+        if not safe.any():
+            return None
+        left, bottom = cx - SEARCH_RADIUS, cy - SEARCH_RADIUS
+        distances = np.where(safe, SEARCH_DISTANCES[x0 - left : x1 - left, y0 - bottom : y1 - bottom], np.inf)
+        dx, dy = np.unravel_index(int(distances.argmin()), distances.shape)
+        return Point2((float(x0 + dx) + 0.5, float(y0 + dy) + 0.5))
@@ -1,15 +1,16 @@
 # avoid_aoe_decision.py
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
+import numpy as np
 from ares.behaviors.combat.individual import CombatIndividualBehavior
 from ares.managers.manager_mediator import ManagerMediator
-from ares.consts import UnitTreeQueryType
 from sc2.ids.ability_id import AbilityId
-from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.position import Point2
 from sc2.unit import Unit
-from sc2.units import Units
+
+from bot.combat.aoe_danger_grid import LETHAL_DANGER
 
 if TYPE_CHECKING:
     from ares import AresBot
@@ -18,10 +19,30 @@ if TYPE_CHECKING:
 class AvoidAOEDecision(CombatIndividualBehavior):
     """Avoid Incoming AOE Effects
 
+    Looks the unit up in `ai.aoe_danger`, which is updated once per frame for every effect, and moves it to the closest
+    safe cell when it stands in danger.
+
+    Attributes:
+        unit (Unit): The unit to keep out of AOE.
+        grid (np.ndarray): Ground or air grid of ares matching the unit, safe cells must be pathable on it.
+        threshold (int): Danger to move away from, `LETHAL_DANGER` only dodges damaging effects while `ZONE_DANGER`
+            also keeps out of e.g. siege tank range.
     """
 
+    unit: Unit
+    grid: np.ndarray
+    threshold: int = LETHAL_DANGER
+
     def execute(self, ai: "AresBot", config: dict, mediator: ManagerMediator) -> bool:
         """Execute the Avoid AOE macro behavior."""
+        danger = ai.aoe_danger
+        flying: bool = self.unit.is_flying
+        if danger.danger_at(self.unit.position, flying) < self.threshold:
+            return False
+
+        safe: Optional[Point2] = danger.nearest_safe(self.unit.position, self.grid, self.threshold, flying)
+        if safe is None:
+            return False
 
-        # TODO: implement this
-        return False
+        self.unit(AbilityId.MOVE_MOVE, safe)
+        return True
@@ -0,0 +1,207 @@
+# base_ownership.py
+"""
+Which of our bases each cell of the map belongs to, by ground distance, so the enemies threatening each base can be
+totalled for all bases at once: their cells are gathered from the ownership grid and their supply summed per base with
+one `np.bincount`.
+
+A ground distance field is computed from every expansion location once per map, in a worker thread awaited by an
+asyncio task started in `on_start` so the game keeps stepping meanwhile, and cached on disk per map so later games on
+the same map load it instantly. When we take or lose a base the ownership grid is rebuilt from the fields of the bases
+we own, cells further than `DEFENSE_DISTANCE` from all of them belong to no base. Grids are indexed [x, y] like the
+grids of ares.
+"""
+
+import asyncio
+import hashlib
+from os import makedirs, path
+from typing import TYPE_CHECKING, Optional, Union
+
+import numpy as np
+from loguru import logger
+from sc2.position import Point2
+from sc2.unit import Unit
+from sc2.units import Units
+
+from bot.combat.base_threat_index import TOWNHALL_TYPES
+from bot.pathing.distance_field import relax
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+DEFAULT_CACHE_DIR: str = "data/base_ownership"
+# bump when the way the fields are computed changes, old cache files are then ignored
+# 2: fields of version 1 leaked through walls one or two cells thick
+FIELDS_VERSION: int = 2
+
+# Enemies further than this ground distance from every base we own threaten none of them
+DEFENSE_DISTANCE: float = 30.0
+# Cleared around expansion locations before computing the fields, the static pathing grid may block them
+SOURCE_CLEARANCE: int = 3
+# Relaxation rounds between two checks for a field that stopped changing
+RELAX_ROUNDS: int = 64
+# Owner of cells that belong to no base
+NO_BASE: int = -1
+
+
+class BaseOwnership:
+    """Ground distance fields of the expansions and the ownership grid of our bases
+
+    Attributes:
+        cache_dir: Where fields are cached, one file per map
+        ready: Whether the fields are computed or loaded, no base owns any cell until then
+        expansions: Expansion locations, in the order of `fields`
+        fields: Ground distance of each cell to each expansion location, shape (expansions, x, y)
+        bases: Tags of the townhalls we own, in the order of the owner indices
+        owner: Index into `bases` of the base each cell belongs to, `NO_BASE` for none, indexed [x, y]
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir: str = cache_dir
+        self.ready: bool = False
+        self.expansions: list[Point2] = []
+        self.fields: Optional[np.ndarray] = None
+        self.bases: list[int] = []
+        self.owner: Optional[np.ndarray] = None
+
+        # townhall tag -> index of its expansion in `expansions`
+        self._base_expansions: dict[int, int] = {}
+
+    @staticmethod
+    def map_key(ai: "AresBot") -> str:
+        """Identifies the map layout and its expansion locations, the fields depend on nothing else"""
+        digest = hashlib.sha1()
+        digest.update(f"{FIELDS_VERSION}:{ai.game_info.map_name}:{sorted(ai.expansion_locations_list)}".encode())
+        digest.update(ai.game_info.pathing_grid.data_numpy.tobytes())
+        return digest.hexdigest()
+
+    def start(self, ai: "AresBot") -> asyncio.Task:
+        """Load or compute the fields of every expansion location in a background task"""
+        self.expansions = sorted(ai.expansion_locations_list)
+        pathable = ai.game_info.pathing_grid.data_numpy.T.astype(bool)
+        task = asyncio.create_task(self.build(self.map_key(ai), pathable))
+        task.add_done_callback(self._built)
+        return task
+
+    async def build(self, key: str, pathable: np.ndarray) -> None:
+        file_path = path.join(self.cache_dir, f"{key}.npy")
+        if not self._load(file_path):
+            # CPU bound, computed in the default executor so the game keeps stepping on the event loop meanwhile
+            self.fields = await asyncio.get_running_loop().run_in_executor(
+                None, _expansion_fields, self.expansions, pathable
+            )
+            self._save(file_path)
+
+        self.ready = True
+        self._update_owner()
+
+    def add(self, unit: Unit) -> None:
+        """Own the base of a finished townhall, other structures are ignored"""
+        if unit.type_id not in TOWNHALL_TYPES or not unit.is_ready or unit.tag in self._base_expansions:
+            return
+        if not self.expansions:
+            return
+
+        distances = [unit.distance_to(point) for point in self.expansions]
+        self._base_expansions[unit.tag] = int(np.argmin(distances))
+        self._update_owner()
+
+    def remove(self, tag: int) -> None:
+        """Stop owning the base of a destroyed townhall, safe to call with any tag"""
+        if self._base_expansions.pop(tag, None) is not None:
+            self._update_owner()
+
+    def threats(self, units: Union[Units, list[Unit]], weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Total weight of the units in each base and their center, in the order of `bases`
+
+        Centers of bases without units are nan.
+        """
+        count = len(self.bases)
+        if not units or self.owner is None or count == 0:
+            return np.zeros(count), np.full((count, 2), np.nan)
+
+        positions = np.fromiter(
+            (coordinate for unit in units for coordinate in unit.position), dtype=np.float64, count=2 * len(units)
+        ).reshape(-1, 2)
+        owners = self.owner[self._cells(positions)]
+        inside = owners != NO_BASE
+        owners, positions, weights = owners[inside], positions[inside], weights[inside]
+
+        totals = np.bincount(owners, weights=weights, minlength=count)
+        counts = np.bincount(owners, minlength=count)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            centers = np.stack(
+                [
+                    np.bincount(owners, weights=positions[:, 0], minlength=count) / counts,
+                    np.bincount(owners, weights=positions[:, 1], minlength=count) / counts,
+                ],
+                axis=1,
+            )
+        return totals, centers
+
+    def distances_to(self, base_index: int, positions: np.ndarray) -> np.ndarray:
+        """Ground distance of each (x, y) row of `positions` to the base at `base_index` of `bases`"""
+        field = self.fields[self._base_expansions[self.bases[base_index]]]
+        return field[self._cells(positions)]
+
+    def _cells(self, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        width, height = self.owner.shape
+        return (
+            np.clip(positions[:, 0].astype(np.int64), 0, width - 1),
+            np.clip(positions[:, 1].astype(np.int64), 0, height - 1),
+        )
+
+    def _update_owner(self) -> None:
+        self.bases = list(self._base_expansions)
+        if not self.ready:
+            return
+
+        if not self.bases:
+            self.owner = np.full(self.fields.shape[1:], NO_BASE, dtype=np.int16)
+            return
+        owned = self.fields[[self._base_expansions[tag] for tag in self.bases]]
+        closest = owned.argmin(axis=0).astype(np.int16)
+        self.owner = np.where(owned.min(axis=0) <= DEFENSE_DISTANCE, closest, np.int16(NO_BASE))
+
+    @staticmethod
+    def _built(task: asyncio.Task) -> None:
+        """Nothing awaits the task, its errors are logged here"""
+        if not task.cancelled() and (error := task.exception()) is not None:
+            logger.opt(exception=error).error("Could not build the base ownership fields, bases will not be defended")
+
+    def _load(self, file_path: str) -> bool:
+        if not path.isfile(file_path):
+            return False
+        try:
+            fields = np.load(file_path)
+        except (OSError, ValueError):
+            return False
+        if fields.shape[0] != len(self.expansions):
+            return False
+        self.fields = fields
+        return True
+
+    def _save(self, file_path: str) -> None:
+        try:
+            makedirs(self.cache_dir, exist_ok=True)
+            np.save(file_path, self.fields)
+        except OSError as error:
+            logger.warning(f"Could not cache the base ownership fields: {error}")
+
+
+def _expansion_fields(expansions: list[Point2], pathable: np.ndarray) -> np.ndarray:
+    """Ground distance field of every expansion location, run in a worker thread"""
+    pathable = pathable.copy()
+    for point in expansions:
+        x, y = int(point.x), int(point.y)
+        pathable[
+            max(x - SOURCE_CLEARANCE, 0) : x + SOURCE_CLEARANCE + 1,
+            max(y - SOURCE_CLEARANCE, 0) : y + SOURCE_CLEARANCE + 1,
+        ] = True
+
+    costs = np.where(pathable, np.float32(1.0), np.float32(np.inf))
+    fields = np.full((len(expansions), *pathable.shape), np.inf, dtype=np.float32)
+    for i, point in enumerate(expansions):
+        fields[i, int(point.x), int(point.y)] = 0.0
+        while relax(fields[i], costs, RELAX_ROUNDS):
+            pass
+    return fields
@@ -0,0 +1,92 @@
+# base_threat_index.py
+"""
+Tracks which of our mineral lines have enemies in them. The center and radius of each mineral line are computed once,
+when its townhall finishes, and every frame all enemy units and all our workers are bucketed to their closest mineral
+line in one vectorized pass, so the cost of a frame no longer grows with one `closer_than` per base and per unit type.
+"""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from sc2.data import Race, race_townhalls
+from sc2.position import Point2
+from sc2.unit import Unit
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+TOWNHALL_TYPES = race_townhalls[Race.Random]
+# Mineral fields this close to a townhall belong to its mineral line
+MINERAL_FIELD_DISTANCE: float = 10.0
+# Added to the spread of the mineral fields, enemies and workers this far past the outermost field still count
+MINERAL_LINE_MARGIN: float = 6.0
+
+
+class BaseThreatIndex:
+    """Enemies and our workers in each mineral line
+
+    Attributes:
+        centers: Center of the mineral line of each tracked townhall, by tag
+        enemies: Enemy units in each threatened mineral line this frame, by townhall tag
+        workers: Our workers in each threatened mineral line this frame, by townhall tag
+    """
+
+    def __init__(self):
+        self.centers: dict[int, Point2] = {}
+        self.enemies: dict[int, list[Unit]] = {}
+        self.workers: dict[int, list[Unit]] = {}
+
+        # row i of the arrays is the mineral line of self._tags[i]
+        self._tags: list[int] = []
+        self._centers: np.ndarray = np.empty((0, 2))
+        self._radii_sq: np.ndarray = np.empty(0)
+
+    def add(self, ai: "AresBot", unit: Unit) -> None:
+        """Track the mineral line of a finished townhall, other structures and bases without minerals are ignored"""
+        if unit.type_id not in TOWNHALL_TYPES or not unit.is_ready or unit.tag in self.centers:
+            return
+
+        mineral_fields = ai.mineral_field.closer_than(MINERAL_FIELD_DISTANCE, unit)
+        if not mineral_fields:
+            return
+
+        center: Point2 = mineral_fields.center
+        spread: float = max(field.distance_to(center) for field in mineral_fields)
+        self.centers[unit.tag] = center
+        self._tags.append(unit.tag)
+        self._centers = np.vstack([self._centers, [center.x, center.y]])
+        self._radii_sq = np.append(self._radii_sq, (spread + MINERAL_LINE_MARGIN) ** 2)
+
+    def remove(self, tag: int) -> None:
+        """Stop tracking a destroyed townhall, safe to call with any tag"""
+        if tag not in self.centers:
+            return
+
+        index = self._tags.index(tag)
+        del self.centers[tag]
+        del self._tags[index]
+        self._centers = np.delete(self._centers, index, axis=0)
+        self._radii_sq = np.delete(self._radii_sq, index)
+
+    def update(self, ai: "AresBot") -> None:
+        """Bucket the enemy units and our workers of this frame to mineral lines, call once per frame"""
+        self.enemies = self._bucket(ai.enemy_units) if self._tags else {}
+        workers = self._bucket(ai.workers) if self.enemies else {}
+        self.workers = {tag: units for tag, units in workers.items() if tag in self.enemies}
+
+    def _bucket(self, units) -> dict[int, list[Unit]]:
+        """The units inside a mineral line, grouped by the townhall tag of their closest mineral line"""
+        if not units:
+            return {}
+
+        positions = np.fromiter(
+            (coordinate for unit in units for coordinate in unit.position), dtype=np.float64, count=2 * len(units)
+        ).reshape(-1, 2)
+        distances_sq = ((positions[:, None, :] - self._centers[None, :, :]) ** 2).sum(axis=2)
+        closest = distances_sq.argmin(axis=1)
+        inside = np.flatnonzero(distances_sq[np.arange(len(positions)), closest] <= self._radii_sq[closest])
+
+        buckets: dict[int, list[Unit]] = {}
+        for i in inside:
+            buckets.setdefault(self._tags[closest[i]], []).append(units[i])
+        return buckets
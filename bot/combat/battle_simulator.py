@@ -0,0 +1,245 @@
+# battle_simulator.py
+"""
+Vectorized fight estimator. Both armies are converted once into NumPy arrays of damage, range, health, shields and
+armor (with upgrades applied) and any number of what-if scenarios, each a subset of the two armies, are resolved
+together as a time stepped simulation. This makes it cheap to compare e.g. the full army, the army without the units
+that are retreating and the army with its reinforcements in a single call.
+
+The model is deliberately simple: every unit that can hit a target type contributes its damage per second against
+that type, damage is focused on the weakest targets first without overkill, and units with less range than the best
+enemy range start contributing after the time needed to close the distance.
+
+Only `AttackManager` uses it so far, and only when `Combat: EngagementEstimator: Simulator` is set in `config.yml`: it
+then simulates a single scenario, the attacking units against the enemies near the attack target, in place of
+`mediator.can_win_fight`. The proxy squads and multi scenario comparisons are not wired in yet.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Union
+
+import numpy as np
+from ares.consts import EngagementResult
+from sc2.constants import TARGET_AIR, TARGET_GROUND
+
+if TYPE_CHECKING:
+    from sc2.unit import Unit
+    from sc2.units import Units
+
+# Damage added per attack for each weapon upgrade level, most units gain 1 per level
+WEAPON_UPGRADE_DAMAGE: float = 1.0
+# Minimum damage of a hit after armor
+MINIMUM_DAMAGE: float = 0.5
+# Speed used to work out how long units with less range take to reach the enemy
+APPROACH_SPEED: float = 3.15
+
+
+@dataclass
+class ArmyArrays:
+    """One army as arrays, one entry per unit
+
+    Attributes:
+        ground_hits: Hits per second against ground targets, 0 if the unit cannot attack ground
+        ground_damage: Damage of each ground hit, upgrades included
+        air_hits: Hits per second against air targets, 0 if the unit cannot attack air
+        air_damage: Damage of each air hit, upgrades included
+        range: Best weapon range
+        health: Current health
+        shields: Current shields
+        armor: Armor, upgrades included
+        is_flying: Whether the unit is hit by anti air weapons instead of anti ground
+    """
+
+    ground_hits: np.ndarray
+    ground_damage: np.ndarray
+    air_hits: np.ndarray
+    air_damage: np.ndarray
+    range: np.ndarray
+    health: np.ndarray
+    shields: np.ndarray
+    armor: np.ndarray
+    is_flying: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.health)
+
+    @classmethod
+    def from_units(cls, units: Union["Units", list["Unit"]]) -> "ArmyArrays":
+        """Convert units to arrays, done once per army and shared by every scenario"""
+        n = len(units)
+        values = np.zeros((9, n), dtype=np.float64)
+        for i, unit in enumerate(units):
+            damage_bonus = unit.attack_upgrade_level * WEAPON_UPGRADE_DAMAGE
+            for weapon in unit._weapons:
+                hits = weapon.attacks / weapon.speed if weapon.speed > 0 else 0.0
+                if weapon.type in TARGET_GROUND and values[0, i] == 0:
+                    values[0, i] = hits
+                    values[1, i] = weapon.damage + damage_bonus
+                if weapon.type in TARGET_AIR and values[2, i] == 0:
+                    values[2, i] = hits
+                    values[3, i] = weapon.damage + damage_bonus
+            values[4, i] = max(unit.ground_range, unit.air_range)
+            values[5, i] = unit.health
+            values[6, i] = unit.shield
+            values[7, i] = unit.armor + unit.armor_upgrade_level
+            values[8, i] = unit.is_flying
+
+        return cls(*values[:8], values[8].astype(bool))
+
+    def concat(self, other: "ArmyArrays") -> "ArmyArrays":
+        """Join two armies, e.g. the current army and its reinforcements"""
+        return ArmyArrays(
+            *(np.concatenate((getattr(self, name), getattr(other, name))) for name in self.__dataclass_fields__)
+        )
+
+
+@dataclass
+class BattleResult:
+    """Outcome of each scenario, every attribute has one entry per scenario
+
+    Attributes:
+        own_survivors: Number of our units left alive
+        enemy_survivors: Number of enemy units left alive
+        own_remaining: Fraction of our total health and shields left
+        enemy_remaining: Fraction of the enemy total health and shields left
+        time_to_kill: Seconds until the enemy army is dead, inf if it survives the simulation
+        time_to_die: Seconds until our army is dead, inf if it survives the simulation
+    """
+
+    own_survivors: np.ndarray
+    enemy_survivors: np.ndarray
+    own_remaining: np.ndarray
+    enemy_remaining: np.ndarray
+    time_to_kill: np.ndarray
+    time_to_die: np.ndarray
+
+    @property
+    def win(self) -> np.ndarray:
+        return self.own_remaining > self.enemy_remaining
+
+    def engagement_result(self, scenario: int = 0) -> EngagementResult:
+        """Map a scenario to the same scale as `mediator.can_win_fight`"""
+        balance = float(self.own_remaining[scenario] - self.enemy_remaining[scenario])
+        return EngagementResult(int(round((balance + 1.0) * 5.0)))
+
+
+def _effective_dps(hits: np.ndarray, damage: np.ndarray, target_armor: float) -> np.ndarray:
+    return hits * np.maximum(damage - target_armor, MINIMUM_DAMAGE)
+
+
+def _apply_focused_damage(hp: np.ndarray, damage: np.ndarray) -> None:
+    """Spread `damage` (per scenario) over the units of `hp` in order without overkill, in place
+
+    `hp` is (scenarios, units) and already ordered weakest first. A unit is killed once the damage covers it and
+    every unit before it, the first unit not covered takes the remainder.
+    """
+    if hp.shape[1]:
+        np.clip(np.cumsum(hp, axis=1) - damage[:, None], 0.0, hp, out=hp)
+
+
+def simulate(
+    own: ArmyArrays,
+    enemy: ArmyArrays,
+    own_masks: Optional[np.ndarray] = None,
+    enemy_masks: Optional[np.ndarray] = None,
+    max_time: float = 30.0,
+    time_step: float = 0.5,
+) -> BattleResult:
+    """Resolve every scenario at once
+
+    Parameters
+    ----------
+    own :
+        Our army, every unit that appears in any scenario
+    enemy :
+        The enemy army, every unit that appears in any scenario
+    own_masks :
+        (scenarios, len(own)) booleans selecting our units taking part in each scenario, all units if None
+    enemy_masks :
+        (scenarios, len(enemy)) booleans selecting the enemy units in each scenario, all units if None
+    max_time :
+        Seconds of fighting to simulate
+    time_step :
+        Length of a simulation step in seconds, smaller is more accurate but slower
+    """
+    if own_masks is None and enemy_masks is None:
+        own_masks = np.ones((1, len(own)), dtype=bool)
+    if own_masks is None:
+        own_masks = np.ones((len(enemy_masks), len(own)), dtype=bool)
+    if enemy_masks is None:
+        enemy_masks = np.ones((len(own_masks), len(enemy)), dtype=bool)
+    own_masks = np.atleast_2d(own_masks)
+    enemy_masks = np.atleast_2d(enemy_masks)
+    scenarios = max(len(own_masks), len(enemy_masks))
+    own_masks = np.broadcast_to(own_masks, (scenarios, len(own)))
+    enemy_masks = np.broadcast_to(enemy_masks, (scenarios, len(enemy)))
+
+    # ground units first then flying units, each weakest first, so the damage against each layer is spread over a
+    # contiguous slice with a single cumsum
+    own_total = own.health + own.shields
+    enemy_total = enemy.health + enemy.shields
+    own_order = np.lexsort((own_total, own.is_flying))
+    enemy_order = np.lexsort((enemy_total, enemy.is_flying))
+    own_ground_count = int((~own.is_flying).sum())
+    enemy_ground_count = int((~enemy.is_flying).sum())
+
+    own_hp = np.where(own_masks[:, own_order], own_total[own_order], 0.0)
+    enemy_hp = np.where(enemy_masks[:, enemy_order], enemy_total[enemy_order], 0.0)
+    own_start = np.maximum(own_hp.sum(axis=1), 1e-9)
+    enemy_start = np.maximum(enemy_hp.sum(axis=1), 1e-9)
+
+    # damage per step of each unit against (ground, air), using the average armor of the other side
+    own_damage = np.stack((
+        _effective_dps(own.ground_hits, own.ground_damage, _mean(enemy.armor[~enemy.is_flying])),
+        _effective_dps(own.air_hits, own.air_damage, _mean(enemy.armor[enemy.is_flying])),
+    ), axis=1)[own_order] * time_step
+    enemy_damage = np.stack((
+        _effective_dps(enemy.ground_hits, enemy.ground_damage, _mean(own.armor[~own.is_flying])),
+        _effective_dps(enemy.air_hits, enemy.air_damage, _mean(own.armor[own.is_flying])),
+    ), axis=1)[enemy_order] * time_step
+
+    # units out ranged by the other side only join once they close the distance
+    own_delay = (np.maximum(_max(enemy.range) - own.range, 0.0) / APPROACH_SPEED)[own_order]
+    enemy_delay = (np.maximum(_max(own.range) - enemy.range, 0.0) / APPROACH_SPEED)[enemy_order]
+
+    time_to_kill = np.full(scenarios, np.inf)
+    time_to_die = np.full(scenarios, np.inf)
+    t = 0.0
+    while t < max_time:
+        own_alive = own_hp > 0.0
+        enemy_alive = enemy_hp > 0.0
+        enemy_dead = ~enemy_alive.any(axis=1)
+        own_dead = ~own_alive.any(axis=1)
+        time_to_kill[enemy_dead & np.isinf(time_to_kill)] = t
+        time_to_die[own_dead & np.isinf(time_to_die)] = t
+
+        # stop as soon as every scenario has a loser
+        if (enemy_dead | own_dead).all():
+            break
+
+        # damage dealt this step against (ground, air), per scenario
+        own_output = (own_alive & (own_delay <= t)) @ own_damage
+        enemy_output = (enemy_alive & (enemy_delay <= t)) @ enemy_damage
+
+        _apply_focused_damage(enemy_hp[:, :enemy_ground_count], own_output[:, 0])
+        _apply_focused_damage(enemy_hp[:, enemy_ground_count:], own_output[:, 1])
+        _apply_focused_damage(own_hp[:, :own_ground_count], enemy_output[:, 0])
+        _apply_focused_damage(own_hp[:, own_ground_count:], enemy_output[:, 1])
+
+        t += time_step
+
+    return BattleResult(
+        own_survivors=(own_hp > 0.0).sum(axis=1),
+        enemy_survivors=(enemy_hp > 0.0).sum(axis=1),
+        own_remaining=own_hp.sum(axis=1) / own_start,
+        enemy_remaining=enemy_hp.sum(axis=1) / enemy_start,
+        time_to_kill=time_to_kill,
+        time_to_die=time_to_die,
+    )
+
+
+def _mean(values: np.ndarray) -> float:
+    return float(values.mean()) if len(values) else 0.0
+
+
+def _max(values: np.ndarray) -> float:
+    return float(values.max()) if len(values) else 0.0
@@ -0,0 +1,164 @@
+# command_memory.py
+"""
+Memory of the last command sent to each of our units, kept across frames. `duplicate_or_similar_order` only looks at
+the current orders of a unit, so a unit that reached its move target (no orders left) or that is shooting at something
+on the way of an attack move (an order on a unit, not on the point) looks like it was never ordered and gets the same
+command again every frame. Group behaviors ask this memory first and skip units whose last command is the same one and
+is still playing out.
+
+Commands are recorded by the action coalescer when they are sent. The memory is kept as parallel numpy arrays, one slot
+per unit, so a group is checked with a few vector operations. Slots are freed when a unit dies or changes role.
+"""
+
+from typing import Union
+
+import numpy as np
+from sc2.ids.ability_id import AbilityId
+from sc2.position import Point2
+from sc2.unit import Unit
+from sc2.units import Units
+
+INITIAL_CAPACITY: int = 256
+GAME_LOOPS_PER_SECOND: float = 22.4
+# A move that takes this much longer than expected is stuck and may be reissued
+ARRIVAL_SLACK: float = 1.5
+ARRIVAL_MARGIN_GAME_LOOPS: int = 22
+# Abilities whose orders may point at another target while the command still plays out, e.g. an attack move shooting
+ACQUIRING_ABILITIES: frozenset[AbilityId] = frozenset({AbilityId.ATTACK, AbilityId.SCAN_MOVE})
+
+
+class CommandMemory:
+    """Last command of each unit, struct of arrays indexed by slot
+
+    Attributes:
+        ability: Ability id of the last command
+        target_x: Target point of the last command, nan when it targeted a unit or nothing
+        target_y: See `target_x`
+        target_tag: Target unit tag of the last command, 0 when it targeted a point or nothing
+        issue_loop: Game loop the command was sent on
+        arrival_loop: Game loop by which the unit should have reached a point target
+        role: Role of the unit when the command was sent, as a small integer code, 0 for no role
+        commands_skipped: Commands group behaviors did not send because of the memory
+    """
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.ability: np.ndarray = np.zeros(capacity, dtype=np.int32)
+        self.target_x: np.ndarray = np.full(capacity, np.nan, dtype=np.float32)
+        self.target_y: np.ndarray = np.full(capacity, np.nan, dtype=np.float32)
+        self.target_tag: np.ndarray = np.zeros(capacity, dtype=np.int64)
+        self.issue_loop: np.ndarray = np.zeros(capacity, dtype=np.int32)
+        self.arrival_loop: np.ndarray = np.zeros(capacity, dtype=np.int32)
+        self.role: np.ndarray = np.zeros(capacity, dtype=np.int16)
+        self.commands_skipped: int = 0
+
+        self._slots: dict[int, int] = {}
+        self._free: list[int] = list(range(capacity - 1, -1, -1))
+        self._role_codes: dict[object, int] = {}
+        # tag -> role code, as of the last `sync_roles`
+        self._roles: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, tag: int) -> bool:
+        return tag in self._slots
+
+    def _grow(self) -> None:
+        capacity = len(self.ability)
+        self.ability = np.concatenate((self.ability, np.zeros(capacity, dtype=np.int32)))
+        self.target_x = np.concatenate((self.target_x, np.full(capacity, np.nan, dtype=np.float32)))
+        self.target_y = np.concatenate((self.target_y, np.full(capacity, np.nan, dtype=np.float32)))
+        self.target_tag = np.concatenate((self.target_tag, np.zeros(capacity, dtype=np.int64)))
+        self.issue_loop = np.concatenate((self.issue_loop, np.zeros(capacity, dtype=np.int32)))
+        self.arrival_loop = np.concatenate((self.arrival_loop, np.zeros(capacity, dtype=np.int32)))
+        self.role = np.concatenate((self.role, np.zeros(capacity, dtype=np.int16)))
+        self._free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def record(
+        self,
+        unit: Unit,
+        ability: AbilityId,
+        target: Union[Point2, int, None],
+        game_loop: int,
+    ) -> None:
+        """Remember the command just sent to `unit`, a unit target is given as its tag"""
+        slot = self._slots.get(unit.tag)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self._slots[unit.tag] = slot
+
+        self.ability[slot] = ability.value
+        self.issue_loop[slot] = game_loop
+        self.role[slot] = self._roles.get(unit.tag, 0)
+        if isinstance(target, Point2):
+            self.target_x[slot] = target.x
+            self.target_y[slot] = target.y
+            self.target_tag[slot] = 0
+            speed = unit.real_speed / GAME_LOOPS_PER_SECOND
+            travel = unit.position.distance_to(target) / speed if speed > 0 else 0.0
+            self.arrival_loop[slot] = game_loop + int(travel * ARRIVAL_SLACK) + ARRIVAL_MARGIN_GAME_LOOPS
+        else:
+            self.target_x[slot] = np.nan
+            self.target_y[slot] = np.nan
+            self.target_tag[slot] = target or 0
+            self.arrival_loop[slot] = game_loop + ARRIVAL_MARGIN_GAME_LOOPS
+
+    def remove(self, tag: int) -> None:
+        """Forget a unit, safe to call with tags that are not remembered"""
+        slot = self._slots.pop(tag, None)
+        if slot is not None:
+            self.ability[slot] = 0
+            self._free.append(slot)
+
+    def sync_roles(self, unit_role_dict: dict[object, set[int]]) -> None:
+        """Forget units whose role changed since their last command, call once per frame with the role dict of ares"""
+        roles: dict[int, int] = {}
+        for unit_role, tags in unit_role_dict.items():
+            code = self._role_codes.setdefault(unit_role, len(self._role_codes) + 1)
+            for tag in tags:
+                roles[tag] = code
+        self._roles = roles
+
+        role = self.role
+        for tag in [tag for tag, slot in self._slots.items() if role[slot] != roles.get(tag, 0)]:
+            self.remove(tag)
+
+    def already_ordered(
+        self,
+        units: Union[Units, list[Unit]],
+        ability: AbilityId,
+        target: Point2,
+        tolerance: float,
+        game_loop: int,
+    ) -> np.ndarray:
+        """Whether each unit's last command is `ability` on `target` (within `tolerance`) and still playing out
+
+        A command still plays out when the unit got to the target, or it has orders and is not overdue for a move,
+        commands that acquire targets on the way (attack move) are never overdue while the unit has orders.
+        """
+        count = len(units)
+        result = np.zeros(count, dtype=bool)
+        slots = np.fromiter((self._slots.get(unit.tag, -1) for unit in units), dtype=np.int64, count=count)
+        known = np.flatnonzero(slots >= 0)
+        if known.size == 0:
+            return result
+
+        known_slots = slots[known]
+        same = (self.ability[known_slots] == ability.value) & (
+            np.hypot(self.target_x[known_slots] - target.x, self.target_y[known_slots] - target.y) <= tolerance
+        )
+        if not same.any():
+            return result
+
+        acquiring = ability in ACQUIRING_ABILITIES
+        tolerance_squared = tolerance * tolerance
+        for index, slot in zip(known[same], known_slots[same]):
+            unit = units[int(index)]
+            if unit.position._distance_squared(target) <= tolerance_squared:
+                result[index] = True
+            elif unit.orders and (acquiring or game_loop <= self.arrival_loop[slot]):
+                result[index] = True
+        self.commands_skipped += int(result.sum())
+        return result
@@ -0,0 +1,64 @@
+# detection_grid.py
+"""
+Cells covered by the known enemy detectors (observers, overseers, ravens, cannons, spores, turrets) and scans, aligned
+with the grids of ares (indexed [x, y]). Kept up to date incrementally the same way as `AoeDangerGrid`: only detectors
+that appeared, moved or disappeared since the last frame are stamped, so asking whether a group of units is detected is
+a single lookup per unit.
+"""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from sc2.ids.effect_id import EffectId
+
+from bot.combat.aoe_danger_grid import stamp_disc
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+# Added to detection ranges, detectors move and units are not points
+DETECTION_MARGIN: float = 1.0
+
+
+class DetectionGrid:
+    """Number of enemy detectors covering each cell
+
+    Attributes:
+        grid: Detector count of each cell, indexed [x, y]
+    """
+
+    def __init__(self, shape: tuple[int, int]):
+        self.grid: np.ndarray = np.zeros(shape, dtype=np.int16)
+
+        # key -> (x, y, reach)
+        self._sources: dict[tuple, tuple[float, float, float]] = {}
+
+    def update(self, ai: "AresBot") -> None:
+        """Bring the grid up to date with the enemy detectors of this frame, call once per frame"""
+        sources: dict[tuple, tuple[float, float, float]] = {}
+        for units in (ai.enemy_units, ai.enemy_structures):
+            for unit in units:
+                if unit.is_detector:
+                    x, y = round(unit.position.x, 1), round(unit.position.y, 1)
+                    sources[(unit.tag, x, y)] = (x, y, unit.detect_range + DETECTION_MARGIN)
+        for effect in ai.state.effects:
+            if effect.is_enemy and effect.id == EffectId.SCANNERSWEEP:
+                for position in effect.positions:
+                    x, y = round(position.x, 1), round(position.y, 1)
+                    sources[(effect.id, x, y)] = (x, y, effect.radius + DETECTION_MARGIN)
+
+        previous = self._sources
+        for key in previous.keys() - sources.keys():
+            stamp_disc([self.grid], *previous[key], -1)
+        for key in sources.keys() - previous.keys():
+            stamp_disc([self.grid], *sources[key], 1)
+        self._sources = sources
+
+    def detected(self, positions: np.ndarray) -> np.ndarray:
+        """Whether each (x, y) row of `positions` is covered by an enemy detector"""
+        if not self._sources or len(positions) == 0:
+            return np.zeros(len(positions), dtype=bool)
+        cells = positions.astype(np.int64)
+        np.clip(cells[:, 0], 0, self.grid.shape[0] - 1, out=cells[:, 0])
+        np.clip(cells[:, 1], 0, self.grid.shape[1] - 1, out=cells[:, 1])
+        return self.grid[cells[:, 0], cells[:, 1]] > 0
@@ -0,0 +1,100 @@
+# engagement_cache.py
+"""
+Cache the result of a fight simulation and only simulate again when either army has meaningfully changed. The
+decision to engage uses hysteresis, once we have committed to a fight a slightly worse prediction does not pull the
+army back, which stops units flipping between attacking and retreating when the prediction sits near the threshold.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Optional, Union
+
+from ares.consts import EngagementResult
+from sc2.unit import Unit
+from sc2.units import Units
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+ArmyFingerprint = tuple[tuple[tuple[int, int], ...], int]
+
+
+def army_fingerprint(units: Union[Units, list[Unit]], hp_bucket_ratio: float = 1.1) -> ArmyFingerprint:
+    """Cheap summary of an army: unit type counts plus the total health and shields in log sized buckets
+
+    Parameters
+    ----------
+    units :
+        The army to summarise
+    hp_bucket_ratio :
+        Each bucket is this much larger than the last, 1.1 means a change of about 10% moves to another bucket
+    """
+    counts: dict[int, int] = {}
+    total: float = 0.0
+    for unit in units:
+        type_value: int = unit.type_id.value
+        counts[type_value] = counts.get(type_value, 0) + 1
+        total += unit.health + unit.shield
+
+    return tuple(sorted(counts.items())), int(math.log(total + 1.0, hp_bucket_ratio))
+
+
+@dataclass
+class EngagementCache:
+    """Cached engagement decision with hysteresis
+
+    Attributes:
+        ttl: Game seconds after which the fight is simulated again even if neither army changed
+        hp_bucket_ratio: See `army_fingerprint`
+        engage_above: Start fighting when the predicted result is better than this
+        retreat_below: Once fighting, only retreat when the predicted result is worse than this
+    """
+
+    ttl: float = 3.0
+    hp_bucket_ratio: float = 1.1
+    engage_above: EngagementResult = EngagementResult.LOSS_MARGINAL
+    retreat_below: EngagementResult = EngagementResult.LOSS_CLOSE
+
+    engaged: bool = False
+    result: Optional[EngagementResult] = None
+    simulations: int = 0
+    _fingerprint: Optional[tuple[ArmyFingerprint, ArmyFingerprint]] = field(default=None, repr=False)
+    _simulated_at: float = field(default=-math.inf, repr=False)
+
+    def should_engage(
+        self,
+        ai: "AresBot",
+        own_units: Units,
+        enemy_units: Units,
+        simulate: Callable[[Units, Units], EngagementResult],
+    ) -> bool:
+        """Whether our units should fight the enemy units
+
+        Parameters
+        ----------
+        ai :
+            Bot object that will be running the game
+        own_units :
+            Our units that would take part in the fight
+        enemy_units :
+            The enemy units we would be fighting
+        simulate :
+            The (expensive) fight prediction, only called when the armies changed or the cached result expired
+        """
+        fingerprint = (
+            army_fingerprint(own_units, self.hp_bucket_ratio),
+            army_fingerprint(enemy_units, self.hp_bucket_ratio),
+        )
+
+        if fingerprint != self._fingerprint or ai.time - self._simulated_at > self.ttl:
+            self.result = simulate(own_units, enemy_units)
+            self.simulations += 1
+            self._fingerprint = fingerprint
+            self._simulated_at = ai.time
+
+        if self.engaged:
+            self.engaged = self.result.value >= self.retreat_below.value
+        else:
+            self.engaged = self.result.value > self.engage_above.value
+
+        return self.engaged
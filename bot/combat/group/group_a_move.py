@@ -20,6 +20,10 @@ from ares.managers.manager_mediator import ManagerMediator
 if TYPE_CHECKING:
     from ares import AresBot
 
+# An earlier attack move this close to the target counts as the same command
+ATTACK_TARGET_TOLERANCE: float = 1.0
+
+
 @dataclass
 class GroupAMove(CombatGroupBehavior):
     """A-Move group to a target.
@@ -36,9 +40,17 @@ class GroupAMove(CombatGroupBehavior):
         if len(self.group) == 0:
             return False
 
+        # units still carrying out the same attack move from an earlier frame are left alone, see `CommandMemory`
+        if isinstance(self.target, Point2):
+            already_ordered = ai.command_memory.already_ordered(
+                self.group, AbilityId.ATTACK, self.target, ATTACK_TARGET_TOLERANCE, ai.state.game_loop
+            )
+        else:
+            already_ordered = [False] * len(self.group)
+
         needs_order : set[int] = set()
-        for unit in self.group:
-            if not self.duplicate_or_similar_order(unit, self.target, AbilityId.ATTACK):
+        for unit, ordered in zip(self.group, already_ordered):
+            if not ordered and not self.duplicate_or_similar_order(unit, self.target, AbilityId.ATTACK):
                 needs_order.add(unit.tag)
 
         if needs_order:
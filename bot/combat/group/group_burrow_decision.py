@@ -0,0 +1,116 @@
+# group_burrow_decision.py
+"""
+Burrow up or down every burrow capable unit of a group in one pass. Detection comes from `ai.detection_grid`, a lookup
+per unit, and the enemies near widow mines from a single batched range query for all mines, so the cost no longer grows
+with one tree query and one filter per unit.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Union
+
+import numpy as np
+from ares.behaviors.combat.group import CombatGroupBehavior
+from ares.consts import UnitTreeQueryType
+from ares.managers.manager_mediator import ManagerMediator
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.ids.upgrade_id import UpgradeId
+from sc2.unit import Unit
+from sc2.units import Units
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+# Zerg units that can burrow once burrow is researched, burrowed or not
+ZERG_BURROW_TYPES: set[UnitID] = {
+    UnitID.DRONE,
+    UnitID.DRONEBURROWED,
+    UnitID.ZERGLING,
+    UnitID.ZERGLINGBURROWED,
+    UnitID.BANELING,
+    UnitID.BANELINGBURROWED,
+    UnitID.ROACH,
+    UnitID.ROACHBURROWED,
+    UnitID.RAVAGER,
+    UnitID.RAVAGERBURROWED,
+    UnitID.HYDRALISK,
+    UnitID.HYDRALISKBURROWED,
+    UnitID.INFESTOR,
+    UnitID.INFESTORBURROWED,
+    UnitID.QUEEN,
+    UnitID.QUEENBURROWED,
+    UnitID.ULTRALISK,
+    UnitID.ULTRALISKBURROWED,
+    UnitID.SWARMHOSTMP,
+    UnitID.SWARMHOSTBURROWEDMP,
+}
+WIDOW_MINE_TYPES: set[UnitID] = {UnitID.WIDOWMINE, UnitID.WIDOWMINEBURROWED}
+# Widow mines burrow once an enemy is this close and unburrow once none is
+MINE_ENEMY_DISTANCE: float = 14.0
+BURROW_AT_HEALTH_PERC: float = 0.3
+UNBURROW_AT_HEALTH_PERC: float = 0.9
+
+
+@dataclass
+class GroupBurrowDecision(CombatGroupBehavior):
+    """Decide burrow up or down for every unit of a group that can burrow
+
+    Zerg units burrow when low on health and not detected, and come back up once healed or when detected. Widow mines
+    burrow when an enemy is close and unburrow when none is, detected or not.
+
+    Attributes:
+        group (list[Unit] | Units): Units we want to control, units that cannot burrow are ignored.
+        burrow_at_health_perc (float): Health percentage at or below which zerg units burrow.
+        unburrow_at_health_perc (float): Health percentage above which burrowed zerg units come back up.
+    """
+
+    group: Union[Units, list[Unit]]
+    burrow_at_health_perc: float = BURROW_AT_HEALTH_PERC
+    unburrow_at_health_perc: float = UNBURROW_AT_HEALTH_PERC
+
+    def execute(self, ai: "AresBot", config: dict, mediator: ManagerMediator) -> bool:
+        burrow_researched: bool = UpgradeId.BURROW in ai.state.upgrades
+        units: list[Unit] = [
+            unit
+            for unit in self.group
+            if unit.type_id in WIDOW_MINE_TYPES or (burrow_researched and unit.type_id in ZERG_BURROW_TYPES)
+        ]
+        if not units:
+            return False
+
+        count = len(units)
+        values = np.array(
+            [
+                (u.position.x, u.position.y, u.health_percentage, u.is_burrowed, u.type_id in WIDOW_MINE_TYPES)
+                for u in units
+            ],
+            dtype=np.float64,
+        ).reshape(count, 5)
+        health = values[:, 2]
+        burrowed = values[:, 3].astype(bool)
+        is_mine = values[:, 4].astype(bool)
+        detected = ai.detection_grid.detected(values[:, :2])
+
+        # a single batched query for every mine
+        enemy_near = np.zeros(count, dtype=bool)
+        mine_indices = np.flatnonzero(is_mine)
+        if mine_indices.size:
+            near_enemy: list[Units] = mediator.get_units_in_range(
+                start_points=[units[i].position for i in mine_indices],
+                distances=MINE_ENEMY_DISTANCE,
+                query_tree=UnitTreeQueryType.AllEnemy,
+            )
+            enemy_near[mine_indices] = [len(enemies) > 0 for enemies in near_enemy]
+
+        down = ~burrowed & np.where(
+            is_mine, enemy_near, (health <= self.burrow_at_health_perc) & ~detected
+        )
+        up = burrowed & np.where(
+            is_mine, ~enemy_near, (health > self.unburrow_at_health_perc) | detected
+        )
+
+        if down.any():
+            ai.give_same_action(AbilityId.BURROWDOWN, [units[i].tag for i in np.flatnonzero(down)])
+        if up.any():
+            ai.give_same_action(AbilityId.BURROWUP, [units[i].tag for i in np.flatnonzero(up)])
+        return bool(down.any() or up.any())
@@ -0,0 +1,75 @@
+# group_flow_field_move.py
+"""
+Attack move a group along the shared flow field toward the attack target. Every ground unit reads its next waypoint
+from `ai.flow_field` at its cell, so the cost per unit is a lookup rather than a path search, and units only get a new
+command once their waypoint moved on.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Union
+
+import numpy as np
+from sc2.ids.ability_id import AbilityId
+from sc2.position import Point2
+from sc2.unit import Unit
+from sc2.units import Units
+
+from ares.behaviors.combat.group.combat_group_behavior import CombatGroupBehavior
+from ares.managers.manager_mediator import ManagerMediator
+
+from bot.pathing.flow_field import LOOKAHEAD_CELLS
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+# Units ordered to a waypoint this close to their new one are left alone
+WAYPOINT_TOLERANCE: float = LOOKAHEAD_CELLS / 2
+
+
+@dataclass
+class GroupFlowFieldMove(CombatGroupBehavior):
+    """A-Move a group to the target of `ai.flow_field` along the field
+
+    Flying units, units the field cannot route and units close to the target attack move straight at it. Does not
+    execute until the first field is ready, nor when the field routes none of the group.
+
+    Attributes:
+        group (list[Unit] | Units): Units we want to control.
+        target (Point2): Where the group is going, the field may still be on its way to a recent target.
+    """
+
+    group: Union[Units, list[Unit]]
+    target: Point2
+
+    def execute(self, ai: "AresBot", config: dict, mediator: ManagerMediator) -> bool:
+        field = ai.flow_field
+        if len(self.group) == 0 or not field.ready:
+            return False
+
+        positions = np.fromiter(
+            (coordinate for unit in self.group for coordinate in unit.position),
+            dtype=np.float64,
+            count=2 * len(self.group),
+        ).reshape(-1, 2)
+        waypoints, remaining = field.waypoints(positions)
+        # cells the field cannot route are at inf, and cells the field starts from lead nowhere but themselves
+        stays = (np.floor(waypoints) == np.floor(positions)).all(axis=1)
+        direct = ~np.isfinite(remaining) | (remaining <= LOOKAHEAD_CELLS) | stays
+
+        routed = False
+        orders: dict[Point2, list[int]] = {}
+        for unit, waypoint, straight in zip(self.group, waypoints.tolist(), direct.tolist()):
+            if straight or unit.is_flying:
+                target = self.target
+            else:
+                target = Point2(waypoint)
+                routed = True
+            if not self.duplicate_or_similar_order(unit, target, AbilityId.ATTACK, WAYPOINT_TOLERANCE**2):
+                orders.setdefault(target, []).append(unit.tag)
+
+        # the field routes no one, leave the group to the next behavior
+        if not routed:
+            return False
+        for target, tags in orders.items():
+            ai.give_same_action(AbilityId.ATTACK, tags, target)
+        return True
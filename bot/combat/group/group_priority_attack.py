@@ -1,36 +1,251 @@
 # group_priority_attack.py
 """
 Sets the Unit to attack a target from a group of targets based on priority and other units in the area
+
+Targets are assigned to the whole group at once with NumPy: distances, ranges and damage are worked out as
+(attackers, targets) matrices, each attacker picks the target it kills fastest weighted by `PRIORITY_ATTACK_ORDER`, and
+the damage expected on each target over the next second is capped at what the target has left so the group spreads out
+instead of overkilling. Attackers that lost their pick to overkill pick again among the targets still alive, a few
+rounds settle a 100 vs 100 fight. Attackers with nothing in range go for the best target they can reach. An attacker
+keeps the target it is already attacking unless another scores `CURRENT_TARGET_BONUS` better, so shifting damage
+estimates do not switch targets mid attack.
 """
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional, Union
 
-from s2clientprotocol.common_pb2 import Point
+import numpy as np
 from sc2.ids.ability_id import AbilityId
-from sc2.position import Point2
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
 from sc2.unit import Unit
 from sc2.units import Units
 
 from ares.behaviors.combat.group import CombatGroupBehavior
 from ares.managers.manager_mediator import ManagerMediator
 
+from bot.combat.battle_simulator import MINIMUM_DAMAGE, ArmyArrays
+
 if TYPE_CHECKING:
     from ares import AresBot
 
+# Enemy types attacked first, most important first
+PRIORITY_ATTACK_ORDER: list[UnitID] = [
+    UnitID.SPINECRAWLER,
+    UnitID.SPINECRAWLERUPROOTED,
+    UnitID.BUNKER,
+    UnitID.PHOTONCANNON,
+    UnitID.QUEEN,
+]
+# Weight added per place in the priority order, the last type listed weighs 1 + PRIORITY_WEIGHT_STEP
+PRIORITY_WEIGHT_STEP: float = 2.0
+# Structures that are not in the priority order only matter once nothing else is left
+STRUCTURE_WEIGHT: float = 0.1
+# Targets this much further than weapon range still count as in range, melee units reach them within the volley
+RANGE_MARGIN: float = 0.75
+# Damage expected from each attacker is what it deals in this many seconds
+EXPECTED_DAMAGE_SECONDS: float = 1.0
+# Rounds of picking again for attackers whose pick is already covered
+ASSIGNMENT_ROUNDS: int = 4
+# Score bonus of the target an attacker is already attacking, it only switches to a target that scores this much better
+CURRENT_TARGET_BONUS: float = 0.25
+
+
+def priority_weights(type_ids: list[UnitID], is_structure: np.ndarray, priority_order: list[UnitID]) -> np.ndarray:
+    """Weight of each target, higher for the types listed first in `priority_order`"""
+    ranks = {type_id: len(priority_order) - i for i, type_id in enumerate(priority_order)}
+    weights = np.array([1.0 + ranks.get(type_id, 0) * PRIORITY_WEIGHT_STEP for type_id in type_ids])
+    listed = np.array([type_id in ranks for type_id in type_ids], dtype=bool)
+    weights[is_structure & ~listed] = STRUCTURE_WEIGHT
+    return weights
+
+
+def assign_targets(
+    attackers: ArmyArrays,
+    attacker_positions: np.ndarray,
+    attacker_ranges: np.ndarray,
+    targets: ArmyArrays,
+    target_positions: np.ndarray,
+    weights: np.ndarray,
+    current: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Target index of each attacker, -1 when it can hit none of the targets
+
+    Parameters
+    ----------
+    attackers :
+        The attacking units
+    attacker_positions :
+        (attackers, 3) x, y and radius of each attacker
+    attacker_ranges :
+        (attackers, 2) ground and air weapon range of each attacker
+    targets :
+        The units that may be attacked
+    target_positions :
+        (targets, 3) x, y and radius of each target
+    weights :
+        (targets,) priority weight of each target, see `priority_weights`
+    current :
+        (attackers,) index of the target each attacker is attacking, -1 for none, kept unless another target scores
+        `CURRENT_TARGET_BONUS` better
+    """
+    n, m = len(attackers), len(targets)
+    assignment = np.full(n, -1, dtype=np.int64)
+    if n == 0 or m == 0:
+        return assignment
+
+    # ground targets then air targets, so each weapon type works on a contiguous block of columns
+    order = np.argsort(targets.is_flying, kind="stable")
+    ground_count = int((~targets.is_flying).sum())
+    target_positions = target_positions[order]
+    armor = targets.armor[order]
+    remaining = (targets.health + targets.shields)[order]
+    weights = weights[order]
+
+    # score multiplier of each (attacker, target), above 1 for the target the attacker is already on
+    sticky = np.ones((n, m))
+    if current is not None:
+        rank = np.empty(m, dtype=np.int64)
+        rank[order] = np.arange(m)
+        on_target = np.flatnonzero(current >= 0)
+        sticky[on_target, rank[current[on_target]]] += CURRENT_TARGET_BONUS
+
+    distance = np.subtract.outer(attacker_positions[:, 0], target_positions[:, 0])
+    distance *= distance
+    dy = np.subtract.outer(attacker_positions[:, 1], target_positions[:, 1])
+    distance += dy * dy
+    np.sqrt(distance, out=distance)
+    distance -= attacker_positions[:, 2, None]
+    distance -= target_positions[None, :, 2]
+
+    expected = np.empty((n, m))
+    in_range = np.empty((n, m), dtype=bool)
+    for columns, hits, damage, ranges in (
+        (slice(0, ground_count), attackers.ground_hits, attackers.ground_damage, attacker_ranges[:, 0]),
+        (slice(ground_count, m), attackers.air_hits, attackers.air_damage, attacker_ranges[:, 1]),
+    ):
+        block = np.subtract.outer(damage, armor[columns])
+        np.maximum(block, MINIMUM_DAMAGE, out=block)
+        block *= (hits * EXPECTED_DAMAGE_SECONDS)[:, None]
+        expected[:, columns] = block
+        np.less_equal(distance[:, columns], (ranges + RANGE_MARGIN)[:, None], out=in_range[:, columns])
+    can_hit = expected > 0
+    in_range &= can_hit
+
+    # kill speed weighted by priority, -inf where the target is out of range
+    score = expected * (weights / np.maximum(remaining, 1.0))[None, :] * sticky
+    score[~in_range] = -np.inf
+
+    open_attackers = in_range.any(axis=1)
+    for _ in range(ASSIGNMENT_ROUNDS):
+        candidates = np.flatnonzero(open_attackers)
+        if candidates.size == 0:
+            break
+        candidate_scores = score[candidates]
+        picks = candidate_scores.argmax(axis=1)
+        has_pick = np.isfinite(candidate_scores[np.arange(candidates.size), picks])
+        candidates, picks = candidates[has_pick], picks[has_pick]
+        if candidates.size == 0:
+            break
+
+        # per target, the biggest hitters first, until the expected damage covers what the target has left
+        pick_damage = expected[candidates, picks]
+        pick_order = np.lexsort((-pick_damage, picks))
+        candidates, picks, pick_damage = candidates[pick_order], picks[pick_order], pick_damage[pick_order]
+        cumulative = np.cumsum(pick_damage)
+        starts = np.searchsorted(picks, picks)
+        before = cumulative - pick_damage - np.where(starts > 0, cumulative[starts - 1], 0.0)
+        accepted = before < remaining[picks]
+
+        assignment[candidates[accepted]] = picks[accepted]
+        open_attackers[candidates[accepted]] = False
+        remaining -= np.bincount(picks[accepted], weights=pick_damage[accepted], minlength=m)
+        # covered targets drop out of the next rounds
+        score[:, remaining <= 0] = -np.inf
+
+    # every target in range is covered, the rest overkill the best of them rather than stand idle
+    leftover = np.flatnonzero(open_attackers)
+    if leftover.size:
+        leftover_scores = expected[leftover] * weights[None, :] * sticky[leftover]
+        leftover_scores[~in_range[leftover]] = -np.inf
+        assignment[leftover] = leftover_scores.argmax(axis=1)
+
+    # nothing in range, go for the most important target, closest first
+    out_of_range = np.flatnonzero((assignment < 0) & can_hit.any(axis=1))
+    if out_of_range.size:
+        reach_score = weights[None, :] / (1.0 + np.maximum(distance[out_of_range], 0.0)) * sticky[out_of_range]
+        reach_score[~can_hit[out_of_range]] = -np.inf
+        assignment[out_of_range] = reach_score.argmax(axis=1)
+
+    # back to the order the targets were given in
+    return np.where(assignment >= 0, order[np.maximum(assignment, 0)], -1)
+
+
+def _positions_and_ranges(units: Union[Units, list[Unit]]) -> tuple[np.ndarray, np.ndarray]:
+    values = np.array(
+        [(u.position.x, u.position.y, u.radius, u.ground_range, u.air_range) for u in units], dtype=np.float64
+    ).reshape(-1, 5)
+    return values[:, :3], values[:, 3:]
+
 
 @dataclass
 class GroupPriorityAttack(CombatGroupBehavior):
     """
     Use the group to attack specific units based on priority and what units can actually be attacked.
+
+    Attributes:
+        forces (Units): Units we want to control.
+        targets (Units): Enemy units and structures that may be attacked.
+        priority_order (list[UnitID]): Enemy types attacked first, `PRIORITY_ATTACK_ORDER` if None.
     """
 
     forces: Units
+    targets: Units
+    priority_order: Optional[list[UnitID]] = None
 
     def execute(self, ai: "AresBot", config: dict, mediator: ManagerMediator) -> bool:
         """Execute the Priority Attack Behavior"""
 
         # If we don't have any forces, do nothing
-        if len(self.forces) == 0:
+        if len(self.forces) == 0 or len(self.targets) == 0:
             return False
 
+        attacker_positions, attacker_ranges = _positions_and_ranges(self.forces)
+        target_positions, _ = _positions_and_ranges(self.targets)
+        weights = priority_weights(
+            [target.type_id for target in self.targets],
+            np.array([target.is_structure for target in self.targets], dtype=bool),
+            PRIORITY_ATTACK_ORDER if self.priority_order is None else self.priority_order,
+        )
+        # the target each attacker is on, so it keeps it unless another one is clearly better
+        target_indices: dict[int, int] = {target.tag: i for i, target in enumerate(self.targets)}
+        current = np.fromiter(
+            (
+                target_indices.get(unit.orders[0].target, -1)
+                if unit.orders and unit.orders[0].ability.id == AbilityId.ATTACK
+                else -1
+                for unit in self.forces
+            ),
+            dtype=np.int64,
+            count=len(self.forces),
+        )
+        assignment = assign_targets(
+            ArmyArrays.from_units(self.forces),
+            attacker_positions,
+            attacker_ranges,
+            ArmyArrays.from_units(self.targets),
+            target_positions,
+            weights,
+            current,
+        )
+
+        # one command per target, for the attackers not already on it
+        orders: dict[int, list[int]] = {}
+        for unit, target_index, current_index in zip(self.forces, assignment.tolist(), current.tolist()):
+            if target_index < 0 or target_index == current_index:
+                continue
+            orders.setdefault(target_index, []).append(unit.tag)
+
+        for target_index, tags in orders.items():
+            ai.give_same_action(AbilityId.ATTACK, tags, self.targets[target_index])
+
+        return bool((assignment >= 0).any())
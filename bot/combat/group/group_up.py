@@ -49,7 +49,13 @@ class GroupUp(CombatGroupBehavior):
         # point3d = Point(x=self.target.x, y=self.target.y, z=ai.get_terrain_height(self.target))
         # ai.client.debug_sphere_out(point3d, radius_needed, Point2((0, 255, 0)))
 
-        for unit in self.group:
+        # units that got there or are still on their way from an earlier frame are left alone, see `CommandMemory`
+        already_ordered = ai.command_memory.already_ordered(
+            self.group, AbilityId.MOVE, self.target, radius_needed, ai.state.game_loop
+        )
+        for unit, ordered in zip(self.group, already_ordered):
+            if ordered:
+                continue
             if not self.duplicate_or_similar_order(unit, self.target, AbilityId.MOVE, radius_needed * radius_needed):
                 command_needed.append(unit.tag)
 
@@ -0,0 +1,49 @@
+# group_worker_kite_back.py
+"""
+Defend a mineral line with its workers
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Union
+
+from sc2.ids.ability_id import AbilityId
+from sc2.unit import Unit
+from sc2.units import Units
+
+from ares.behaviors.combat.group import CombatGroupBehavior
+from ares.managers.manager_mediator import ManagerMediator
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+
+@dataclass
+class GroupWorkerKiteBack(CombatGroupBehavior):
+    """
+    Group version of `WorkerKiteBack`: workers with their weapon ready attack the target, the others mineral walk back
+    to a mineral field, through the enemy units, until their weapon is ready again. Two commands for the whole group
+    instead of one behavior per worker.
+
+    Attributes:
+        group (list[Unit] | Units): Workers we want to control.
+        target (Unit): Enemy unit to attack.
+        mineral_field (Unit): Mineral field to walk back to between attacks.
+    """
+
+    group: Union[Units, list[Unit]]
+    target: Unit
+    mineral_field: Unit
+
+    def execute(self, ai: "AresBot", config: dict, mediator: ManagerMediator) -> bool:
+        """Execute the GroupWorkerKiteBack behavior."""
+        if len(self.group) == 0:
+            return False
+
+        attacking: list[int] = []
+        walking_back: list[int] = []
+        for worker in self.group:
+            (attacking if worker.weapon_cooldown == 0 else walking_back).append(worker.tag)
+
+        ai.give_same_action(AbilityId.ATTACK, attacking, self.target)
+        ai.give_same_action(AbilityId.HARVEST_GATHER, walking_back, self.mineral_field)
+        return True
@@ -0,0 +1,169 @@
+# squad_clusterer.py
+"""
+Groups units into squads that stay the same from one frame to the next. Each frame starts from the squads of the last
+frame: units that stayed within `move_threshold` of where they were last clustered, and within `radius` of their squad,
+keep their squad without being looked at again. Only new units and units that moved are re-clustered: they join the
+closest squad within `radius`, or start new squads among themselves. All distance checks are vectorized.
+
+Squad ids only change when a squad empties, or when it is merged into another squad it drifted onto, so per squad
+behaviors and caches can be kept by squad id.
+"""
+
+from itertools import count
+from typing import Union
+
+import numpy as np
+from sc2.position import Point2
+from sc2.unit import Unit
+from sc2.units import Units
+
+# Units that moved less than this since they were last clustered keep their squad
+MOVE_THRESHOLD: float = 2.0
+# Squads whose centers come this close, as a fraction of the radius, are merged into the oldest of them
+MERGE_FRACTION: float = 0.5
+# Squad of units that are not in one yet
+NO_SQUAD: int = -1
+
+
+class TrackedSquad:
+    """A squad of units, with the attribute names of the squads of ares
+
+    Attributes:
+        squad_id: Stays the same for as long as the squad exists
+        squad_units: Units of the squad this frame
+        squad_position: Center of the squad this frame
+    """
+
+    def __init__(self, squad_id: int, squad_units: list[Unit], squad_position: Point2):
+        self.squad_id: int = squad_id
+        self.squad_units: list[Unit] = squad_units
+        self.squad_position: Point2 = squad_position
+
+
+class SquadClusterer:
+    """Squads of units kept up to date incrementally
+
+    Attributes:
+        radius: How far from the center of its squad a unit may be
+        move_threshold: How far a unit may move before it is re-clustered
+        squads: Squads of the last update, by squad id
+        reclustered: How many units the last update re-clustered
+    """
+
+    def __init__(self, radius: float, move_threshold: float = MOVE_THRESHOLD):
+        self.radius: float = radius
+        self.move_threshold: float = move_threshold
+        self.squads: dict[int, TrackedSquad] = {}
+        self.reclustered: int = 0
+
+        # row of each unit tag in the arrays of the last update: its squad id and where it was when last clustered
+        self._rows: dict[int, int] = {}
+        self._squad: np.ndarray = np.empty(0, dtype=np.int64)
+        self._anchors: np.ndarray = np.empty((0, 2))
+        self._squad_ids = count()
+
+    def update(self, units: Union[Units, list[Unit]]) -> list[TrackedSquad]:
+        """Bring the squads up to date with the positions of `units`, units not given are dropped from their squad"""
+        n = len(units)
+        if n == 0:
+            self.squads, self._rows, self.reclustered = {}, {}, 0
+            return []
+
+        tags: list[int] = [unit.tag for unit in units]
+        positions = np.fromiter(
+            (coordinate for unit in units for coordinate in unit.position), dtype=np.float64, count=2 * n
+        ).reshape(n, 2)
+        rows = np.fromiter((self._rows.get(tag, -1) for tag in tags), dtype=np.int64, count=n)
+        known = rows >= 0
+        squad = np.full(n, NO_SQUAD, dtype=np.int64)
+        squad[known] = self._squad[rows[known]]
+        anchors = np.full((n, 2), np.nan)
+        anchors[known] = self._anchors[rows[known]]
+
+        # nan anchors, new units, compare as moved
+        moved = ~(((positions - anchors) ** 2).sum(axis=1) <= self.move_threshold**2)
+        squad[moved] = NO_SQUAD
+
+        # units that drifted out of their squad are re-clustered as well
+        ids, centers = self._centers(squad, positions)
+        kept = np.flatnonzero(squad != NO_SQUAD)
+        if kept.size:
+            offsets = positions[kept] - centers[np.searchsorted(ids, squad[kept])]
+            drifted = kept[(offsets**2).sum(axis=1) > self.radius**2]
+            if drifted.size:
+                moved[drifted] = True
+                squad[drifted] = NO_SQUAD
+                ids, centers = self._centers(squad, positions)
+
+        reclustered = np.flatnonzero(moved)
+        self.reclustered = int(reclustered.size)
+        if reclustered.size:
+            self._recluster(reclustered, squad, positions, ids, centers)
+        self._merge(squad, positions)
+
+        anchors[reclustered] = positions[reclustered]
+        self._rows = dict(zip(tags, range(n)))
+        self._squad, self._anchors = squad, anchors
+
+        self.squads = self._build_squads(units, squad, positions)
+        return list(self.squads.values())
+
+    def _centers(self, squad: np.ndarray, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Sorted ids of the squads with units and the center of each"""
+        members = squad != NO_SQUAD
+        ids, inverse = np.unique(squad[members], return_inverse=True)
+        if ids.size == 0:
+            return ids, np.empty((0, 2))
+        counts = np.bincount(inverse, minlength=ids.size)
+        centers = np.stack(
+            [
+                np.bincount(inverse, weights=positions[members, 0], minlength=ids.size) / counts,
+                np.bincount(inverse, weights=positions[members, 1], minlength=ids.size) / counts,
+            ],
+            axis=1,
+        )
+        return ids, centers
+
+    def _recluster(
+        self, indices: np.ndarray, squad: np.ndarray, positions: np.ndarray, ids: np.ndarray, centers: np.ndarray
+    ) -> None:
+        """Units at `indices` join the closest squad within the radius, the others start squads among themselves"""
+        radius_sq = self.radius**2
+        if ids.size:
+            distances_sq = ((positions[indices, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+            closest = distances_sq.argmin(axis=1)
+            joins = distances_sq[np.arange(indices.size), closest] <= radius_sq
+            squad[indices[joins]] = ids[closest[joins]]
+            indices = indices[~joins]
+
+        # the first unit left leads a new squad of every unit left within the radius of it
+        while indices.size:
+            close = ((positions[indices] - positions[indices[0]]) ** 2).sum(axis=1) <= radius_sq
+            squad[indices[close]] = next(self._squad_ids)
+            indices = indices[~close]
+
+    def _merge(self, squad: np.ndarray, positions: np.ndarray) -> None:
+        """Merge squads whose centers are within `MERGE_FRACTION` of the radius into the oldest of them"""
+        ids, centers = self._centers(squad, positions)
+        if ids.size < 2:
+            return
+
+        close = ((centers[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2) <= (self.radius * MERGE_FRACTION) ** 2
+        # ids are sorted, the oldest squad close to each squad is the first True of its row
+        into = ids[close.argmax(axis=1)]
+        if (into != ids).any():
+            squad[:] = into[np.searchsorted(ids, squad)]
+
+    def _build_squads(
+        self, units: Union[Units, list[Unit]], squad: np.ndarray, positions: np.ndarray
+    ) -> dict[int, TrackedSquad]:
+        ids, centers = self._centers(squad, positions)
+        members: dict[int, list[Unit]] = {int(squad_id): [] for squad_id in ids}
+        for unit, squad_id in zip(units, squad.tolist()):
+            members[squad_id].append(unit)
+        return {
+            int(squad_id): TrackedSquad(
+                int(squad_id), members[int(squad_id)], Point2((float(center[0]), float(center[1])))
+            )
+            for squad_id, center in zip(ids, centers)
+        }
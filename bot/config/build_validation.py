@@ -0,0 +1,85 @@
+# build_validation.py
+"""
+Validation of the builds files the bot is configured with (`<race>_builds.yml`).
+
+`scripts/validate_builds.py` checks the supply, command and target of every `OpeningBuildOrder` step and that every
+`Cycle` entry names a build, so an invalid build is reported before a game instead of when the build order reaches the
+bad step. Nothing is cached: ares reads `<race>_builds.yml` itself and parses the chosen opening into steps holding
+closures over the live bot.
+"""
+
+import re
+from typing import Any
+
+import yaml
+
+BUILDS: str = "Builds"
+BUILD_CHOICES: str = "BuildChoices"
+CYCLE: str = "Cycle"
+OPENING_BUILD_ORDER: str = "OpeningBuildOrder"
+
+# "13 pylon @ nat_wall", "20 nexus", "22 adept x2", "15 worker_scout" (targets are then listed under the step)
+STEP_PATTERN: re.Pattern = re.compile(
+    r"^(?P<supply>\d+)\s+(?P<command>\w+)(?:\s+x(?P<count>\d+))?(?:\s*@\s*(?P<target>\w+))?$"
+)
+
+
+class InvalidBuildError(ValueError):
+    """Raised when a builds file does not validate, with one line per problem"""
+
+    def __init__(self, file_path: str, errors: list[str]):
+        super().__init__(f"{file_path} has invalid builds:\n" + "\n".join(f"  {error}" for error in errors))
+        self.errors: list[str] = errors
+
+
+def validate_file(file_path: str) -> None:
+    """Parse and validate the builds file at `file_path`, raises `InvalidBuildError` listing every problem"""
+    with open(file_path) as f:
+        content: dict = yaml.safe_load(f) or {}
+    errors = validate_builds(content)
+    if errors:
+        raise InvalidBuildError(file_path, errors)
+
+
+def validate_builds(content: dict) -> list[str]:
+    """Every problem found in the `Builds` and `BuildChoices` of a builds file"""
+    # the step vocabulary comes from ares and python-sc2, only needed when validating
+    from ares.consts import BuildOrderOptions, BuildOrderTargetOptions
+    from sc2.ids.unit_typeid import UnitTypeId
+    from sc2.ids.upgrade_id import UpgradeId
+
+    commands: set[str] = {*BuildOrderOptions.__members__, *UnitTypeId.__members__, *UpgradeId.__members__}
+    targets: set[str] = {*BuildOrderTargetOptions.__members__, *UnitTypeId.__members__}
+
+    errors: list[str] = []
+    builds: Any = content.get(BUILDS) or {}
+    if not isinstance(builds, dict):
+        return [f"{BUILDS} should map build names to builds"]
+
+    for name, build in builds.items():
+        steps = build.get(OPENING_BUILD_ORDER) if isinstance(build, dict) else None
+        if not isinstance(steps, list) or not steps:
+            errors.append(f"{name}: {OPENING_BUILD_ORDER} should be a non empty list")
+            continue
+        for index, step in enumerate(steps):
+            step_targets: list = []
+            if isinstance(step, dict) and len(step) == 1:
+                ((step, step_targets),) = step.items()
+                if not isinstance(step_targets, list):
+                    step_targets = [step_targets]
+            if not isinstance(step, str) or not (match := STEP_PATTERN.match(step.strip())):
+                errors.append(
+                    f"{name} step {index + 1}: can't parse {step!r}, expected `<supply> <command> [@ target]`"
+                )
+                continue
+            if match["command"].upper() not in commands:
+                errors.append(f"{name} step {index + 1}: unknown command {match['command']!r}")
+            for target in ([match["target"]] if match["target"] else []) + step_targets:
+                if str(target).upper() not in targets:
+                    errors.append(f"{name} step {index + 1}: unknown target {target!r}")
+
+    for opponent, choice in (content.get(BUILD_CHOICES) or {}).items():
+        for build_name in (choice or {}).get(CYCLE) or []:
+            if build_name not in builds:
+                errors.append(f"{BUILD_CHOICES} {opponent}: {build_name!r} is not in {BUILDS}")
+    return errors
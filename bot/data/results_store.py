@@ -0,0 +1,158 @@
+# results_store.py
+"""
+Opening history per opponent, kept in one SQLite database instead of the json file per opponent ares writes when
+`UseData` is set. Those files are read and rewritten in full every game, so start up and shut down grow with the
+number of games played against an opponent.
+
+Here every game is a single insert. A summary row per (opponent, race, build) is updated in the same transaction, so
+choosing the next opening at start up is an index lookup no matter how many games were played. Existing json files
+found in the data directory are imported once.
+"""
+
+import json
+import sqlite3
+import time
+from os import makedirs, path
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from loguru import logger
+from sc2.data import Race, Result
+
+RESULTS_STORE: str = "ResultsStore"
+RESULTS_STORE_PATH: str = "Path"
+BUILD_CHOICES: str = "BuildChoices"
+CYCLE: str = "Cycle"
+
+DEFAULT_PATH: str = "data/results.sqlite3"
+# how ares encodes the result in its json files
+JSON_RESULTS: dict[int, str] = {0: Result.Defeat.name, 1: Result.Tie.name, 2: Result.Victory.name}
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    opponent_id TEXT NOT NULL,
+    race TEXT NOT NULL,
+    enemy_race TEXT,
+    build TEXT NOT NULL,
+    result TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    map_name TEXT,
+    played_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS games_by_opponent ON games (opponent_id, race, id);
+CREATE TABLE IF NOT EXISTS build_stats (
+    opponent_id TEXT NOT NULL,
+    race TEXT NOT NULL,
+    build TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    PRIMARY KEY (opponent_id, race, build)
+);
+CREATE TABLE IF NOT EXISTS migrated_files (name TEXT PRIMARY KEY);
+"""
+
+
+class GameRecord(NamedTuple):
+    build: str
+    result: str
+    duration: int
+    enemy_race: Optional[str] = None
+    map_name: Optional[str] = None
+
+
+class ResultsStore:
+    """Opening results of every game, indexed by opponent and our race
+
+    Attributes:
+        db_path: The SQLite database
+        connection: Open connection to the database
+    """
+
+    def __init__(self, db_path: str = DEFAULT_PATH):
+        self.db_path: str = db_path
+        makedirs(path.dirname(db_path) or ".", exist_ok=True)
+        self.connection: sqlite3.Connection = sqlite3.connect(db_path)
+        self.connection.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ResultsStore":
+        settings: dict = config.get(RESULTS_STORE) or {}
+        store = cls(settings.get(RESULTS_STORE_PATH, DEFAULT_PATH))
+        store.migrate_json(path.dirname(store.db_path) or ".")
+        return store
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def last_game(self, opponent_id: str, race: Race) -> Optional[GameRecord]:
+        row = self.connection.execute(
+            "SELECT build, result, duration, enemy_race, map_name FROM games "
+            "WHERE opponent_id = ? AND race = ? ORDER BY id DESC LIMIT 1",
+            (str(opponent_id), race.name),
+        ).fetchone()
+        return GameRecord(*row) if row else None
+
+    def build_stats(self, opponent_id: str, race: Race) -> dict[str, tuple[int, int]]:
+        """(games, wins) of every build played against this opponent"""
+        rows = self.connection.execute(
+            "SELECT build, games, wins FROM build_stats WHERE opponent_id = ? AND race = ?",
+            (str(opponent_id), race.name),
+        )
+        return {build: (games, wins) for build, games, wins in rows}
+
+    def choose_opening(self, opponent_id: str, race: Race, cycle: list[str]) -> str:
+        """Same rule as the ares `Cycle` build selection: keep the last build unless it lost, then take the next"""
+        last = self.last_game(opponent_id, race)
+        if last is None or last.build not in cycle:
+            return cycle[0]
+        if last.result == Result.Defeat.name:
+            return cycle[(cycle.index(last.build) + 1) % len(cycle)]
+        return last.build
+
+    def add_game(self, opponent_id: str, race: Race, game: GameRecord) -> None:
+        """One insert and one summary update, committed together"""
+        with self.connection:
+            self._insert(str(opponent_id), race.name, game, int(time.time()))
+
+    def migrate_json(self, data_dir: str) -> int:
+        """Import the `<opponent_id>-<race>.json` files ares wrote, each file only once. Returns the games imported"""
+        imported = 0
+        for file in sorted(Path(data_dir).glob("*-*.json")):
+            opponent_id, _, race = file.stem.rpartition("-")
+            if race.title() not in Race.__members__:
+                continue
+            with self.connection:
+                if self.connection.execute("SELECT 1 FROM migrated_files WHERE name = ?", (file.name,)).fetchone():
+                    continue
+                try:
+                    with open(file) as f:
+                        history = json.load(f)
+                except (OSError, ValueError) as error:
+                    logger.warning(f"Skipping {file}: {error}")
+                    continue
+
+                for entry in history if isinstance(history, list) else []:
+                    game = GameRecord(
+                        build=entry.get("StrategyUsed", ""),
+                        result=JSON_RESULTS.get(entry.get("Result"), Result.Undecided.name),
+                        duration=int(entry.get("Duration", 0)),
+                        enemy_race=str(entry.get("EnemyRace", "")).removeprefix("Race.") or None,
+                    )
+                    self._insert(opponent_id, race.title(), game, None)
+                    imported += 1
+                self.connection.execute("INSERT INTO migrated_files (name) VALUES (?)", (file.name,))
+                logger.info(f"Imported {file} into {self.db_path}")
+        return imported
+
+    def _insert(self, opponent_id: str, race: str, game: GameRecord, played_at: Optional[int]) -> None:
+        self.connection.execute(
+            "INSERT INTO games (opponent_id, race, enemy_race, build, result, duration, map_name, played_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (opponent_id, race, game.enemy_race, game.build, game.result, game.duration, game.map_name, played_at),
+        )
+        self.connection.execute(
+            "INSERT INTO build_stats (opponent_id, race, build, games, wins) VALUES (?, ?, ?, 1, ?) "
+            "ON CONFLICT (opponent_id, race, build) DO UPDATE SET games = games + 1, wins = wins + excluded.wins",
+            (opponent_id, race, game.build, int(game.result == Result.Victory.name)),
+        )
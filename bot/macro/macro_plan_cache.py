@@ -0,0 +1,147 @@
+# macro_plan_cache.py
+"""
+Keeps the behaviors of the MacroPlan used by `MyBot._macro` between steps. They are only rebuilt when one of the
+inputs that shape the plan changes, so a steady state frame reuses the same objects instead of allocating them again.
+
+Only behaviors that are pure configuration are reused. `SpawnController` and `ProductionController` keep working state
+on the instance while they execute, they are created fresh every step, as is the `MacroPlan` holding them.
+"""
+
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Optional
+
+from ares.behaviors.macro import (
+    AutoSupply,
+    BuildWorkers,
+    ExpansionController,
+    GasBuildingController,
+    MacroPlan,
+    ProductionController,
+    RestorePower,
+    SpawnController,
+    UpgradeController,
+)
+from loguru import logger
+from sc2.data import Race
+from sc2.position import Point2
+
+from ares.behaviors.macro.macro_behavior import MacroBehavior
+
+from bot.macro.protoss.chrono_controller import ChronoController
+from bot.macro.protoss.townhall_pylon_controller import TownhallPylonController
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+# Times (in seconds) at which the shape of the plan changes
+TOWNHALL_PYLON_TIME: float = 120.0
+OPENING_OVERRIDE_TIME: float = 300.0
+
+
+class MacroPlanCache:
+    """Cached macro plan for the main bot.
+
+    Attributes:
+        army_comps: Army composition per race, passed to the Spawn and Production controllers
+        desired_upgrades: Upgrades per race, passed to the UpgradeController
+        behaviors: The reused behaviors of the plan, in the order they are added
+        stateful_behaviors: Creates the behaviors that come after `behaviors`, called for every plan
+        rebuilds: How many times the behaviors have been rebuilt, useful for benchmarking
+    """
+
+    def __init__(self, army_comps: dict, desired_upgrades: dict):
+        self.army_comps: dict = army_comps
+        self.desired_upgrades: dict = desired_upgrades
+
+        self.behaviors: list[MacroBehavior] = []
+        self.stateful_behaviors: list[Callable[[], MacroBehavior]] = []
+        self.rebuilds: int = 0
+
+        # Inputs the current plan was built with
+        self._townhall_count: int = -1
+        self._build_completed: bool = False
+        self._opening: str = ""
+        self._time_bucket: int = -1
+        self._build_location: Optional[Point2] = None
+        self._spawn_target: Optional[Point2] = None
+
+    @staticmethod
+    def _time_bucket_for(time: float) -> int:
+        if time > OPENING_OVERRIDE_TIME:
+            return 2
+        if time > TOWNHALL_PYLON_TIME:
+            return 1
+        return 0
+
+    def get_plan(self, ai: "AresBot", build_location: Point2) -> MacroPlan:
+        """Plan for this step, the cached behaviors are rebuilt first if one of their inputs changed since last call"""
+        townhall_count: int = len(ai.townhalls)
+        build_completed: bool = ai.build_order_runner.build_completed
+        opening: str = ai.build_order_runner.chosen_opening
+        time_bucket: int = self._time_bucket_for(ai.time)
+
+        if (
+            self.rebuilds == 0
+            or townhall_count != self._townhall_count
+            or build_completed != self._build_completed
+            or opening != self._opening
+            or time_bucket != self._time_bucket
+            or build_location != self._build_location
+            or ai.current_base_target != self._spawn_target
+        ):
+            self._townhall_count = townhall_count
+            self._build_completed = build_completed
+            self._opening = opening
+            self._time_bucket = time_bucket
+            self._build_location = build_location
+            self._spawn_target = ai.current_base_target
+            self._build_behaviors(ai)
+            self.rebuilds += 1
+
+        macro_plan: MacroPlan = MacroPlan()
+        for behavior in self.behaviors:
+            macro_plan.add(behavior)
+        for create in self.stateful_behaviors:
+            macro_plan.add(create())
+        return macro_plan
+
+    def _build_behaviors(self, ai: "AresBot") -> None:
+        """Build the behaviors of the plan from the stored inputs"""
+        logger.debug(
+            f"{ai.time_formatted} Rebuilding macro plan: townhalls={self._townhall_count} "
+            f"build_completed={self._build_completed} time_bucket={self._time_bucket}"
+        )
+
+        race: Race = ai.race
+        worker_count: int = min(90, self._townhall_count * 21 + 3)
+        spawn = partial(SpawnController, self.army_comps[race], spawn_target=self._spawn_target)
+        production = partial(ProductionController, self.army_comps[race], self._build_location, (400, 200))
+
+        behaviors: list[MacroBehavior] = [ChronoController(), RestorePower()]
+        stateful_behaviors: list[Callable[[], MacroBehavior]] = []
+        self.behaviors, self.stateful_behaviors = behaviors, stateful_behaviors
+
+        # After 60 seconds we can assume we need Pylons at the bases we own
+        if self._time_bucket >= 1:
+            behaviors.append(TownhallPylonController())
+
+        if not self._build_completed:
+            return
+
+        if self._opening != "4GateRush" or self._time_bucket >= 2:
+            behaviors.append(AutoSupply(base_location=self._build_location))
+            behaviors.append(BuildWorkers(to_count=worker_count))
+            behaviors.append(GasBuildingController(to_count=self._townhall_count * 2))
+            behaviors.append(ExpansionController(to_count=len(ai.expansion_locations_list), max_pending=2))
+            behaviors.append(UpgradeController(self.desired_upgrades[race], self._build_location))
+
+            stateful_behaviors.append(spawn)
+
+            if self._townhall_count > 3:
+                stateful_behaviors.append(production)
+        else:
+            behaviors.append(AutoSupply(base_location=self._build_location))
+            behaviors.append(BuildWorkers(to_count=worker_count))
+            behaviors.append(ExpansionController(to_count=len(ai.expansion_locations_list), max_pending=2))
+            stateful_behaviors.append(spawn)
+            stateful_behaviors.append(production)
@@ -0,0 +1,160 @@
+# placement_batcher.py
+"""
+Per frame batching of placement queries. Callers submit (ability, position) candidates and get a future for each,
+everything pending is sent to the game as one `RequestQuery` when the frame flushes, or earlier when a caller awaits its
+answers. Duplicate candidates within a frame share one entry and answers are cached for a short while, cached answers
+close to a structure that started or died are dropped.
+
+Only one request may be in flight on the client at a time, so flushing is always awaited from the step itself:
+`MyBot.on_step` flushes once at the end of every frame and `check` flushes inline, nothing runs in the background.
+Callers that can wait a frame, macro behaviors and build steps, submit during one frame and read the futures on the
+next. `check` is for code that needs its answers right away, such as the placement searches of python-sc2 and ares,
+which `routed` sends through the batcher.
+"""
+
+import asyncio
+from contextlib import contextmanager
+from math import floor
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from s2clientprotocol import common_pb2, error_pb2, query_pb2
+from sc2.ids.ability_id import AbilityId
+from sc2.position import Point2
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+# How long an answer is reused, units walking over a spot make it unplaceable for a moment
+CACHE_GAME_LOOPS: int = 22
+# Answers within this distance of a structure that started or died are dropped
+INVALIDATION_DISTANCE: float = 4.0
+CELL_SIZE: float = 4.0
+
+PlacementKey = tuple[int, float, float]
+
+
+class PlacementQueryBatcher:
+    """Batch and cache placement queries
+
+    Attributes:
+        queries_sent: Number of query requests sent to the game
+        placements_asked: Number of placements in those requests
+        placements_submitted: Number of placements callers submitted, including duplicates and cached answers
+    """
+
+    def __init__(self, ai: "AresBot"):
+        self.ai: "AresBot" = ai
+        self.queries_sent: int = 0
+        self.placements_asked: int = 0
+        self.placements_submitted: int = 0
+
+        self._pending: dict[PlacementKey, asyncio.Future] = {}
+        # key -> (answer, game loop it was received on)
+        self._answers: dict[PlacementKey, tuple[bool, int]] = {}
+        self._cells: dict[tuple[int, int], set[PlacementKey]] = {}
+
+    @staticmethod
+    def _key(ability: AbilityId, position: Point2) -> PlacementKey:
+        # placements snap to half cells
+        return ability.value, round(position.x * 2) / 2, round(position.y * 2) / 2
+
+    @staticmethod
+    def _cell(x: float, y: float) -> tuple[int, int]:
+        return floor(x / CELL_SIZE), floor(y / CELL_SIZE)
+
+    def submit(self, ability: AbilityId, position: Point2) -> asyncio.Future:
+        """Future of whether `ability` (e.g. the build ability of a structure) can be placed at `position`"""
+        self.placements_submitted += 1
+        key = self._key(ability, position)
+        if future := self._pending.get(key):
+            return future
+
+        future = asyncio.get_running_loop().create_future()
+        answer = self._answers.get(key)
+        if answer is not None and self.ai.state.game_loop - answer[1] <= CACHE_GAME_LOOPS:
+            future.set_result(answer[0])
+        else:
+            self._pending[key] = future
+        return future
+
+    async def check(self, ability: AbilityId, positions: Iterable[Point2]) -> list[bool]:
+        """Whether `ability` can be placed at each position, sent together with anything else pending"""
+        futures = [self.submit(ability, position) for position in positions]
+        if not all(future.done() for future in futures):
+            await self.flush()
+        return [future.result() for future in futures]
+
+    @contextmanager
+    def routed(self) -> Iterator[None]:
+        """Placement queries the client is asked for within the block go through `check`
+
+        For placement searches we do not own, such as `BotAI.find_placement`, that call the client directly.
+        """
+        client = self.ai.client
+        direct = client._query_building_placement_fast
+
+        async def query(ability: AbilityId, positions: list[Point2], ignore_resources: bool = True) -> list[bool]:
+            # batched queries always ignore resources
+            if not ignore_resources:
+                return await direct(ability, positions, ignore_resources)
+            return await self.check(ability, positions)
+
+        client._query_building_placement_fast = query
+        try:
+            yield
+        finally:
+            del client._query_building_placement_fast
+
+    async def flush(self) -> None:
+        """Send every pending placement as a single query"""
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        request = query_pb2.RequestQuery(
+            placements=[
+                query_pb2.RequestQueryBuildingPlacement(ability_id=ability, target_pos=common_pb2.Point2D(x=x, y=y))
+                for ability, x, y in pending
+            ],
+            ignore_resource_requirements=True,
+        )
+        response = await self.ai.client._execute(query=request)
+        self.queries_sent += 1
+        self.placements_asked += len(pending)
+
+        game_loop = self.ai.state.game_loop
+        for (key, future), placement in zip(pending.items(), response.query.placements):
+            answer = placement.result == error_pb2.Success
+            self._answers[key] = (answer, game_loop)
+            self._cells.setdefault(self._cell(key[1], key[2]), set()).add(key)
+            if not future.done():
+                future.set_result(answer)
+
+    def invalidate(self, position: Point2) -> None:
+        """Drop cached answers close to a structure that started or died"""
+        x, y = position.x, position.y
+        distance = INVALIDATION_DISTANCE
+        min_x, min_y = self._cell(x - distance, y - distance)
+        max_x, max_y = self._cell(x + distance, y + distance)
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                keys = self._cells.get((cell_x, cell_y))
+                if not keys:
+                    continue
+                for key in [key for key in keys if (key[1] - x) ** 2 + (key[2] - y) ** 2 < distance * distance]:
+                    keys.discard(key)
+                    self._answers.pop(key, None)
+                if not keys:
+                    del self._cells[(cell_x, cell_y)]
+
+    def expire(self) -> None:
+        """Forget answers too old to be reused, call once per frame"""
+        oldest = self.ai.state.game_loop - CACHE_GAME_LOOPS
+        for key in [key for key, (_, game_loop) in self._answers.items() if game_loop < oldest]:
+            del self._answers[key]
+            cell = self._cell(key[1], key[2])
+            keys = self._cells.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._cells[cell]
@@ -0,0 +1,194 @@
+# placement_plan.py
+"""
+Precomputed build positions around every named build order target (`nat`, `third`, `enemy_third`, ...), so build steps
+can pick a spot without awaiting placement queries against the game mid-step.
+
+Candidates are found on the static placement grid of the map, with expansion spots, mineral lines and the main ramp
+kept clear, and ordered by distance to the target. The plan is computed in a worker thread, awaited by an asyncio task
+started in `on_start`, so the game keeps stepping meanwhile, and it is cached on disk per map and spawn so later games
+on the same map load it instantly. Whether a candidate is still free is checked against `StructureIndex` when it is
+used.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from os import makedirs, path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from loguru import logger
+from sc2.position import Point2
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+DEFAULT_CACHE_DIR: str = "data/placement_plans"
+# bump when the way candidates are chosen changes, old cache files are then ignored
+PLAN_VERSION: int = 1
+
+# footprint radii planned for: 2x2 (pylon, shield battery, ...) and 3x3 (gateway, forge, ...)
+FOOTPRINT_RADII: tuple[float, ...] = (1.0, 1.5)
+# how far from the target candidates may be, and how many are kept per target and footprint
+SEARCH_RADIUS: float = 12.0
+CANDIDATES_PER_TARGET: int = 16
+# kept clear around expansion spots (townhall plus a ring) and resources (mining paths)
+EXPANSION_CLEARANCE: int = 4
+RESOURCE_CLEARANCE: int = 3
+# candidates must be on the same level as their target
+MAX_HEIGHT_DIFFERENCE: int = 5
+
+
+def target_name(target) -> str:
+    """Plan key of a build order target, which may be a `BuildOrderTargetOptions` member or its string"""
+    return str(getattr(target, "name", target)).upper()
+
+
+class PlacementPlan:
+    """Build positions per target name and footprint radius
+
+    Attributes:
+        cache_dir: Where plans are cached, one json file per map and spawn
+        positions: Candidates closest first, by target name then footprint radius
+        ready: Whether the plan is computed or loaded, the build order falls back to the game until then
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir: str = cache_dir
+        self.positions: dict[str, dict[float, list[Point2]]] = {}
+        self.ready: bool = False
+
+    def candidates(self, target: str, footprint_radius: float) -> list[Point2]:
+        return self.positions.get(target, {}).get(footprint_radius, [])
+
+    @staticmethod
+    def map_key(ai: "AresBot") -> str:
+        """Identifies the map layout and our spawn, the targets depend on both"""
+        digest = hashlib.sha1()
+        digest.update(f"{PLAN_VERSION}:{ai.game_info.map_name}:{ai.start_location}".encode())
+        digest.update(ai.game_info.placement_grid.data_numpy.tobytes())
+        return digest.hexdigest()
+
+    def start(self, ai: "AresBot", anchors: dict[str, Point2]) -> asyncio.Task:
+        """Load or compute the plan for `anchors` (target name -> position) in a background task"""
+        grid = ai.game_info.placement_grid.data_numpy.astype(bool)
+        heights = ai.game_info.terrain_height.data_numpy
+        keep_clear = [(point, EXPANSION_CLEARANCE) for point in ai.expansion_locations_list]
+        keep_clear += [(resource.position, RESOURCE_CLEARANCE) for resource in ai.resources]
+        keep_clear += [(point, 1) for point in ai.main_base_ramp.points]
+        task = asyncio.create_task(self.build(self.map_key(ai), anchors, grid, heights, keep_clear))
+        task.add_done_callback(self._built)
+        return task
+
+    async def build(
+        self,
+        key: str,
+        anchors: dict[str, Point2],
+        grid: np.ndarray,
+        heights: np.ndarray,
+        keep_clear: list[tuple[Point2, int]],
+    ) -> None:
+        file_path = path.join(self.cache_dir, f"{key}.json")
+        if self._load(file_path):
+            self.ready = True
+            return
+
+        # CPU bound, computed in the default executor so the game keeps stepping on the event loop meanwhile
+        self.positions = await asyncio.get_running_loop().run_in_executor(
+            None, _plan, key, anchors, grid, heights, keep_clear
+        )
+        self.ready = True
+        self._save(file_path)
+
+    @staticmethod
+    def _built(task: asyncio.Task) -> None:
+        """Nothing awaits the task, its errors are logged here"""
+        if not task.cancelled() and (error := task.exception()) is not None:
+            logger.opt(exception=error).error("Could not build the placement plan, build steps use the game instead")
+
+    def _load(self, file_path: str) -> bool:
+        if not path.isfile(file_path):
+            return False
+        try:
+            with open(file_path) as f:
+                content: dict = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self.positions = {
+            name: {float(radius): [Point2(position) for position in positions] for radius, positions in sizes.items()}
+            for name, sizes in content.items()
+        }
+        return True
+
+    def _save(self, file_path: str) -> None:
+        try:
+            makedirs(self.cache_dir, exist_ok=True)
+            with open(file_path, "w") as f:
+                json.dump(
+                    {
+                        name: {str(radius): [[p.x, p.y] for p in positions] for radius, positions in sizes.items()}
+                        for name, sizes in self.positions.items()
+                    },
+                    f,
+                )
+        except OSError as error:
+            logger.warning(f"Could not cache the placement plan: {error}")
+
+
+def _plan(
+    key: str,
+    anchors: dict[str, Point2],
+    grid: np.ndarray,
+    heights: np.ndarray,
+    keep_clear: list[tuple[Point2, int]],
+) -> dict[str, dict[float, list[Point2]]]:
+    """Candidates of every anchor, run in a worker thread"""
+    start = time.perf_counter()
+    grid = grid.copy()
+    for point, clearance in keep_clear:
+        x, y = int(point.x), int(point.y)
+        grid[max(y - clearance, 0) : y + clearance + 1, max(x - clearance, 0) : x + clearance + 1] = False
+
+    fits = {radius: _fits(grid, int(radius * 2)) for radius in FOOTPRINT_RADII}
+    positions = {
+        name: {radius: _closest_spots(fits[radius], heights, anchor, int(radius * 2)) for radius in FOOTPRINT_RADII}
+        for name, anchor in anchors.items()
+    }
+    logger.info(f"Placement plan {key[:8]} computed in {time.perf_counter() - start:.2f}s")
+    return positions
+
+
+def _fits(grid: np.ndarray, size: int) -> np.ndarray:
+    """fits[y, x] is True when the `size` x `size` square with its lower left corner at (x, y) is all placeable"""
+    integral = np.zeros((grid.shape[0] + 1, grid.shape[1] + 1), dtype=np.int32)
+    integral[1:, 1:] = grid.astype(np.int32).cumsum(0).cumsum(1)
+    sums = integral[size:, size:] - integral[:-size, size:] - integral[size:, :-size] + integral[:-size, :-size]
+    return sums == size * size
+
+
+def _closest_spots(fits: np.ndarray, heights: np.ndarray, anchor: Point2, size: int) -> list[Point2]:
+    """Non overlapping footprints closest to `anchor`, as structure centers"""
+    half = size / 2
+    radius = int(SEARCH_RADIUS)
+    x_min, y_min = max(int(anchor.x) - radius, 0), max(int(anchor.y) - radius, 0)
+    x_max, y_max = min(int(anchor.x) + radius, fits.shape[1]), min(int(anchor.y) + radius, fits.shape[0])
+    ys, xs = np.nonzero(fits[y_min:y_max, x_min:x_max])
+    if len(xs) == 0:
+        return []
+
+    xs, ys = xs + x_min, ys + y_min
+    anchor_height = int(heights[min(int(anchor.y), heights.shape[0] - 1), min(int(anchor.x), heights.shape[1] - 1)])
+    same_level = np.abs(heights[ys, xs].astype(np.int32) - anchor_height) <= MAX_HEIGHT_DIFFERENCE
+    xs, ys = xs[same_level], ys[same_level]
+    distances = np.hypot(xs + half - anchor.x, ys + half - anchor.y)
+    order = np.argsort(distances, kind="stable")
+
+    chosen: list[tuple[int, int]] = []
+    for index in order:
+        if distances[index] > SEARCH_RADIUS or len(chosen) == CANDIDATES_PER_TARGET:
+            break
+        x, y = int(xs[index]), int(ys[index])
+        if all(abs(x - cx) >= size or abs(y - cy) >= size for cx, cy in chosen):
+            chosen.append((x, y))
+    return [Point2((x + half, y + half)) for x, y in chosen]
@@ -6,7 +6,6 @@ from typing import TYPE_CHECKING
 from loguru import logger
 from sc2.ids.ability_id import AbilityId
 from sc2.ids.unit_typeid import UnitTypeId as UnitId
-from sc2.ids.buff_id import BuffId
 
 if TYPE_CHECKING:
     from ares import AresBot
@@ -23,7 +22,7 @@ class ChronoController(MacroBehavior):
         Defaults to 0
         boost_constructing_structures: Whether to boost structures that are being constructed
         Defaults to False
-        priority_list: Order of which structures to boost first
+        priority_list: Order of which structures to boost first, structures of any other type are boosted last
     """
 
     reserve_energy: int = 0
@@ -52,19 +51,22 @@ class ChronoController(MacroBehavior):
     ]
 
     def execute(self, ai: "AresBot", config: dict, mediator: ManagerMediator) -> bool:
-        """Execute the Chrono macro behavior."""
+        """Execute the Chrono macro behavior.
+
+        Targets come from `ai.chrono_queue`, which is kept up to date from structure events, so each nexus only looks
+        at the best ranked structures instead of sorting all of them.
+        """
+
+        boosted: bool = False
 
         # Check each Nexus to see if we have enough energy
         for nexus in ai.ready_townhalls:
             if nexus.type_id == UnitId.NEXUS and nexus.energy >= 50 + self.reserve_energy:
-                sorted_all_our_units = sorted(ai.structures, key=lambda u: self.priority_list.index(u.type_id))
+                target = ai.chrono_queue.pop_target(ai, self.boost_constructing_structures)
+                if target is None:
+                    break
 
-                for unit in sorted_all_our_units:
-                    if not unit.is_ready and self.boost_constructing_structures and not BuffId.CHRONOBOOSTENERGYCOST in unit.buffs:
-                        nexus(AbilityId.EFFECT_CHRONOBOOSTENERGYCOST, unit)
-                        return True
-                    elif unit.is_ready and not unit.is_idle and unit.is_powered and not BuffId.CHRONOBOOSTENERGYCOST in unit.buffs:
-                        nexus(AbilityId.EFFECT_CHRONOBOOSTENERGYCOST, unit)
-                        return True
+                nexus(AbilityId.EFFECT_CHRONOBOOSTENERGYCOST, target)
+                boosted = True
 
-        return False
+        return boosted
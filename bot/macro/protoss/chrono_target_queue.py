@@ -0,0 +1,153 @@
+# chrono_target_queue.py
+"""
+Candidate queue of structures we may want to chrono boost. Structures are grouped by the rank of their type in the
+chrono priority list, and each rank keeps the set of its structures that are worth boosting right now: busy, powered
+and not boosted, or still under construction and not boosted. The sets follow the structure events of the bot, and the
+order, power and chrono buff changes of the structures, so popping a target only takes a set from the best ranked
+non empty rank.
+
+python-sc2 has no events for orders and buffs, their changes are picked up by one pass over the tracked structures the
+first time a target is asked for in a frame, however many nexuses ask.
+"""
+
+from typing import TYPE_CHECKING, Optional
+
+from sc2.ids.buff_id import BuffId
+from sc2.ids.unit_typeid import UnitTypeId as UnitId
+from sc2.unit import Unit
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+# A structure we chrono boosted counts as boosted this long in game seconds, until its buff shows up
+CHRONO_LATENCY: float = 1.0
+
+
+class ChronoTargetQueue:
+    """Rank indexed chrono candidates
+
+    Attributes:
+        rank: Rank of each structure type, lower is boosted first. Types that are not in the priority list are given
+            a rank after every listed type the first time they are seen, so they can still be boosted but never first.
+        types_by_rank: The structure type for each rank
+    """
+
+    def __init__(self, priority_list: list[UnitId]):
+        self.rank: dict[UnitId, int] = {}
+        self.types_by_rank: list[UnitId] = []
+
+        # tag -> (rank, is_ready)
+        self._tags: dict[int, tuple[int, bool]] = {}
+        # tags worth boosting of each rank, ready ones and ones under construction
+        self._ready: list[set[int]] = []
+        self._constructing: list[set[int]] = []
+        # tag -> game time of the chrono we issued, until its buff shows up
+        self._requested: dict[int, float] = {}
+        self._synced_loop: int = -1
+
+        for type_id in priority_list:
+            self._rank_for(type_id)
+
+    def _rank_for(self, type_id: UnitId) -> int:
+        rank = self.rank.get(type_id)
+        if rank is None:
+            rank = self.rank[type_id] = len(self.types_by_rank)
+            self.types_by_rank.append(type_id)
+            self._ready.append(set())
+            self._constructing.append(set())
+        return rank
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def add(self, unit: Unit) -> None:
+        """Track a structure, call when construction starts or for structures that already exist"""
+        if unit.tag in self._tags:
+            return
+
+        rank = self._rank_for(unit.type_id)
+        self._tags[unit.tag] = (rank, unit.is_ready)
+        self._update_unit(unit, rank, unit.is_ready, unit.tag in self._requested)
+
+    def complete(self, unit: Unit) -> None:
+        """Move a structure from constructing to ready"""
+        rank, ready = self._tags.get(unit.tag, (None, False))
+        if rank is None:
+            self.add(unit)
+            return
+        if not ready:
+            self._constructing[rank].discard(unit.tag)
+            self._tags[unit.tag] = (rank, True)
+            self._update_unit(unit, rank, True, unit.tag in self._requested)
+
+    def change_type(self, unit: Unit) -> None:
+        """Re-rank a structure that morphed, e.g. a gateway becoming a warpgate"""
+        requested = self._requested.get(unit.tag)
+        self.remove(unit.tag)
+        if requested is not None:
+            self._requested[unit.tag] = requested
+        self.add(unit)
+
+    def remove(self, tag: int) -> None:
+        """Stop tracking a structure, safe to call with tags that are not tracked"""
+        entry = self._tags.pop(tag, None)
+        self._requested.pop(tag, None)
+        if entry is None:
+            return
+
+        rank, _ = entry
+        self._ready[rank].discard(tag)
+        self._constructing[rank].discard(tag)
+
+    def _update_unit(self, unit: Unit, rank: int, ready: bool, requested: bool) -> None:
+        """Put a structure in or out of the candidates of its rank, `requested` when we just boosted it"""
+        boosted = requested or BuffId.CHRONOBOOSTENERGYCOST in unit.buffs
+        if ready:
+            candidates = self._ready[rank]
+            worth_boosting = not boosted and unit.is_powered and not unit.is_idle
+        else:
+            candidates = self._constructing[rank]
+            worth_boosting = not boosted
+        if worth_boosting:
+            candidates.add(unit.tag)
+        else:
+            candidates.discard(unit.tag)
+
+    def _sync(self, ai: "AresBot") -> None:
+        """Pick up the order, power and buff changes of the tracked structures, once per frame"""
+        if self._synced_loop == ai.state.game_loop:
+            return
+        self._synced_loop = ai.state.game_loop
+
+        time: float = ai.time
+        requested = self._requested
+        for tag in [tag for tag, at in requested.items() if at + CHRONO_LATENCY <= time]:
+            del requested[tag]
+
+        unit_tag_dict: dict[int, Unit] = ai.unit_tag_dict
+        for tag, (rank, ready) in self._tags.items():
+            if (unit := unit_tag_dict.get(tag)) is not None:
+                self._update_unit(unit, rank, ready, tag in requested)
+
+    def pop_target(self, ai: "AresBot", boost_constructing_structures: bool = False) -> Optional[Unit]:
+        """Best ranked structure that is worth boosting and not already boosted, marked as boosted when returned
+
+        Parameters
+        ----------
+        ai :
+            Bot object that will be running the game
+        boost_constructing_structures :
+            Whether structures still under construction may be returned
+        """
+        self._sync(ai)
+
+        unit_tag_dict: dict[int, Unit] = ai.unit_tag_dict
+        for rank in range(len(self.types_by_rank)):
+            for candidates in (self._ready[rank], self._constructing[rank] if boost_constructing_structures else None):
+                while candidates:
+                    tag = candidates.pop()
+                    if (unit := unit_tag_dict.get(tag)) is not None:
+                        self._requested[tag] = ai.time
+                        return unit
+
+        return None
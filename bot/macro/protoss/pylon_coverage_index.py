@@ -0,0 +1,128 @@
+# pylon_coverage_index.py
+"""
+Tracks which of our nexuses have a pylon next to them. The index is only updated from structure events, so asking
+whether a base has a pylon, or a pylon on the way, does not need to look at any units.
+"""
+
+from typing import Iterator
+
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.position import Point2
+from sc2.unit import Unit
+
+# Distance from the townhall a pylon must be within to count for that base
+PYLON_COVERAGE_DISTANCE: float = 15.0
+# How long to wait for a pylon we asked for to start before asking again
+PYLON_REQUEST_TIMEOUT: float = 20.0
+
+
+class PylonCoverageIndex:
+    """Pylon to townhall coverage
+
+    Attributes:
+        bases: Position of each tracked nexus, by tag
+        ready_pylons: Tags of the completed pylons covering each nexus
+        pending_pylons: Tags of the pylons under construction covering each nexus
+        requested_at: Time we last asked for a pylon at a nexus that has not started yet
+        uncovered: Tags of the nexuses without a ready or pending pylon
+    """
+
+    def __init__(self):
+        self.bases: dict[int, Point2] = {}
+        self.ready_pylons: dict[int, set[int]] = {}
+        self.pending_pylons: dict[int, set[int]] = {}
+        self.requested_at: dict[int, float] = {}
+        self.uncovered: set[int] = set()
+
+        # pylon tag -> (position, is_ready)
+        self._pylons: dict[int, tuple[Point2, bool]] = {}
+
+    def has_pylon(self, townhall_tag: int) -> bool:
+        return bool(self.ready_pylons.get(townhall_tag))
+
+    def has_pending_pylon(self, townhall_tag: int) -> bool:
+        return bool(self.pending_pylons.get(townhall_tag))
+
+    def bases_needing_pylon(self, time: float) -> Iterator[int]:
+        """Nexuses without a pylon where we have not recently asked for one"""
+        for tag in self.uncovered:
+            requested = self.requested_at.get(tag)
+            if requested is None or time - requested > PYLON_REQUEST_TIMEOUT:
+                yield tag
+
+    def mark_requested(self, townhall_tag: int, time: float) -> None:
+        self.requested_at[townhall_tag] = time
+
+    def add(self, unit: Unit) -> None:
+        """Track a new pylon or nexus, other structures are ignored"""
+        if unit.type_id == UnitID.PYLON:
+            self._add_pylon(unit.tag, unit.position, unit.is_ready)
+        elif unit.type_id == UnitID.NEXUS:
+            self._add_base(unit.tag, unit.position)
+
+    def complete(self, unit: Unit) -> None:
+        """A tracked pylon finished, move it from pending to ready at every base it covers"""
+        if unit.type_id != UnitID.PYLON:
+            if unit.type_id == UnitID.NEXUS and unit.tag not in self.bases:
+                self._add_base(unit.tag, unit.position)
+            return
+
+        if unit.tag not in self._pylons:
+            self._add_pylon(unit.tag, unit.position, True)
+            return
+
+        position, ready = self._pylons[unit.tag]
+        if ready:
+            return
+        self._pylons[unit.tag] = (position, True)
+        for base_tag in self._bases_covered_by(position):
+            self.pending_pylons[base_tag].discard(unit.tag)
+            self.ready_pylons[base_tag].add(unit.tag)
+
+    def remove(self, tag: int) -> None:
+        """Stop tracking a destroyed pylon or nexus, safe to call with any tag"""
+        if tag in self._pylons:
+            position, _ = self._pylons.pop(tag)
+            for base_tag in self._bases_covered_by(position):
+                self.ready_pylons[base_tag].discard(tag)
+                self.pending_pylons[base_tag].discard(tag)
+                self._update_uncovered(base_tag)
+        elif tag in self.bases:
+            del self.bases[tag]
+            del self.ready_pylons[tag]
+            del self.pending_pylons[tag]
+            self.requested_at.pop(tag, None)
+            self.uncovered.discard(tag)
+
+    def _add_pylon(self, tag: int, position: Point2, ready: bool) -> None:
+        if tag in self._pylons:
+            return
+
+        self._pylons[tag] = (position, ready)
+        for base_tag in self._bases_covered_by(position):
+            (self.ready_pylons if ready else self.pending_pylons)[base_tag].add(tag)
+            self.requested_at.pop(base_tag, None)
+            self.uncovered.discard(base_tag)
+
+    def _add_base(self, tag: int, position: Point2) -> None:
+        if tag in self.bases:
+            return
+
+        self.bases[tag] = position
+        self.ready_pylons[tag] = set()
+        self.pending_pylons[tag] = set()
+        for pylon_tag, (pylon_position, ready) in self._pylons.items():
+            if pylon_position.distance_to(position) < PYLON_COVERAGE_DISTANCE:
+                (self.ready_pylons if ready else self.pending_pylons)[tag].add(pylon_tag)
+        self._update_uncovered(tag)
+
+    def _bases_covered_by(self, position: Point2) -> Iterator[int]:
+        for base_tag, base_position in self.bases.items():
+            if base_position.distance_to(position) < PYLON_COVERAGE_DISTANCE:
+                yield base_tag
+
+    def _update_uncovered(self, base_tag: int) -> None:
+        if self.ready_pylons[base_tag] or self.pending_pylons[base_tag]:
+            self.uncovered.discard(base_tag)
+        else:
+            self.uncovered.add(base_tag)
@@ -1,42 +1,76 @@
 # townhall_pylon_controller.py
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from math import cos, pi, sin
+from typing import TYPE_CHECKING, Optional
 
 from loguru import logger
-from sc2.data import Race
+from sc2.ids.ability_id import AbilityId
 from sc2.ids.unit_typeid import UnitTypeId as UnitID
 from sc2.position import Point2
 
 if TYPE_CHECKING:
     from ares import AresBot
 
-from cython_extensions import cy_unit_pending
-
-from ares.behaviors.macro.build_structure import BuildStructure
 from ares.behaviors.macro.macro_behavior import MacroBehavior
 from ares.managers.manager_mediator import ManagerMediator
 
+# Pylon spots are tried on a ring around the nexus, on the side away from the minerals
+PYLON_RING_DISTANCE: float = 6.0
+PYLON_RING_SPOTS: int = 12
+
+
 @dataclass
 class TownhallPylonController(MacroBehavior):
-    """Build a pylon next to each townhall."""
+    """Build a pylon next to each townhall.
+
+    Uses `ai.pylon_coverage` to find the nexuses without a pylon, so nothing is done unless a base is uncovered.
+    Candidate spots are checked through `ai.placement_batcher`: they are submitted on one frame, sent together with
+    every other placement of that frame, and the pylon is placed at the best valid spot on a following frame.
+    """
 
     def execute(self, ai: "AresBot", config: dict, mediator: ManagerMediator) -> bool:
         """Execute the TownhallPylonController macro behavior."""
 
+        coverage = ai.pylon_coverage
+        if not coverage.uncovered:
+            return False
 
-        # For every townhall
-        townhalls = ai.townhalls
-        for townhall in townhalls:
-            if townhall.race == Race.Protoss:
-                # See if we have a pylong close by
-                pylon_nearby = ai.structures.filter(lambda u: u.type_id == UnitID.PYLON and u.distance_to(townhall) < 15)
-                # If we don't have one then build one
-                if not pylon_nearby and not ai.structure_pending(UnitID.PYLON):
-                    if ai.can_afford(UnitID.PYLON):
-                        # Build the pylon
-                        logger.info(f"Building UnitTypeId.PYLON at {townhall.position}")
-                        BuildStructure(townhall.position, UnitID.PYLON, closest_to=townhall.position).execute(ai, config, mediator)
+        # For every nexus without a ready or pending pylon that we have not already asked for one at
+        for townhall_tag in coverage.bases_needing_pylon(ai.time):
+            if ai.can_afford(UnitID.PYLON):
+                townhall_position: Point2 = coverage.bases[townhall_tag]
+                position: Optional[Point2] = self._pylon_spot(ai, townhall_position)
+                if position is None:
                     return True
 
-        return False
\ No newline at end of file
+                # Build the pylon
+                logger.info(f"Building UnitTypeId.PYLON at {position}")
+                if worker := mediator.select_worker(target_position=position):
+                    if mediator.build_with_specific_worker(worker=worker, structure_type=UnitID.PYLON, pos=position):
+                        coverage.mark_requested(townhall_tag, ai.time)
+            return True
+
+        return False
+
+    @staticmethod
+    def _pylon_spot(ai: "AresBot", townhall_position: Point2) -> Optional[Point2]:
+        """Closest valid ring spot away from the minerals, None while the placements are still being asked"""
+        minerals = ai.mineral_field.closer_than(10, townhall_position)
+        away: Point2 = townhall_position - minerals.center if minerals else Point2((0.0, 0.0))
+
+        spots: list[Point2] = []
+        for i in range(PYLON_RING_SPOTS):
+            angle = 2 * pi * i / PYLON_RING_SPOTS
+            offset = Point2((cos(angle), sin(angle)))
+            if minerals and offset.x * away.x + offset.y * away.y < 0:
+                continue
+            spots.append((townhall_position + offset * PYLON_RING_DISTANCE).rounded)
+
+        futures = [ai.placement_batcher.submit(AbilityId.PROTOSSBUILD_PYLON, spot) for spot in spots]
+        if not all(future.done() for future in futures):
+            return None
+        valid: list[Point2] = [spot for spot, future in zip(spots, futures) if future.result()]
+        if not valid:
+            return None
+        return min(valid, key=lambda spot: spot.distance_to(townhall_position))
@@ -0,0 +1,156 @@
+# structure_index.py
+"""
+Index of our structures, kept up to date from the structure events of the bot. Structures are bucketed on a coarse
+grid by position and grouped by type and readiness, so the build order runner can ask for "a structure close to this
+build target", "an idle ready gateway" or "a nexus with 50 energy" by looking at a handful of candidates instead of
+every structure we own.
+
+Only static details (type, position, readiness) are indexed, per step values such as energy, orders and build
+progress are read from the live unit of each candidate.
+"""
+
+from math import floor
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.position import Point2
+from sc2.unit import Unit
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+# Side of a grid cell, about the size of the largest structure footprint
+CELL_SIZE: float = 4.0
+# Half the side of a townhall, the largest footprint
+MAX_FOOTPRINT_RADIUS: float = 2.5
+
+
+class StructureIndex:
+    """Grid and type buckets of our structures
+
+    Attributes:
+        ready: Tags of the completed structures of each type
+        constructing: Tags of the structures of each type still under construction
+    """
+
+    def __init__(self):
+        self.ready: dict[UnitID, set[int]] = {}
+        self.constructing: dict[UnitID, set[int]] = {}
+
+        # tag -> (type, position, is_ready)
+        self._tags: dict[int, tuple[UnitID, Point2, bool]] = {}
+        self._footprints: dict[int, float] = {}
+        self._cells: dict[tuple[int, int], set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def __contains__(self, tag: int) -> bool:
+        return tag in self._tags
+
+    def position_of(self, tag: int) -> Optional[Point2]:
+        entry = self._tags.get(tag)
+        return entry[1] if entry else None
+
+    @staticmethod
+    def _cell(x: float, y: float) -> tuple[int, int]:
+        return floor(x / CELL_SIZE), floor(y / CELL_SIZE)
+
+    def add(self, unit: Unit) -> None:
+        """Track a structure, call when construction starts or for structures that already exist"""
+        if unit.tag in self._tags:
+            return
+
+        position = unit.position
+        ready = unit.is_ready
+        self._tags[unit.tag] = (unit.type_id, position, ready)
+        self._footprints[unit.tag] = unit.footprint_radius or 1.0
+        self._cells.setdefault(self._cell(position.x, position.y), set()).add(unit.tag)
+        (self.ready if ready else self.constructing).setdefault(unit.type_id, set()).add(unit.tag)
+
+    def complete(self, unit: Unit) -> None:
+        """Move a structure from constructing to ready"""
+        entry = self._tags.get(unit.tag)
+        if entry is None:
+            self.add(unit)
+            return
+
+        type_id, position, ready = entry
+        if not ready:
+            self.constructing[type_id].discard(unit.tag)
+            self.ready.setdefault(type_id, set()).add(unit.tag)
+            self._tags[unit.tag] = (type_id, position, True)
+
+    def change_type(self, unit: Unit) -> None:
+        """Regroup a structure that morphed, e.g. a gateway becoming a warpgate"""
+        self.remove(unit.tag)
+        self.add(unit)
+
+    def remove(self, tag: int) -> None:
+        """Stop tracking a structure, safe to call with tags that are not tracked"""
+        entry = self._tags.pop(tag, None)
+        if entry is None:
+            return
+
+        type_id, position, ready = entry
+        del self._footprints[tag]
+        (self.ready if ready else self.constructing)[type_id].discard(tag)
+        cell = self._cell(position.x, position.y)
+        self._cells[cell].discard(tag)
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    def tags_near(self, position: Point2, distance: float) -> Iterator[int]:
+        """Tags of the structures whose position is within `distance` of `position`"""
+        x, y = position.x, position.y
+        distance_squared = distance * distance
+        min_x, min_y = self._cell(x - distance, y - distance)
+        max_x, max_y = self._cell(x + distance, y + distance)
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                for tag in self._cells.get((cell_x, cell_y), ()):
+                    structure_position = self._tags[tag][1]
+                    if (structure_position.x - x) ** 2 + (structure_position.y - y) ** 2 < distance_squared:
+                        yield tag
+
+    def has_structure_near(self, ai: "AresBot", position: Point2, distance: float, min_progress: float = 0.0) -> bool:
+        """Whether a structure at least `min_progress` built stands within `distance` of `position`"""
+        for tag in self.tags_near(position, distance):
+            if self._tags[tag][2]:
+                return True
+            unit = ai.unit_tag_dict.get(tag)
+            if unit is not None and unit.build_progress > min_progress:
+                return True
+        return False
+
+    def has_type_near(self, type_id: UnitID, position: Point2, distance: float) -> bool:
+        """Whether a structure of this type, ready or not, stands within `distance` of `position`"""
+        return any(self._tags[tag][0] == type_id for tag in self.tags_near(position, distance))
+
+    def is_footprint_free(self, position: Point2, footprint_radius: float) -> bool:
+        """Whether a square footprint centered on `position` overlaps none of our structures"""
+        # 1.5 > sqrt(2), the corners of two touching squares are still within the search distance
+        for tag in self.tags_near(position, (footprint_radius + MAX_FOOTPRINT_RADIUS) * 1.5):
+            structure_position = self._tags[tag][1]
+            clearance = footprint_radius + self._footprints[tag]
+            if (
+                abs(structure_position.x - position.x) < clearance
+                and abs(structure_position.y - position.y) < clearance
+            ):
+                return False
+        return True
+
+    def units(self, ai: "AresBot", type_id: UnitID, ready: bool = True) -> Iterator[Unit]:
+        """Live units of the ready (or constructing) structures of one type"""
+        unit_tag_dict: dict[int, Unit] = ai.unit_tag_dict
+        for tag in (self.ready if ready else self.constructing).get(type_id, ()):
+            if unit := unit_tag_dict.get(tag):
+                yield unit
+
+    def idle_ready(self, ai: "AresBot", type_id: UnitID) -> Optional[Unit]:
+        """Any ready structure of this type without orders"""
+        return next((unit for unit in self.units(ai, type_id) if unit.is_idle), None)
+
+    def ready_with_energy(self, ai: "AresBot", type_id: UnitID, energy: float) -> Optional[Unit]:
+        """Any ready structure of this type with at least `energy`, e.g. a nexus that can chrono"""
+        return next((unit for unit in self.units(ai, type_id) if unit.energy >= energy), None)
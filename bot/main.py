@@ -8,34 +8,45 @@ For more sophisticated projects, additional consideration in terms of
 software engineering principles may be necessary.
 
 """
+import time
 from itertools import cycle
-from typing import Optional
+from typing import Iterable, Optional, Union
 
 from ares import AresBot, ManagerMediator, Hub, BuildOrderRunner
-from ares.behaviors.macro import (
-    AutoSupply,
-    BuildWorkers,
-    GasBuildingController,
-    MacroPlan,
-    ProductionController,
-    SpawnController,
-    UpgradeController, RestorePower,
-)
-from ares.behaviors.macro import Mining, ExpansionController
-from ares.consts import ALL_STRUCTURES, ALL_WORKER_TYPES, UnitRole
-from sc2.data import Race
+from ares.behaviors.macro import Mining
+from ares.consts import ALL_STRUCTURES, ALL_WORKER_TYPES, DEBUG, TEST_OPPONENT_ID, USE_DATA, UnitRole
+from sc2.data import Race, Result
+from sc2.ids.ability_id import AbilityId
 from sc2.ids.unit_typeid import UnitTypeId as UnitID
 from sc2.ids.upgrade_id import UpgradeId
 from sc2.position import Point2
 from sc2.unit import Unit
-
+from sc2.unit_command import UnitCommand
+
+from bot.combat.action_coalescer import ActionCoalescer
+from bot.combat.aoe_danger_grid import AoeDangerGrid
+from bot.combat.base_ownership import BaseOwnership
+from bot.combat.base_threat_index import BaseThreatIndex
+from bot.combat.command_memory import CommandMemory
+from bot.combat.detection_grid import DetectionGrid
+from bot.data.results_store import BUILD_CHOICES, CYCLE, GameRecord, ResultsStore
+from bot.macro.macro_plan_cache import MacroPlanCache
+from bot.macro.placement_batcher import PlacementQueryBatcher
+from bot.macro.placement_plan import PlacementPlan
 from bot.macro.protoss.chrono_controller import ChronoController
-from bot.macro.protoss.townhall_pylon_controller import TownhallPylonController
+from bot.macro.protoss.chrono_target_queue import ChronoTargetQueue
+from bot.macro.protoss.pylon_coverage_index import PylonCoverageIndex
+from bot.macro.structure_index import StructureIndex
+from bot.manager.combat.attack_target_selector import AttackTargetSelector
 from bot.manager.combat.combat_attack_manager import AttackManager
+from bot.manager.combat.combat_defense_manager import CombatDefenseManager
 from bot.manager.combat.combat_harass_manager import HarassManager
 from bot.manager.control.dynamic_controller import DynamicController
 from bot.manager.control.protoss.opening.protoss_proxy_4_gate import Proxy4GateManager
 from bot.manager.macro.custom_build_order_runner import CustomBuildOrderRunner
+from bot.pathing.flow_field import FlowField
+from bot.profiling.step_profiler import StepProfiler
+from bot.recording.game_recorder import GameRecorder
 
 # this will be used for ares SpawnController behavior
 ARMY_COMPS: dict[Race, dict] = {
@@ -105,6 +116,30 @@ class MyBot(AresBot):
 
         self._commenced_attack: bool = False
         self.dynamic_controller = None
+        self.macro_plan_cache: MacroPlanCache = MacroPlanCache(ARMY_COMPS, DESIRED_UPGRADES)
+        self.chrono_queue: ChronoTargetQueue = ChronoTargetQueue(ChronoController.priority_list)
+        self.pylon_coverage: PylonCoverageIndex = PylonCoverageIndex()
+        self.structure_index: StructureIndex = StructureIndex()
+        self.base_threats: BaseThreatIndex = BaseThreatIndex()
+        self.base_ownership: BaseOwnership = BaseOwnership()
+        self.flow_field: FlowField = FlowField()
+        self.placement_plan: PlacementPlan = PlacementPlan()
+        self.placement_batcher: PlacementQueryBatcher = PlacementQueryBatcher(self)
+        self.attack_target_selector: AttackTargetSelector = AttackTargetSelector(self)
+        self.command_memory: CommandMemory = CommandMemory()
+        self.action_coalescer: ActionCoalescer = ActionCoalescer(self, self.command_memory)
+        # sized to the ground grid of ares in `on_start`
+        self.aoe_danger: Optional[AoeDangerGrid] = None
+        self.detection_grid: Optional[DetectionGrid] = None
+        # only alongside the attack controller, see `on_start`
+        self.harass_manager: Optional[HarassManager] = None
+
+        # None unless `Profiling: Enabled` is set in config.yml
+        self.profiler: Optional[StepProfiler] = StepProfiler.from_config(self.config)
+        # None unless `Recorder: Enabled` is set in config.yml
+        self.recorder: Optional[GameRecorder] = GameRecorder.from_config(self.config)
+        # opened in `register_managers` when `UseData` is set
+        self.results_store: Optional[ResultsStore] = None
 
     def register_managers(self) -> None:
         """
@@ -112,11 +147,23 @@ class MyBot(AresBot):
         """
         manager_mediator = ManagerMediator()
 
+        if self.config[USE_DATA]:
+            # our own indexed store replaces the json file per opponent the ares data manager reads and rewrites
+            self.results_store = ResultsStore.from_config(self.config)
+            self.config[USE_DATA] = False
+
         self.dynamic_controller = DynamicController(self, self.config, manager_mediator)
 
         self.manager_hub = Hub(self, self.config, manager_mediator, additional_managers=[self.dynamic_controller])
         self.manager_hub.init_managers()
 
+        if self.results_store and BUILD_CHOICES in self.config:
+            self.manager_hub.data_manager.chosen_opening = self._choose_opening()
+
+        if self.profiler:
+            for manager in self.manager_hub.managers:
+                self.profiler.instrument_manager(manager)
+
     async def on_start(self) -> None:
         """
         Can use burnysc2 hooks as usual, just add a call to the
@@ -132,10 +179,23 @@ class MyBot(AresBot):
             self.manager_hub.manager_mediator,
         )
 
+        self.aoe_danger = AoeDangerGrid(self.mediator.get_ground_grid.shape)
+        self.detection_grid = DetectionGrid(self.mediator.get_ground_grid.shape)
+
+        # computed alongside the first frames, or loaded from the cache of an earlier game on this map
+        self._placement_plan_task = self.placement_plan.start(self, self.build_order_runner.placement_anchors())
+        # ground distance fields of every expansion, computed alongside the first frames or loaded from the cache
+        self._base_ownership_task = self.base_ownership.start(self)
+
         if self.build_order_runner.chosen_opening == "4GateRush":
             self.dynamic_controller.set_controller(Proxy4GateManager(self, self.config, self.manager_hub.manager_mediator))
         else:
             self.dynamic_controller.set_controller(AttackManager(self, self.config, self.manager_hub.manager_mediator))
+            self.dynamic_controller.add_supporting_controller(
+                CombatDefenseManager(self, self.config, self.manager_hub.manager_mediator)
+            )
+            self.harass_manager = HarassManager(self, self.config, self.manager_hub.manager_mediator)
+            self.dynamic_controller.add_supporting_controller(self.harass_manager)
 
         self.current_base_target = self.enemy_start_locations[0]
         self.expansions_generator = cycle(
@@ -143,13 +203,131 @@ class MyBot(AresBot):
         )
         self._begin_attack_at_supply = 3.0 if self.race == Race.Terran else 6.0
 
+        # structures that exist before the first step never trigger construction events
+        for structure in self.structures:
+            self.chrono_queue.add(structure)
+            self.pylon_coverage.add(structure)
+            self.structure_index.add(structure)
+            self.base_threats.add(self, structure)
+            self.base_ownership.add(structure)
+
+        if self.recorder:
+            self.recorder.start(
+                self,
+                f"{self.opponent_id}-{self.race.name.lower()}",
+                {"opponent_id": self.opponent_id, "opening": self.build_order_runner.chosen_opening},
+            )
+
         await self.chat_send("Tag:" + self.build_order_runner.chosen_opening, False)
 
     async def on_step(self, iteration: int) -> None:
+        if self.recorder:
+            self.recorder.record_step(self)
+
+        self.command_memory.sync_roles(self.mediator.get_unit_role_dict)
+        self.aoe_danger.update(self)
+        self.detection_grid.update(self)
+        self.base_threats.update(self)
+        if self.profiler:
+            await self._profiled_step(iteration)
+        else:
+            await super(MyBot, self).on_step(iteration)
+
+            if self.build_order_runner.chosen_opening != "4GateRush":
+                self._macro()
+
+        # placements the behaviors submitted this frame go out as a single query
+        self.placement_batcher.expire()
+        await self.placement_batcher.flush()
+
+    async def _profiled_step(self, iteration: int) -> None:
+        """Same as `on_step` but records the time of each part with the profiler"""
+        step_start = time.perf_counter()
+
+        start = time.perf_counter()
         await super(MyBot, self).on_step(iteration)
+        self.profiler.record("AresBot.on_step", start)
 
         if self.build_order_runner.chosen_opening != "4GateRush":
+            start = time.perf_counter()
             self._macro()
+            self.profiler.record("MyBot._macro", start)
+
+        self.profiler.record("MyBot.on_step", step_start)
+
+    def register_behavior(self, behavior) -> None:
+        # behaviors execute when registered, their commands get the priority of the behavior
+        with self.action_coalescer.issued_by(behavior):
+            if not self.profiler:
+                super(MyBot, self).register_behavior(behavior)
+                return
+
+            start = time.perf_counter()
+            super(MyBot, self).register_behavior(behavior)
+            self.profiler.record(f"behavior:{behavior.__class__.__name__}", start)
+
+    def do(
+        self,
+        action: UnitCommand,
+        subtract_cost: bool = False,
+        subtract_supply: bool = False,
+        can_afford_check: bool = False,
+        ignore_warning: bool = False,
+    ) -> bool:
+        """Same as `BotAI.do`, but the command is sent by the action coalescer with the rest of the frame"""
+        if not super(MyBot, self).do(action, subtract_cost, subtract_supply, can_afford_check, ignore_warning):
+            return False
+        if isinstance(action, UnitCommand):
+            self.actions.pop()
+            self.action_coalescer.add(action)
+        return True
+
+    def give_same_action(
+        self,
+        order: AbilityId,
+        unit_tags: Iterable[int],
+        target: Optional[Union[Point2, Unit, int]] = None,
+        queue: bool = False,
+    ) -> None:
+        self.action_coalescer.add_same(order, unit_tags, target, queue)
+
+    async def _after_step(self) -> int:
+        await self.action_coalescer.flush()
+        return await super(MyBot, self)._after_step()
+
+    async def on_end(self, game_result: Result) -> None:
+        await super(MyBot, self).on_end(game_result)
+
+        self.flow_field.close()
+        if self.profiler:
+            self.profiler.write_report(f"{self.opponent_id}-{self.race.name.lower()}")
+        if self.recorder:
+            self.recorder.close()
+        if self.results_store:
+            self.results_store.add_game(
+                self._results_opponent_id,
+                self.race,
+                GameRecord(
+                    build=self.build_order_runner.chosen_opening,
+                    result=game_result.name,
+                    duration=int(self.time),
+                    enemy_race=self.enemy_race.name,
+                    map_name=self.game_info.map_name,
+                ),
+            )
+            self.results_store.close()
+
+    @property
+    def _results_opponent_id(self) -> str:
+        """Opponent the results are kept for, the test opponent in debug games like the ares data manager does"""
+        return TEST_OPPONENT_ID if self.config[DEBUG] else str(self.opponent_id)
+
+    def _choose_opening(self) -> str:
+        """Next opening from the `Cycle` of this opponent, or of the enemy race if the opponent has none"""
+        build_choices: dict = self.config[BUILD_CHOICES]
+        opponent_id: str = self._results_opponent_id
+        key = opponent_id if opponent_id in build_choices else self.enemy_race.name
+        return self.results_store.choose_opening(opponent_id, self.race, build_choices[key][CYCLE])
 
     async def on_unit_created(self, unit: Unit) -> None:
         """
@@ -165,44 +343,55 @@ class MyBot(AresBot):
 
         self.mediator.assign_role(tag=unit.tag, role=UnitRole.ATTACKING)
 
+    async def on_building_construction_started(self, unit: Unit) -> None:
+        await super(MyBot, self).on_building_construction_started(unit)
+
+        self.chrono_queue.add(unit)
+        self.pylon_coverage.add(unit)
+        self.structure_index.add(unit)
+        self.placement_batcher.invalidate(unit.position)
+
+    async def on_building_construction_complete(self, unit: Unit) -> None:
+        await super(MyBot, self).on_building_construction_complete(unit)
+
+        self.chrono_queue.complete(unit)
+        self.pylon_coverage.complete(unit)
+        self.structure_index.complete(unit)
+        self.base_threats.add(self, unit)
+        self.base_ownership.add(unit)
+
+    async def on_unit_type_changed(self, unit: Unit, previous_type: UnitID) -> None:
+        await super(MyBot, self).on_unit_type_changed(unit, previous_type)
+
+        if unit.is_structure:
+            self.chrono_queue.change_type(unit)
+            self.structure_index.change_type(unit)
+
+    async def on_unit_destroyed(self, unit_tag: int) -> None:
+        await super(MyBot, self).on_unit_destroyed(unit_tag)
+
+        if position := self.structure_index.position_of(unit_tag):
+            self.placement_batcher.invalidate(position)
+
+        self.chrono_queue.remove(unit_tag)
+        self.pylon_coverage.remove(unit_tag)
+        self.structure_index.remove(unit_tag)
+        self.base_threats.remove(unit_tag)
+        self.base_ownership.remove(unit_tag)
+        self.command_memory.remove(unit_tag)
+        if self.harass_manager:
+            self.harass_manager.remove(unit_tag)
+
     def _macro(self) -> None:
         self.build_location = self.start_location
         if self.mediator.is_position_safe(position=self.start_location, grid=self.mediator.get_ground_grid):
             self.build_location = self.mediator.find_closest_safe_spot(from_pos=self.start_location, grid=self.mediator.get_ground_grid, radius=50)
 
-                    # ares-sc2 Mining behavior
+        # ares-sc2 Mining behavior
         # https://aressc2.github.io/ares-sc2/api_reference/behaviors/macro_behaviors.html#ares.behaviors.macro.mining.Mining
         self.register_behavior(Mining())
 
         # set up a simple macro plan, this could be extended if making a full macro bot, see docs here:
         # https://aressc2.github.io/ares-sc2/tutorials/managing_production.html#setting-up-a-macroplan
-        macro_plan: MacroPlan = MacroPlan()
-        macro_plan.add(ChronoController())
-        macro_plan.add(RestorePower())
-
-        # After 60 seconds we can assume we need Pylons at the bases we own
-        if self.time > 120:
-            macro_plan.add(TownhallPylonController())
-
-        if self.build_order_runner.chosen_opening != "4GateRush" or self.time > 300:
-            if self.build_order_runner.build_completed:
-                macro_plan.add(AutoSupply(base_location=self.build_location))
-                macro_plan.add(BuildWorkers(to_count=min(90, len(self.townhalls) * 21 + 3))) # TODO: check the mineral fields we have and * 2 that instead of using townhalls
-                macro_plan.add(GasBuildingController(to_count=len(self.townhalls) * 2))
-                macro_plan.add(ExpansionController(to_count=len(self.expansion_locations_list), max_pending=2))
-                macro_plan.add(UpgradeController(DESIRED_UPGRADES[self.race], self.build_location))
-
-
-                macro_plan.add(SpawnController(ARMY_COMPS[self.race], spawn_target=self.current_base_target))
-
-                if len(self.townhalls) > 3:
-                    macro_plan.add(ProductionController(ARMY_COMPS[self.race], self.build_location, (400, 200)))
-        elif self.build_order_runner.build_completed:
-            macro_plan.add(AutoSupply(base_location=self.build_location))
-            macro_plan.add(BuildWorkers(to_count=min(90, len(self.townhalls) * 21 + 3)))  # TODO: check the mineral fields we have and * 2 that instead of using townhalls
-            macro_plan.add(ExpansionController(to_count=len(self.expansion_locations_list), max_pending=2))
-            macro_plan.add(SpawnController(ARMY_COMPS[self.race], spawn_target=self.current_base_target))
-            macro_plan.add(ProductionController(ARMY_COMPS[self.race], self.build_location, (400, 200)))
-
-
-        self.register_behavior(macro_plan)
+        # its behaviors are only rebuilt when one of their inputs changes, see `MacroPlanCache`
+        self.register_behavior(self.macro_plan_cache.get_plan(self, self.build_location))
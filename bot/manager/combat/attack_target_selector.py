@@ -0,0 +1,92 @@
+# attack_target_selector.py
+"""
+Shared attack target selection for the combat managers. The chosen target is cached and only recalculated when the
+set of known enemy structures changes, the farthest structure is tracked incrementally instead of sorting every
+enemy structure each frame.
+"""
+
+from typing import TYPE_CHECKING, Optional
+
+from loguru import logger
+from sc2.position import Point2
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+# Before this time (in seconds) we always attack the enemy spawn
+EARLY_GAME_TIME: float = 240.0
+
+
+class AttackTargetSelector:
+    """Pick the general point our army should attack
+
+    Early game this is the enemy spawn, later it is the enemy structure farthest from their spawn, and once no
+    structures are known we cycle through the expansion locations.
+
+    Attributes:
+        ai: Bot object that will be running the game
+        distances: Squared distance from the enemy spawn of every known enemy structure, by tag
+        positions: Position of every known enemy structure, by tag
+        farthest_tag: Tag of the structure farthest from the enemy spawn, None if no structures are known
+    """
+
+    def __init__(self, ai: "AresBot"):
+        self.ai: "AresBot" = ai
+        self.distances: dict[int, float] = {}
+        self.positions: dict[int, Point2] = {}
+        self.farthest_tag: Optional[int] = None
+
+        self._known_tags: set[int] = set()
+
+    @property
+    def target(self) -> Point2:
+        """What is the general point we would like to attack"""
+
+        # Its still early game, just head to the enemy spawn, no need for anything fancy
+        if self.ai.time < EARLY_GAME_TIME:
+            return self.ai.enemy_start_locations[0]
+
+        enemy_structures = self.ai.enemy_structures
+        tags: set[int] = enemy_structures.tags
+        if tags != self._known_tags:
+            self._update_structures(enemy_structures, tags)
+
+        if self.farthest_tag is not None:
+            return self.positions[self.farthest_tag]
+
+        # cycle through expansion locations
+        if self.ai.is_visible(self.ai.current_base_target):
+            self.ai.current_base_target = next(self.ai.expansions_generator)
+
+        return self.ai.current_base_target
+
+    def _update_structures(self, enemy_structures, tags: set[int]) -> None:
+        """Apply the difference between the known structures and the structures seen this frame"""
+        removed: set[int] = self._known_tags - tags
+        added: set[int] = tags - self._known_tags
+        previous_farthest: Optional[int] = self.farthest_tag
+
+        for tag in removed:
+            del self.distances[tag]
+            del self.positions[tag]
+
+        if added:
+            enemy_spawn: Point2 = self.ai.enemy_start_locations[0]
+            for structure in enemy_structures:
+                if structure.tag in added:
+                    position: Point2 = structure.position
+                    self.positions[structure.tag] = position
+                    self.distances[structure.tag] = position.distance_to_point2(enemy_spawn) ** 2
+
+        if self.farthest_tag in removed or self.farthest_tag is None:
+            # only a full scan when the current target is gone, which is rare compared to frames
+            self.farthest_tag = max(self.distances, key=self.distances.__getitem__) if self.distances else None
+        else:
+            for tag in added:
+                if self.distances[tag] > self.distances[self.farthest_tag]:
+                    self.farthest_tag = tag
+
+        self._known_tags = tags
+
+        if self.farthest_tag != previous_farthest and self.farthest_tag is not None:
+            logger.info(f"{self.ai.time_formatted} New attack target at {self.positions[self.farthest_tag]}")
@@ -13,7 +13,7 @@ from ares.behaviors.combat.group import KeepGroupSafe, PathGroupToTarget, AMoveG
 from ares.behaviors.combat.individual import PathUnitToTarget, AMove, StutterUnitBack, KeepUnitSafe, ShootTargetInRange
 from ares.consts import UnitRole, UnitTreeQueryType, ALL_STRUCTURES, EngagementResult
 
-from cython_extensions.units_utils import cy_closest_to, cy_in_attack_range, cy_sorted_by_distance_to
+from cython_extensions.units_utils import cy_closest_to, cy_in_attack_range
 from cython_extensions.combat_utils import cy_pick_enemy_target
 
 from ares.managers.manager import Manager
@@ -23,40 +23,57 @@ from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
 
+from bot.combat.avoid_aoe_decision import AvoidAOEDecision
+from bot.combat.battle_simulator import ArmyArrays, simulate
 from bot.combat.burrow_decision import BurrowDecision
+from bot.combat.engagement_cache import EngagementCache
+from bot.combat.group.group_burrow_decision import GroupBurrowDecision
+from bot.combat.group.group_flow_field_move import GroupFlowFieldMove
 from bot.combat.group.group_up import GroupUp
 
+if TYPE_CHECKING:
+    from ares import AresBot
+
 COMMON_UNIT_IGNORE_TYPES: set[UnitID] = {
     UnitID.EGG,
     UnitID.LARVA,
 }
 
+COMBAT: str = "Combat"
+ENGAGEMENT_ESTIMATOR: str = "EngagementEstimator"
+CAN_WIN_FIGHT: str = "CanWinFight"
+BATTLE_SIMULATOR: str = "Simulator"
+
 class AttackManager(Manager):
 
+    def __init__(self, ai: "AresBot", config: Dict, mediator: ManagerMediator):
+        super().__init__(ai, config, mediator)
+
+        # can_win_fight is expensive, only run it again when either army changes
+        self.engagement_cache: EngagementCache = EngagementCache()
+        self.use_battle_simulator: bool = (
+            (self.config.get(COMBAT) or {}).get(ENGAGEMENT_ESTIMATOR, CAN_WIN_FIGHT) == BATTLE_SIMULATOR
+        )
+
     def should_attack(self, forces: Units, enemy: Units) -> bool:
         """Determine if we are currently attacking or should start our attack"""
-        return (self.ai.build_order_runner.chosen_opening == "4GateRush" and self.ai.supply_army > 6) or self.ai.mediator.can_win_fight(own_units=forces, enemy_units=enemy, timing_adjust=False, good_positioning=False, workers_do_no_damage=True).value > EngagementResult.LOSS_MARGINAL.value or self.ai.supply_left <= 0 # If we are not going to lose badly then engage
-        # return False
+        if self.ai.build_order_runner.chosen_opening == "4GateRush" and self.ai.supply_army > 6:
+            return True
 
-    @property
-    def attack_target(self) -> Point2:
-        """What is the general point we would like to attack"""
-
-        # Its still early game, just head to the enemy spawn, no need for anything fancy
-        if self.ai.time < 240.0:
-            return self.ai.enemy_start_locations[0]
-        elif self.ai.enemy_structures:
-            distance_from = cy_sorted_by_distance_to(self.ai.enemy_structures, self.ai.enemy_start_locations[0])
-            farthest = distance_from[len(distance_from) - 1]
-            logger.info(f"Farthest structure is {farthest.name} at {farthest.position}")
-            return farthest.position
-        else:
-            # cycle through expansion locations
-            if self.ai.is_visible(self.ai.current_base_target):
-                self.ai.current_base_target = next(self.ai.expansions_generator)
+        # If we are not going to lose badly then engage, once engaged only a clear loss makes us retreat
+        engage: bool = self.engagement_cache.should_engage(self.ai, forces, enemy, self._simulate_fight)
+        return engage or self.ai.supply_left <= 0
 
-            return self.ai.current_base_target
+    def _simulate_fight(self, forces: Units, enemy: Units) -> EngagementResult:
+        if self.use_battle_simulator:
+            return simulate(ArmyArrays.from_units(forces), ArmyArrays.from_units(enemy)).engagement_result()
 
+        return self.ai.mediator.can_win_fight(own_units=forces, enemy_units=enemy, timing_adjust=False, good_positioning=False, workers_do_no_damage=True)
+
+    @property
+    def attack_target(self) -> Point2:
+        """What is the general point we would like to attack, see `AttackTargetSelector`"""
+        return self.ai.attack_target_selector.target
 
     async def update(self, iteration: int) -> None:
 
@@ -77,16 +94,27 @@ class AttackManager(Manager):
         # get a ground grid to path on, this already contains enemy influence
         grid: np.ndarray = self.ai.mediator.get_ground_grid
 
+        # units standing in a storm, bile, ... dodge first, their group command below loses to the dodge
+        for unit in self.ai.aoe_danger.in_danger(forces):
+            avoid_grid: np.ndarray = self.ai.mediator.get_air_grid if unit.is_flying else grid
+            self.ai.register_behavior(AvoidAOEDecision(unit, avoid_grid))
+
+        # one pass over every unit that can burrow, detection comes from `ai.detection_grid`
+        self.ai.register_behavior(GroupBurrowDecision(forces))
+
         # make a single call to self.attack_target property
         # otherwise it keep calculating for every unit
         target: Point2 = self.attack_target
         close_to = self.ai.mediator.get_cached_enemy_army().in_distance_between(target, 0, 20)
 
-
+        # computed in a worker thread, the group keeps following the previous field until the new one is ready
+        self.ai.flow_field.request(target, grid)
 
         if self.should_attack(forces, close_to):
 
             # attacking_group_maneuver.add(StutterGroupForward(forces, {u.tag for u in forces}, forces.center, target, close_to))
+            attacking_group_maneuver.add(GroupFlowFieldMove(forces, target))
+            # until the first flow field is ready
             attacking_group_maneuver.add(AMoveGroup(forces, {u.tag for u in forces}, target))
         else:
             attacking_group_maneuver.add(StutterGroupBack(forces, {u.tag for u in forces}, forces.center, group_location, grid))
@@ -2,9 +2,131 @@
 """
 Controls the defensive units of the bot, primarily to defend the different bases we own. All units initially start as
 part of the defense before being assigned to one of the other units as needed. See combat_manager.py for more info.
+
+The threat on every base comes from `ai.base_ownership` in one pass: the supply of the enemy units standing on the cells
+each base owns. Bases under threat pull the closest attacking units, by ground distance, into the `BASE_DEFENDER` role
+until the supply defending them covers the threat, and hand them back to the attack once the threat is gone.
 """
 
+from typing import TYPE_CHECKING, Dict
+
+import numpy as np
+from ares import ManagerMediator
+from ares.consts import UnitRole
 from ares.managers.manager import Manager
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.position import Point2
+from sc2.unit import Unit
+from sc2.units import Units
+
+from bot.combat.group.group_a_move import GroupAMove
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+COMMON_UNIT_IGNORE_TYPES: set[UnitID] = {
+    UnitID.EGG,
+    UnitID.LARVA,
+}
+
+# Enemy supply a base must have on it before we pull units back, a scouting worker is not a threat
+MIN_THREAT_SUPPLY: float = 2.0
+# Supply sent per enemy supply threatening a base
+DEFENSE_SUPPLY_RATIO: float = 1.5
+
 
 class CombatDefenseManager(Manager):
-    pass
+    """
+    Defend the bases we own with units taken from the attack
+
+    Attributes:
+        assigned: Base each of our defenders defends, defender tag -> townhall tag
+    """
+
+    def __init__(self, ai: "AresBot", config: Dict, mediator: ManagerMediator):
+        super().__init__(ai, config, mediator)
+
+        self.assigned: dict[int, int] = {}
+        self._supply: dict[UnitID, float] = {}
+
+    def supply_of(self, type_id: UnitID) -> float:
+        """Supply of a unit type, looked up once per type"""
+        if type_id not in self._supply:
+            self._supply[type_id] = float(self.ai.game_data.units[type_id.value]._proto.food_required)
+        return self._supply[type_id]
+
+    async def update(self, iteration: int) -> None:
+        ownership = self.ai.base_ownership
+        if not ownership.ready or not ownership.bases:
+            return
+
+        enemies: list[Unit] = [u for u in self.ai.enemy_units if u.type_id not in COMMON_UNIT_IGNORE_TYPES]
+        weights = np.fromiter((self.supply_of(u.type_id) for u in enemies), dtype=np.float64, count=len(enemies))
+        threat, centers = ownership.threats(enemies, weights)
+        threatened: dict[int, int] = {
+            tag: index for index, tag in enumerate(ownership.bases) if threat[index] >= MIN_THREAT_SUPPLY
+        }
+
+        defenders: Units = self.manager_mediator.get_units_from_role(role=UnitRole.BASE_DEFENDER)
+        defender_tags: set[int] = defenders.tags
+        released: set[int] = {tag for tag in defender_tags if self.assigned.get(tag) not in threatened}
+        kept: set[int] = defender_tags - released
+        self.assigned = {tag: base for tag, base in self.assigned.items() if tag in kept}
+
+        recruited: set[int] = self._recruit(threatened, threat)
+
+        if released:
+            self.manager_mediator.batch_assign_role(tags=released, role=UnitRole.ATTACKING)
+        if recruited:
+            self.manager_mediator.batch_assign_role(tags=recruited, role=UnitRole.BASE_DEFENDER)
+
+        # one group per threatened base, all moving onto the center of the enemies there
+        groups: dict[int, list[Unit]] = {}
+        for unit in defenders:
+            if unit.tag in kept:
+                groups.setdefault(self.assigned[unit.tag], []).append(unit)
+        for tag in recruited:
+            if unit := self.ai.unit_tag_dict.get(tag):
+                groups.setdefault(self.assigned[tag], []).append(unit)
+        for base_tag, group in groups.items():
+            x, y = centers[threatened[base_tag]]
+            self.ai.register_behavior(GroupAMove(group, Point2((float(x), float(y)))))
+
+    def _recruit(self, threatened: dict[int, int], threat: np.ndarray) -> set[int]:
+        """Assign the closest attacking units to each threatened base until its threat is covered, worst first"""
+        if not threatened:
+            return set()
+        candidates: list[Unit] = list(self.manager_mediator.get_units_from_role(role=UnitRole.ATTACKING))
+        if not candidates:
+            return set()
+
+        ownership = self.ai.base_ownership
+        positions = np.fromiter(
+            (coordinate for unit in candidates for coordinate in unit.position),
+            dtype=np.float64,
+            count=2 * len(candidates),
+        ).reshape(-1, 2)
+        supply = np.fromiter((self.supply_of(u.type_id) for u in candidates), dtype=np.float64, count=len(candidates))
+        available = np.ones(len(candidates), dtype=bool)
+
+        defending = np.zeros(len(ownership.bases))
+        for tag, base_tag in self.assigned.items():
+            if (unit := self.ai.unit_tag_dict.get(tag)) is not None and base_tag in threatened:
+                defending[threatened[base_tag]] += self.supply_of(unit.type_id)
+
+        recruited: set[int] = set()
+        for base_tag, index in sorted(threatened.items(), key=lambda item: -threat[item[1]]):
+            needed = threat[index] * DEFENSE_SUPPLY_RATIO - defending[index]
+            if needed <= 0 or not available.any():
+                continue
+
+            distances = np.where(available, ownership.distances_to(index, positions), np.inf)
+            order = np.argsort(distances, kind="stable")
+            order = order[np.isfinite(distances[order])]
+            # closest first, up to and including the unit that covers what is needed
+            taken = order[: int(np.searchsorted(np.cumsum(supply[order]), needed)) + 1]
+            available[taken] = False
+            for i in taken:
+                recruited.add(candidates[i].tag)
+                self.assigned[candidates[i].tag] = base_tag
+        return recruited
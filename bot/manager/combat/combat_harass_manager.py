@@ -1,10 +1,15 @@
 # combat_harass_manager.py
 """
 Handle controlling our harassing units
+
+Squads are kept in a tag -> squad dictionary with the tags of each squad in a set, maintained from role changes and unit
+deaths instead of being rebuilt every frame: units given the `HARASSING` role join the closest squad (or start a new
+one), units that lose it or die leave theirs. Each squad caches its harass target until the target is cleared or the
+squad changes.
 """
 from enum import Enum
-from itertools import cycle
-from typing import TYPE_CHECKING, Dict, Set
+from itertools import count
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Set
 
 from loguru import logger
 
@@ -18,15 +23,38 @@ from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
 
+from bot.combat.base_threat_index import TOWNHALL_TYPES
+from bot.combat.group.group_a_move import GroupAMove
+
 if TYPE_CHECKING:
     from ares import AresBot
 
+# New harassers this close to a squad join it, otherwise they start their own
+SQUAD_JOIN_DISTANCE: float = 15.0
+# A squad this close to its target with no enemy structure left around it has cleared it
+TARGET_CLEARED_DISTANCE: float = 8.0
+# Later than this, squads look for an enemy base closer than the enemy main
+OTHER_TARGETS_TIME: float = 180.0
+
 class HarassOrders(str, Enum):
     pass
 
 class HarassSquad:
-    order: HarassOrders
-    forces: Units
+    """
+    A group of harassing units
+
+    Attributes:
+        squad_id: Identifies the squad for its lifetime
+        tags: Tags of the units in the squad
+        target: Cached harass point, None when it must be found again
+        cleared: Last harass point the squad cleared, not picked again right away
+    """
+
+    def __init__(self, squad_id: int):
+        self.squad_id: int = squad_id
+        self.tags: set[int] = set()
+        self.target: Optional[Point2] = None
+        self.cleared: Optional[Point2] = None
 
 #HARASS_COMPOSITION : dict[Race, set] = {
 #    Race.Protoss: {
@@ -43,41 +71,115 @@ class HarassManager(Manager):
     def __init__(self, ai: "AresBot", config: Dict, mediator: ManagerMediator):
         super().__init__(ai, config, mediator)
 
-        self.squads : list[HarassSquad] = None
+        self.squads : dict[int, HarassSquad] = {}
+        # unit tag -> squad id
+        self.squad_of : dict[int, int] = {}
+        self._squad_ids = count()
 
     async def update(self, iteration: int) -> None:
         # logger.info("HarassManager update")
 
-        # List of all units assigned to the Harassing role
-        forces: Units = self.ai.mediator.get_units_from_role(role=UnitRole.HARASSING)
-        pass
-
-    def _update_squad_units(self, forces: Units):
-        """Update the units in the squad"""
-
-        # Cleanup the squads
-        for squad in self.squads:
-            missing = squad.forces.tags_not_in(forces.tags)
-            if missing:
-                squad.forces.remove(missing)
-
-        # Remove empty squads
-        self.squads = [squad for squad in self.squads if squad.forces]
-
-        # for any Force unit not already in a squad
-        owned_tags : set[int]
-        for squad in self.squads:
-            owned_tags.union(squad.forces.tags)
-
-        missing = forces.tags_not_in(owned_tags)
-
-    def _process_squad(self, forces: Units) -> None:
+        # Tags assigned to the Harassing role, only the difference with the squads we know of is processed
+        harassing: Set[int] = self.ai.mediator.get_unit_role_dict.get(UnitRole.HARASSING, set())
+        self._update_squad_units(harassing)
+
+        for squad in self.squads.values():
+            self._process_squad(squad)
+
+    def assign(self, tags: Iterable[int]) -> None:
+        """Give units the Harassing role and put them in squads right away"""
+        tags = set(tags)
+        self.manager_mediator.batch_assign_role(tags=tags, role=UnitRole.HARASSING)
+        self._join_squads(tags - self.squad_of.keys())
+
+    def remove(self, tag: int) -> None:
+        """A unit died or stopped harassing, safe to call with any tag"""
+        squad_id = self.squad_of.pop(tag, None)
+        if squad_id is None:
+            return
+
+        squad = self.squads[squad_id]
+        squad.tags.discard(tag)
+        squad.target = None
+        if not squad.tags:
+            del self.squads[squad_id]
+
+    def _update_squad_units(self, harassing: Set[int]):
+        """Update the units in the squads from the changes to the Harassing role since the last frame"""
+        for tag in self.squad_of.keys() - harassing:
+            self.remove(tag)
+
+        if joined := harassing - self.squad_of.keys():
+            self._join_squads(joined)
+
+    def _join_squads(self, tags: Set[int]) -> None:
+        """Each unit joins the closest squad within `SQUAD_JOIN_DISTANCE`, or starts a new squad"""
+        centers: dict[int, Point2] = {
+            squad_id: center for squad_id, squad in self.squads.items() if (center := self._center(squad)) is not None
+        }
+        for tag in tags:
+            unit: Optional[Unit] = self.ai.unit_tag_dict.get(tag)
+            if unit is None:
+                continue
+
+            squad_id = min(centers, key=lambda i: unit.distance_to(centers[i]), default=None)
+            if squad_id is None or unit.distance_to(centers[squad_id]) > SQUAD_JOIN_DISTANCE:
+                squad_id = next(self._squad_ids)
+                self.squads[squad_id] = HarassSquad(squad_id)
+                centers[squad_id] = unit.position
+
+            squad = self.squads[squad_id]
+            squad.tags.add(tag)
+            squad.target = None
+            self.squad_of[tag] = squad_id
+
+    def _center(self, squad: HarassSquad) -> Optional[Point2]:
+        units: list[Unit] = [unit for tag in squad.tags if (unit := self.ai.unit_tag_dict.get(tag)) is not None]
+        if not units:
+            return None
+        return Point2((sum(u.position.x for u in units) / len(units), sum(u.position.y for u in units) / len(units)))
+
+    def _process_squad(self, squad: HarassSquad) -> None:
         """Process a squad of harassing units"""
-        pass
-
-    def _find_harass_point(self, forces: Units) -> Point2:
-        """Find a target point for harassing units to move to"""
-        if self.ai.time > 180:  # If we are later than 3 minutes, see if there is another target for us to try
-            pass
-
-        return self.ai.enemy_start_locations[0]
\ No newline at end of file
+        forces: list[Unit] = [unit for tag in squad.tags if (unit := self.ai.unit_tag_dict.get(tag)) is not None]
+        if not forces:
+            return
+
+        if squad.target is not None and self._target_cleared(squad.target, forces):
+            logger.info(f"{self.ai.time_formatted} Harass squad {squad.squad_id} cleared {squad.target}")
+            squad.cleared, squad.target = squad.target, None
+        if squad.target is None:
+            squad.target = self._find_harass_point(forces, squad.cleared)
+
+        self.ai.register_behavior(GroupAMove(forces, squad.target))
+
+    def _target_cleared(self, target: Point2, forces: list[Unit]) -> bool:
+        """The squad reached its target and no enemy structure is left there"""
+        if not any(unit.distance_to(target) < TARGET_CLEARED_DISTANCE for unit in forces):
+            return False
+        return not self.ai.enemy_structures.closer_than(TARGET_CLEARED_DISTANCE, target)
+
+    def _find_harass_point(self, forces: list[Unit], cleared: Optional[Point2]) -> Point2:
+        """Find a target point for harassing units to move to, other than the point they just `cleared`"""
+
+        def is_cleared(point: Point2) -> bool:
+            return cleared is not None and point.distance_to(cleared) < TARGET_CLEARED_DISTANCE
+
+        enemy_main: Point2 = self.ai.enemy_start_locations[0]
+        # If we are later than 3 minutes, see if there is another target for us to try
+        if self.ai.time > OTHER_TARGETS_TIME:
+            townhalls: list[Unit] = [
+                s
+                for s in self.ai.enemy_structures
+                if s.type_id in TOWNHALL_TYPES
+                and s.distance_to(enemy_main) > TARGET_CLEARED_DISTANCE
+                and not is_cleared(s.position)
+            ]
+            if townhalls:
+                return cy_closest_to(forces[0].position, townhalls).position
+
+        if not is_cleared(enemy_main):
+            return enemy_main
+        # the enemy main is cleared and no other base is known, try the expansion closest to it
+        expansions: list[Point2] = [p for p in self.ai.expansion_locations_list if not is_cleared(p)]
+        return min(expansions, key=lambda p: p.distance_to(enemy_main), default=enemy_main)
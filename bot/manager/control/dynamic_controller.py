@@ -10,6 +10,8 @@ from ares.managers.manager import Manager
 class DynamicController(Manager):
 
     controller : Manager = None
+    # Run every step before `controller`, e.g. base defense claiming units before the attack takes the rest
+    supporting_controllers : list[Manager] = []
 
     def set_controller(self, controller: Manager):
         """
@@ -20,6 +22,20 @@ class DynamicController(Manager):
         self.controller = controller
         self.controller.initialise()
 
+        if self.ai.profiler:
+            self.ai.profiler.instrument_manager(self.controller)
+
+    def add_supporting_controller(self, controller: Manager):
+        """
+        Add a controller that runs alongside the main one, same NOTE as `set_controller`
+        """
+        logger.info(f"{self.ai.time_formatted} Adding supporting controller: {controller.__class__.__name__}")
+        self.supporting_controllers = self.supporting_controllers + [controller]
+        controller.initialise()
+
+        if self.ai.profiler:
+            self.ai.profiler.instrument_manager(controller)
+
     def remove_controller(self):
         """
         Remove the current controller and reset it to None
@@ -28,6 +44,9 @@ class DynamicController(Manager):
         self.controller = None
 
     async def update(self, iteration: int) -> None:
+        for controller in self.supporting_controllers:
+            await controller.update(iteration)
+
         if self.controller is None:
             return
 
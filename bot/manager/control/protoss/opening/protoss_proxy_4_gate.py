@@ -2,16 +2,18 @@
 """
 Proxy 4 gate opening for Protoss. This cheese normally either wins or dies but is a really good cheese to have
 """
+from typing import TYPE_CHECKING, Dict
+
 import numpy as np
-from cython_extensions import cy_sorted_by_distance_to, cy_pick_enemy_target, cy_in_attack_range
+from cython_extensions import cy_pick_enemy_target, cy_in_attack_range
 from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
 
-from ares import UnitRole
+from ares import ManagerMediator, UnitRole
 from ares.behaviors.combat import CombatManeuver
 from ares.behaviors.combat.group import AMoveGroup
-from ares.behaviors.combat.individual import WorkerKiteBack, KeepUnitSafe, AttackTarget, ShootTargetInRange, AMove
+from ares.behaviors.combat.individual import KeepUnitSafe, AttackTarget, ShootTargetInRange, AMove
 from ares.behaviors.macro import MacroPlan, Mining, RestorePower, SpawnController, AutoSupply, BuildWorkers, \
     ProductionController, ExpansionController, GasBuildingController, UpgradeController
 from ares.consts import ALL_WORKER_TYPES, UnitTreeQueryType, ALL_STRUCTURES
@@ -21,10 +23,15 @@ from loguru import logger
 from sc2.ids.unit_typeid import UnitTypeId as UnitID
 from sc2.ids.upgrade_id import UpgradeId
 
-from ares.managers.squad_manager import UnitSquad
 from bot.combat.group.group_a_move import GroupAMove
+from bot.combat.group.group_priority_attack import GroupPriorityAttack
+from bot.combat.group.group_worker_kite_back import GroupWorkerKiteBack
+from bot.combat.squad_clusterer import SquadClusterer, TrackedSquad
 from bot.macro.protoss.chrono_controller import ChronoController
 
+if TYPE_CHECKING:
+    from ares import AresBot
+
 ARMY_COMP : dict = {
     UnitID.ZEALOT: {"proportion": 1, "priority": 0},
 }
@@ -48,13 +55,10 @@ COMMON_UNIT_IGNORE_TYPES: set[UnitID] = {
     UnitID.LARVA,
 }
 
-PRIORITY_ATTACK_ORDER : list[UnitID] = [
-    UnitID.SPINECRAWLER,
-    UnitID.SPINECRAWLERUPROOTED,
-    UnitID.BUNKER,
-    UnitID.PHOTONCANNON,
-    UnitID.QUEEN,
-]
+# How far from the center of its squad an attacking unit may be
+SQUAD_RADIUS : float = 9.0
+# Enemies this close to a squad are picked as focus fire targets, see `GroupPriorityAttack`
+SQUAD_TARGET_DISTANCE : float = 12.0
 
 class Proxy4GateManager(Manager):
     """
@@ -70,13 +74,21 @@ class Proxy4GateManager(Manager):
     start_proxy_attack : bool = False # Initial start, after this triggers it stays on
     worker_mineralline_defense_message : bool = False # We only want to send the tag once, so this is to keep track of that
 
+    def __init__(self, ai: "AresBot", config: Dict, mediator: ManagerMediator):
+        super().__init__(ai, config, mediator)
+
+        # squads keep their id from frame to frame, see `SquadClusterer`
+        self.squad_clusterer: SquadClusterer = SquadClusterer(radius=SQUAD_RADIUS)
+
     async def update(self, iteration: int) -> None:
         """
         
         """
 
         zealots = self.ai.units(UnitID.ZEALOT)
-        squads: list[UnitSquad] = self.manager_mediator.get_squads(role=UnitRole.ATTACKING, squad_radius=9.0)
+        squads: list[TrackedSquad] = self.squad_clusterer.update(
+            self.manager_mediator.get_units_from_role(role=UnitRole.ATTACKING)
+        )
 
         if zealots.amount > 2 and not self.start_proxy_attack:
             await self.ai.chat_send(f"Tag:{self.ai.time_formatted}_BeginZealotAttack")
@@ -98,8 +110,18 @@ class Proxy4GateManager(Manager):
             else:
                 target = zealots.center
 
-            for squad in squads:
+            # the enemies close to every squad in one query
+            near_squads: list[Units] = self.ai.mediator.get_units_in_range(
+                start_points=[squad.squad_position for squad in squads],
+                distances=SQUAD_TARGET_DISTANCE,
+                query_tree=UnitTreeQueryType.AllEnemy,
+            )
+            for squad, near_enemies in zip(squads, near_squads):
+                close_enemies: Units = Units(
+                    [u for u in near_enemies if u.type_id not in COMMON_UNIT_IGNORE_TYPES], self.ai
+                )
                 combat_plan: CombatManeuver = CombatManeuver()
+                combat_plan.add(GroupPriorityAttack(squad.squad_units, close_enemies))
                 combat_plan.add(GroupAMove(squad.squad_units, target))
                 self.ai.register_behavior(combat_plan)
 
@@ -174,29 +196,29 @@ class Proxy4GateManager(Manager):
         """
         Check if we are being attacked in a mineral line, if so add the workers in that line to the defense and attack
         the enemy if we would likely win. This will also return the workers to idle after the attack
+
+        Which mineral lines are threatened, and by whom, comes from `ai.base_threats`, updated once per frame.
         """
 
+        threats = self.ai.base_threats
         defending_workers : set[int] = set()
-        townhalls = self.ai.townhalls.ready
-        for townhall in townhalls:
-            # Get the list of minerals close to the townhall
-            mineral_fields = self.ai.mineral_field.closer_than(10, townhall)
-
-            # Get the enemy units near the minerals
-            enemy_units = self.ai.enemy_units.closer_than(10, mineral_fields.center)
-
-            if enemy_units:
-                # There are enemies near, get the boys and defend the walls
-                workers = self.ai.workers.closer_than(10, mineral_fields.center)
-                self.manager_mediator.batch_assign_role(tags=workers.tags, role=UnitRole.DEFENDING)
-                defending_workers.update(workers.tags)
-
-                for worker in workers:
-                    if not self.worker_mineralline_defense_message:
-                        await self.ai.chat_send(f"Tag:{self.ai.time_formatted}_WorkerMinerallineDefense")
-                        self.worker_mineralline_defense_message = True
-                    # TODO: better targeting, for now the first will work
-                    self.ai.register_behavior(WorkerKiteBack(unit=worker, target=enemy_units[0]))
+        for townhall_tag, enemy_units in threats.enemies.items():
+            # There are enemies near, get the boys and defend the walls
+            workers: list[Unit] = threats.workers.get(townhall_tag, [])
+            mineral_fields: Units = self.ai.mineral_field
+            if not workers or not mineral_fields:
+                continue
+
+            defending_workers.update(worker.tag for worker in workers)
+            if not self.worker_mineralline_defense_message:
+                await self.ai.chat_send(f"Tag:{self.ai.time_formatted}_WorkerMinerallineDefense")
+                self.worker_mineralline_defense_message = True
+            # TODO: better targeting, for now the first will work
+            mineral_field: Unit = mineral_fields.closest_to(threats.centers[townhall_tag])
+            self.ai.register_behavior(GroupWorkerKiteBack(workers, enemy_units[0], mineral_field))
+
+        if defending_workers:
+            self.manager_mediator.batch_assign_role(tags=defending_workers, role=UnitRole.DEFENDING)
 
         current_defenders = self.ai.mediator.get_units_from_role(role=UnitRole.DEFENDING, unit_type=ALL_WORKER_TYPES)
         release_workers = current_defenders.tags.difference(defending_workers)
@@ -205,18 +227,5 @@ class Proxy4GateManager(Manager):
 
     @property
     def attack_target(self) -> Point2:
-        """What is the general point we would like to attack"""
-
-        # Its still early game, just head to the enemy spawn, no need for anything fancy
-        if self.ai.time < 240.0:
-            return self.ai.enemy_start_locations[0]
-        elif self.ai.enemy_structures:
-            distance_from = cy_sorted_by_distance_to(self.ai.enemy_structures, self.ai.enemy_start_locations[0])
-            farthest = distance_from[len(distance_from) - 1]
-            return farthest.position
-        else:
-            # cycle through expansion locations
-            if self.ai.is_visible(self.ai.current_base_target):
-                self.ai.current_base_target = next(self.ai.expansions_generator)
-
-            return self.ai.current_base_target
+        """What is the general point we would like to attack, see `AttackTargetSelector`"""
+        return self.ai.attack_target_selector.target
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING, Optional, Union
 
-from cython_extensions import cy_distance_to_squared, cy_towards
+from cython_extensions import cy_towards
 from cython_extensions.combat_utils import cy_attack_ready
 from cython_extensions.units_utils import cy_closest_to, cy_in_attack_range
 from sc2.constants import ALL_GAS
@@ -28,6 +28,7 @@ from ares.consts import (
     ADD_ONS,
     ALL_STRUCTURES,
     BUILDS,
+    BuildOrderTargetOptions,
     GAS_BUILDINGS,
     GATEWAY_UNITS,
     OPENING_BUILD_ORDER,
@@ -39,6 +40,18 @@ from ares.consts import (
 )
 from ares.dicts.structure_to_building_size import STRUCTURE_TO_BUILDING_SIZE
 
+from bot.macro.placement_plan import PlacementPlan, target_name
+from bot.macro.structure_index import StructureIndex
+
+# A persistent builder is free once a structure stands (almost finished) this close to its build target
+STRUCTURE_AT_TARGET_DISTANCE: float = 6**0.5
+# Protoss structures must be placed this close to a pylon
+PYLON_POWER_RADIUS: float = 6.5
+# Free planned spots confirmed with the game in the same batched query, the closest valid one is used
+PLANNED_POSITIONS_CHECKED: int = 4
+# Targets ares places at its own precomputed wall and ramp spots, never taken from the placement plan
+UNPLANNED_TARGETS: tuple[str, ...] = ("WALL", "RAMP")
+
 
 class CustomBuildOrderRunner(BuildOrderRunner):
     """
@@ -62,6 +75,83 @@ class CustomBuildOrderRunner(BuildOrderRunner):
 
     """
 
+    def placement_anchors(self) -> dict[str, Point2]:
+        """Position of every build target the `PlacementPlan` should cover, by target name"""
+        anchors: dict[str, Point2] = {}
+        for option in BuildOrderTargetOptions:
+            if any(unplanned in option.name for unplanned in UNPLANNED_TARGETS):
+                continue
+            if isinstance(position := self._get_target(option), Point2):
+                anchors[option.name] = position
+        return anchors
+
+    async def get_position(
+        self, structure_type: UnitID, target: Optional[str]
+    ) -> Optional[Point2]:
+        """Take a free spot from the precomputed placement plan, only ask the game when it has none
+
+        Planned spots are submitted to `ai.placement_batcher`, sent with every other placement of the frame and used
+        once answered on a following frame, the step waits meanwhile.
+        """
+        free: list[Point2] = self._planned_positions(structure_type, target)
+        if free:
+            # units or creep may still be in the way
+            ability: AbilityId = self.ai.game_data.units[
+                structure_type.value
+            ].creation_ability.id
+            futures = [
+                self.ai.placement_batcher.submit(ability, position) for position in free
+            ]
+            if not all(future.done() for future in futures):
+                return None
+            if position := next(
+                (p for p, future in zip(free, futures) if future.result()), None
+            ):
+                return position
+
+        # the placement searches of ares share the batched query and its cached answers
+        with self.ai.placement_batcher.routed():
+            return await super().get_position(structure_type, target)
+
+    def _planned_positions(
+        self, structure_type: UnitID, target: Optional[str]
+    ) -> list[Point2]:
+        """Up to `PLANNED_POSITIONS_CHECKED` planned spots free of structures, closest to the target first"""
+        plan: PlacementPlan = self.ai.placement_plan
+        if not plan.ready or target is None or structure_type in GAS_BUILDINGS:
+            return []
+
+        footprint_radius: float = self.ai.game_data.units[
+            structure_type.value
+        ].footprint_radius
+        structure_index: StructureIndex = self.ai.structure_index
+        # spots a worker is already on its way to build at
+        pending: list[Point2] = [
+            building[TARGET]
+            for building in self.mediator.get_building_tracker_dict.values()
+        ]
+        needs_power: bool = (
+            self.ai.race == Race.Protoss and structure_type != UnitID.PYLON
+        )
+        free: list[Point2] = []
+        for position in plan.candidates(target_name(target), footprint_radius):
+            if not structure_index.is_footprint_free(position, footprint_radius):
+                continue
+            if any(
+                abs(position.x - p.x) < footprint_radius * 2
+                and abs(position.y - p.y) < footprint_radius * 2
+                for p in pending
+            ):
+                continue
+            if needs_power and not structure_index.has_type_near(
+                UnitID.PYLON, position, PYLON_POWER_RADIUS
+            ):
+                continue
+            free.append(position)
+            if len(free) == PLANNED_POSITIONS_CHECKED:
+                break
+        return free
+
     async def do_step(self, step: BuildOrderStep) -> None:
         """
         Runs a specific build order step.
@@ -71,14 +161,12 @@ class CustomBuildOrderRunner(BuildOrderRunner):
         step : BuildOrderStep
             The build order step to run.
         """
+        # kept up to date by MyBot from structure events, see `StructureIndex`
+        structure_index: StructureIndex = self.ai.structure_index
         if (
             step.command in GATEWAY_UNITS
             and UpgradeId.WARPGATERESEARCH in self.ai.state.upgrades
-            and [
-                g
-                for g in self.mediator.get_own_structures_dict[UnitID.GATEWAY]
-                if g.is_ready and g.is_idle
-            ]
+            and structure_index.idle_ready(self.ai, UnitID.GATEWAY)
         ):
             return
 
@@ -119,12 +207,9 @@ class CustomBuildOrderRunner(BuildOrderRunner):
                             break
                         if worker.tag in building_tracker:
                             target: Point2 = building_tracker[worker.tag][TARGET]
-                            if [
-                                s
-                                for s in self.ai.structures
-                                if cy_distance_to_squared(s.position, target) < 6
-                                and s.build_progress > 0.95
-                            ]:
+                            if structure_index.has_structure_near(
+                                self.ai, target, STRUCTURE_AT_TARGET_DISTANCE, min_progress=0.95
+                            ):
                                 persistent_worker_available = True
                 if worker := self.mediator.select_worker(
                     target_position=self.current_build_position,
@@ -168,23 +253,19 @@ class CustomBuildOrderRunner(BuildOrderRunner):
 
             elif command == AbilityId.EFFECT_CHRONOBOOST:
                 if chrono_target := self.get_structure(step.target):
-                    if available_nexuses := [
-                        th
-                        for th in self.ai.townhalls
-                        if th.energy >= 50 and th.is_ready
-                    ]:
-                        available_nexuses[0](
+                    if available_nexus := structure_index.ready_with_energy(
+                        self.ai, UnitID.NEXUS, 50
+                    ):
+                        available_nexus(
                             AbilityId.EFFECT_CHRONOBOOSTENERGYCOST, chrono_target
                         )
                         self.current_step_started = True
 
             elif command == AbilityId.UPGRADETOORBITAL_ORBITALCOMMAND:
-                if available_ccs := [
-                    th
-                    for th in self.ai.townhalls
-                    if th.is_idle and th.is_ready and th.type_id == UnitID.COMMANDCENTER
-                ]:
-                    available_ccs[0](AbilityId.UPGRADETOORBITAL_ORBITALCOMMAND)
+                if available_cc := structure_index.idle_ready(
+                    self.ai, UnitID.COMMANDCENTER
+                ):
+                    available_cc(AbilityId.UPGRADETOORBITAL_ORBITALCOMMAND)
                     self.current_step_started = True
 
             elif command == BuildOrderOptions.WORKER_SCOUT:
@@ -243,12 +324,10 @@ class CustomBuildOrderRunner(BuildOrderRunner):
                                 in self.mediator.get_unit_role_dict[UnitRole.GATHERING],
                             )
                 elif command in ADD_ONS and self.ai.can_afford(command):
-                    if base_structures := [
-                        s
-                        for s in self.ai.structures
-                        if s.is_ready and s.is_idle and s.type_id == ADD_ONS[command]
-                    ]:
-                        base_structures[0].build(command)
+                    if base_structure := structure_index.idle_ready(
+                        self.ai, ADD_ONS[command]
+                    ):
+                        base_structure.build(command)
                 # should have already started upgraded when step started,
                 # backup here just in case
                 elif isinstance(command, UpgradeId):
@@ -0,0 +1,81 @@
+# distance_field.py
+"""
+Weighted ground distance fields on grids indexed [x, y] like the grids of ares. Moving into a cell costs the value of
+that cell, times sqrt(2) diagonally, and cells at inf are never entered. Fields are computed by rounds of vectorized
+relaxation, each cell taking the cheapest of its 8 neighbours plus the cost of the move, until a round changes nothing:
+the same distances as Dijkstra on the 8 neighbour graph, with every round a handful of whole grid NumPy operations that
+release the GIL and can run in a worker thread.
+"""
+
+import numpy as np
+
+# (dx, dy, length) of the moves to the 8 neighbouring cells
+NEIGHBOUR_STEPS: list[tuple[int, int, float]] = [
+    (1, 0, 1.0),
+    (-1, 0, 1.0),
+    (0, 1, 1.0),
+    (0, -1, 1.0),
+    (1, 1, np.sqrt(2)),
+    (1, -1, np.sqrt(2)),
+    (-1, 1, np.sqrt(2)),
+    (-1, -1, np.sqrt(2)),
+]
+# Cells that can be entered this much further from a target that cannot than the closest one also start its field
+SOURCE_MARGIN: float = 1.5
+
+
+def shifted(offset: int) -> slice:
+    """Slice of the cells that have a neighbour `offset` cells away along one axis"""
+    return slice(offset, None) if offset > 0 else slice(None, offset) if offset < 0 else slice(None)
+
+
+def relax(distances: np.ndarray, costs: np.ndarray, rounds: int) -> bool:
+    """Run up to `rounds` rounds of relaxation on `distances` in place, False once a round changes nothing
+
+    `costs` is the cost of moving into each cell, same shape as `distances`, inf for cells that cannot be entered.
+    """
+    straight = costs.astype(np.float32)
+    diagonal = straight * np.float32(np.sqrt(2))
+    for _ in range(rounds):
+        previous = distances.copy()
+        for dx, dy, length in NEIGHBOUR_STEPS:
+            step_costs = straight if length == 1.0 else diagonal
+            to_cells = distances[shifted(dx), shifted(dy)]
+            np.minimum(
+                to_cells, distances[shifted(-dx), shifted(-dy)] + step_costs[shifted(dx), shifted(dy)], out=to_cells
+            )
+        if np.array_equal(previous, distances):
+            return False
+    return True
+
+
+def sources(costs: np.ndarray, x: int, y: int) -> np.ndarray:
+    """Starting distances of a field to the cell (x, y), inf everywhere else
+
+    When (x, y) cannot be entered, like a target inside a structure footprint or on a cliff, the field starts instead
+    from the cells that can be entered closest to it, within `SOURCE_MARGIN` of the closest, at their straight line
+    distance to it. All inf when no cell can be entered.
+    """
+    distances = np.full(costs.shape, np.inf, dtype=np.float32)
+    if np.isfinite(costs[x, y]):
+        distances[x, y] = 0.0
+        return distances
+
+    cells_x, cells_y = np.nonzero(np.isfinite(costs))
+    if cells_x.size == 0:
+        return distances
+    straight = np.hypot(cells_x - x, cells_y - y).astype(np.float32)
+    closest = straight <= straight.min() + SOURCE_MARGIN
+    distances[cells_x[closest], cells_y[closest]] = straight[closest]
+    return distances
+
+
+def distance_field(costs: np.ndarray, x: int, y: int, rounds: int = 64) -> np.ndarray:
+    """Weighted ground distance of every cell to the cell (x, y), inf for the cells that cannot reach it
+
+    See `sources` for targets that cannot be entered.
+    """
+    distances = sources(costs, x, y)
+    while relax(distances, costs, rounds):
+        pass
+    return distances
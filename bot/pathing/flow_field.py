@@ -0,0 +1,130 @@
+# flow_field.py
+"""
+One path toward the attack target shared by the whole army. A weighted distance field is computed from the target over
+the ground grid of ares, which already carries enemy influence, and from it the cell `LOOKAHEAD_CELLS` steps further
+down the path of every cell, so a unit's next waypoint is a single lookup at its cell whatever the size of the army.
+
+The field is computed in a worker thread, the frame carries on with the previous field in the meantime, and it is only
+recomputed once the target moves `TARGET_CHANGE_DISTANCE` or more than `CHANGED_CELLS` cells of the grid change cost.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+from sc2.position import Point2
+
+from bot.pathing.distance_field import NEIGHBOUR_STEPS, distance_field, shifted
+
+# Cells between a unit and the waypoint it is sent to, a power of two
+LOOKAHEAD_CELLS: int = 8
+# The field is recomputed once the target moves this far
+TARGET_CHANGE_DISTANCE: float = 4.0
+# ... or once this many cells changed cost by more than COST_TOLERANCE, enemy influence moves with the enemy army
+CHANGED_CELLS: int = 200
+COST_TOLERANCE: float = 1.0
+
+
+def lookahead(distances: np.ndarray) -> np.ndarray:
+    """Flat index of the cell `LOOKAHEAD_CELLS` steps down the path of each cell, indexed like `distances.ravel()`
+
+    Each cell steps to its closest neighbour when that neighbour is closer to the target, the steps are then doubled
+    up by pointer jumping.
+    """
+    width, height = distances.shape
+    cells = np.arange(width * height).reshape(width, height)
+    best = distances.copy()
+    step = cells.copy()
+    for dx, dy, _ in NEIGHBOUR_STEPS:
+        # the neighbour (x + dx, y + dy) of the cells that have one
+        neighbours = distances[shifted(dx), shifted(dy)]
+        to_best = best[shifted(-dx), shifted(-dy)]
+        closer = neighbours < to_best
+        to_best[closer] = neighbours[closer]
+        step[shifted(-dx), shifted(-dy)][closer] = cells[shifted(dx), shifted(dy)][closer]
+
+    jump = step.ravel()
+    for _ in range(int(np.log2(LOOKAHEAD_CELLS))):
+        jump = jump[jump]
+    return jump
+
+
+def compute(costs: np.ndarray, x: int, y: int) -> tuple[np.ndarray, np.ndarray]:
+    """Distance field to (x, y) and its lookahead, run in the worker thread"""
+    distances = distance_field(costs, x, y)
+    return distances, lookahead(distances)
+
+
+class FlowField:
+    """Path field toward a target, recomputed in the background
+
+    Attributes:
+        target: Target of the field in use, None until the first field is ready
+        distances: Weighted distance of each cell to the target, indexed [x, y]
+        computed: Fields computed since the start of the game
+    """
+
+    def __init__(self):
+        self.target: Optional[Point2] = None
+        self.distances: Optional[np.ndarray] = None
+        self.computed: int = 0
+
+        self._jump: Optional[np.ndarray] = None
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flow-field")
+        self._future: Optional[Future] = None
+        # target and costs of the field being computed, or of the last one
+        self._pending_target: Optional[Point2] = None
+        self._costs: Optional[np.ndarray] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._jump is not None
+
+    def request(self, target: Point2, grid: np.ndarray) -> None:
+        """Ask for a field toward `target` on `grid`, an ares grid with enemy influence, call once per frame"""
+        if self._future is not None:
+            if not self._future.done():
+                return
+            self._collect()
+
+        if not self._needs_update(target, grid):
+            return
+        self._pending_target = target
+        self._costs = grid.copy()
+        x = min(max(int(target.x), 0), grid.shape[0] - 1)
+        y = min(max(int(target.y), 0), grid.shape[1] - 1)
+        self._future = self._executor.submit(compute, self._costs, x, y)
+
+    def waypoints(self, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Next waypoint of each (x, y) row of `positions` as cell centers, and its distance left to the target"""
+        width, height = self.distances.shape
+        x = np.clip(positions[:, 0].astype(np.int64), 0, width - 1)
+        y = np.clip(positions[:, 1].astype(np.int64), 0, height - 1)
+        to = self._jump[x * height + y]
+        waypoints = np.stack([to // height, to % height], axis=1) + 0.5
+        return waypoints, self.distances[x, y]
+
+    def close(self) -> None:
+        """Stop the worker thread, a field still being computed is dropped"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _collect(self) -> None:
+        future, self._future = self._future, None
+        try:
+            self.distances, self._jump = future.result()
+        except Exception as error:
+            logger.warning(f"Could not compute the flow field: {error}")
+            return
+        self.target = self._pending_target
+        self.computed += 1
+
+    def _needs_update(self, target: Point2, grid: np.ndarray) -> bool:
+        if self._costs is None or self._costs.shape != grid.shape:
+            return True
+        if self._pending_target.distance_to(target) > TARGET_CHANGE_DISTANCE:
+            return True
+        # inf - inf is nan and does not count, cells becoming pathable or blocked do
+        with np.errstate(invalid="ignore"):
+            changed = np.count_nonzero(np.abs(grid - self._costs) > COST_TOLERANCE)
+        return changed > CHANGED_CELLS
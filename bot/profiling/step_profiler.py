@@ -0,0 +1,132 @@
+# step_profiler.py
+"""
+Optional step time profiler. When enabled from `config.yml` every manager update, every registered behavior and the
+parent `AresBot.on_step` are timed and kept in fixed size ring buffers so a slow frame can be traced back to the
+component that caused it. A per game report is written to `data/` when the game ends.
+
+When profiling is disabled nothing is wrapped and the bot keeps a `None` profiler, so the only cost is a single
+attribute check per step.
+"""
+
+import json
+import time
+from functools import wraps
+from os import path, makedirs
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+from loguru import logger
+
+PROFILING: str = "Profiling"
+PROFILING_ENABLED: str = "Enabled"
+PROFILING_BUFFER_SIZE: str = "BufferSize"
+PROFILING_REPORT_DIR: str = "ReportDirectory"
+
+DEFAULT_BUFFER_SIZE: int = 4096
+DEFAULT_REPORT_DIR: str = "data"
+
+
+class RingBuffer:
+    """Fixed size buffer of step times in milliseconds, oldest samples are overwritten once full.
+
+    Attributes:
+        samples: Backing array of the buffer
+        count: Total number of samples ever recorded
+        total: Sum of every sample ever recorded, used for the mean
+        max: Largest sample ever recorded, kept outside the buffer so it is never overwritten
+    """
+
+    __slots__ = ("samples", "count", "total", "max")
+
+    def __init__(self, size: int):
+        self.samples: np.ndarray = np.zeros(size, dtype=np.float64)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.samples[self.count % len(self.samples)] = value
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def summary(self) -> dict:
+        """Percentiles are taken over the samples still in the buffer, count, mean and max over the whole game."""
+        if self.count == 0:
+            return {"count": 0}
+
+        window = self.samples[: min(self.count, len(self.samples))]
+        p50, p95, p99 = np.percentile(window, [50, 95, 99])
+        return {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "max": self.max,
+        }
+
+
+class StepProfiler:
+    """Collect per component step times
+
+    Components are identified by name, e.g. `AresBot.on_step`, `manager:AttackManager` or `behavior:MacroPlan`.
+    """
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE, report_dir: str = DEFAULT_REPORT_DIR):
+        self.buffer_size: int = buffer_size
+        self.report_dir: str = report_dir
+        self.buffers: dict[str, RingBuffer] = {}
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["StepProfiler"]:
+        """Create a profiler if the `Profiling` section of the config enables it, otherwise return None"""
+        settings: dict = config.get(PROFILING) or {}
+        if not settings.get(PROFILING_ENABLED, False):
+            return None
+
+        return cls(
+            buffer_size=settings.get(PROFILING_BUFFER_SIZE, DEFAULT_BUFFER_SIZE),
+            report_dir=settings.get(PROFILING_REPORT_DIR, DEFAULT_REPORT_DIR),
+        )
+
+    def record(self, component: str, start: float) -> None:
+        """Record the time since `start` (a `time.perf_counter()` value) for the given component"""
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        buffer = self.buffers.get(component)
+        if buffer is None:
+            buffer = self.buffers[component] = RingBuffer(self.buffer_size)
+        buffer.add(elapsed_ms)
+
+    def wrap_async(self, component: str, func: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+        """Wrap a coroutine function so every call is recorded under `component`"""
+
+        @wraps(func)
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.record(component, start)
+
+        return timed
+
+    def instrument_manager(self, manager) -> None:
+        """Replace the `update` method of a single manager instance with a timed version"""
+        manager.update = self.wrap_async(f"manager:{manager.__class__.__name__}", manager.update)
+
+    def report(self) -> dict:
+        """Summary of every component, slowest p99 first"""
+        summaries = {name: buffer.summary() for name, buffer in self.buffers.items()}
+        return dict(sorted(summaries.items(), key=lambda item: item[1].get("p99", 0.0), reverse=True))
+
+    def write_report(self, game_name: str) -> str:
+        """Write the report as json to the report directory and return the file path"""
+        makedirs(self.report_dir, exist_ok=True)
+        file_path = path.join(self.report_dir, f"profile-{game_name}-{int(time.time())}.json")
+        with open(file_path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+        logger.info(f"Step profile written to {file_path}")
+        return file_path
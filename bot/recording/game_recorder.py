@@ -0,0 +1,164 @@
+# game_recorder.py
+"""
+Optional game recorder. When enabled from `config.yml` the observation of every step and every action sent to the
+client are written to `data/recordings/` in the format of `observation_log.py`, so a game can be replayed to the bot
+later (see `harness/run_harness.py --recording`) or inspected frame by frame.
+
+The step only hands references to a queue, serializing and compressing happen on a background thread so recording
+adds no measurable time to `on_step`. When recording is disabled the bot keeps a `None` recorder.
+"""
+
+import queue
+import threading
+import time
+from functools import wraps
+from os import makedirs, path
+from typing import TYPE_CHECKING, Optional
+
+from loguru import logger
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from bot.recording.observation_log import DEFAULT_CHUNK_FRAMES, DEFAULT_COMPRESSION_LEVEL, ObservationLogWriter
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+RECORDER: str = "Recorder"
+RECORDER_ENABLED: str = "Enabled"
+RECORDER_DIRECTORY: str = "Directory"
+RECORDER_CHUNK_FRAMES: str = "ChunkFrames"
+RECORDER_COMPRESSION_LEVEL: str = "CompressionLevel"
+
+DEFAULT_DIRECTORY: str = "data/recordings"
+
+
+class GameRecorder:
+    """Record what the bot saw and did on every step
+
+    Attributes:
+        directory: Where recordings are written
+        chunk_frames: Frames per compressed chunk
+        compression_level: zlib level, 1 (fast) to 9 (small)
+        file_path: The recording of the current game, None before `start`
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_DIRECTORY,
+        chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+    ):
+        self.directory: str = directory
+        self.chunk_frames: int = chunk_frames
+        self.compression_level: int = compression_level
+        self.file_path: Optional[str] = None
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        # observation of the current step, submitted with its actions once the next step starts
+        self._pending: Optional[tuple[int, sc_pb.ResponseObservation]] = None
+        self._actions: list[sc_pb.RequestAction] = []
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["GameRecorder"]:
+        """Create a recorder if the `Recorder` section of the config enables it, otherwise return None"""
+        settings: dict = config.get(RECORDER) or {}
+        if not settings.get(RECORDER_ENABLED, False):
+            return None
+
+        return cls(
+            directory=settings.get(RECORDER_DIRECTORY, DEFAULT_DIRECTORY),
+            chunk_frames=settings.get(RECORDER_CHUNK_FRAMES, DEFAULT_CHUNK_FRAMES),
+            compression_level=settings.get(RECORDER_COMPRESSION_LEVEL, DEFAULT_COMPRESSION_LEVEL),
+        )
+
+    def start(self, ai: "AresBot", game_name: str, metadata: Optional[dict] = None) -> str:
+        """Open the recording, write the static game data and start capturing the actions sent by `ai`
+
+        Call from `on_start`, the file path is returned.
+        """
+        makedirs(self.directory, exist_ok=True)
+        self.file_path = path.join(self.directory, f"{game_name}-{int(time.time())}.nyxrec")
+        writer = ObservationLogWriter(self.file_path, self.chunk_frames, self.compression_level)
+
+        info = {
+            "player_id": ai.player_id,
+            "game_step": ai.client.game_step,
+            "base_build": ai.base_build,
+            "map_name": ai.game_info.map_name,
+            "race": ai.race.name,
+            "enemy_race": ai.enemy_race.name,
+            **(metadata or {}),
+        }
+        self._queue.put(("info", info, ai.game_info._proto, ai.game_data))
+        self._thread = threading.Thread(target=self._run, args=(writer,), name="GameRecorder", daemon=True)
+        self._thread.start()
+
+        self._capture_actions(ai.client)
+        logger.info(f"Recording game to {self.file_path}")
+        return self.file_path
+
+    def record_step(self, ai: "AresBot") -> None:
+        """Call at the start of every `on_step`: the previous step is complete, queue it and hold on to this one"""
+        self._submit()
+        self._pending = (ai.state.game_loop, ai.state.response_observation)
+
+    def close(self) -> None:
+        """Write the last step and wait for the writer, call from `on_end`"""
+        if self._thread is None:
+            return
+        self._submit()
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        logger.info(f"Recording written to {self.file_path}")
+
+    def _capture_actions(self, client) -> None:
+        """Every action request goes through `client._execute`, keep a reference to each one"""
+        execute = client._execute
+
+        @wraps(execute)
+        async def recorded(**kwargs):
+            action = kwargs.get("action")
+            if action is not None:
+                self._actions.append(action)
+            return await execute(**kwargs)
+
+        client._execute = recorded
+
+    def _submit(self) -> None:
+        # the writer stopped on an error, queued frames would only pile up until the end of the game
+        if self._pending is not None and self._thread is not None and self._thread.is_alive():
+            game_loop, observation = self._pending
+            self._queue.put(("frame", game_loop, observation, self._actions))
+            self._pending = None
+        self._actions = []
+
+    def _run(self, writer: ObservationLogWriter) -> None:
+        """Writer thread, the only place protos are serialized and compressed"""
+        try:
+            while (item := self._queue.get()) is not None:
+                if item[0] == "frame":
+                    _, game_loop, observation, requests = item
+                    actions = sc_pb.RequestAction()
+                    for request in requests:
+                        actions.actions.extend(request.actions)
+                    writer.write_frame(game_loop, observation.SerializeToString(), actions.SerializeToString())
+                else:
+                    _, info, game_info, game_data = item
+                    data = sc_pb.ResponseData(
+                        abilities=[ability._proto for ability in game_data.abilities.values()],
+                        units=[unit._proto for unit in game_data.units.values()],
+                        upgrades=[upgrade._proto for upgrade in game_data.upgrades.values()],
+                    )
+                    writer.write_info(info, game_info.SerializeToString(), data.SerializeToString())
+        except Exception as error:
+            logger.error(f"Game recorder stopped: {error}")
+            # free what was queued before the step notices the writer is gone
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+        finally:
+            writer.close()
@@ -0,0 +1,217 @@
+# observation_log.py
+"""
+File format for game recordings: what the bot saw and what it did on every step.
+
+The file is append only and made of length prefixed chunks, each compressed on its own:
+
+    file   := MAGIC chunk*
+    chunk  := header(kind, first_frame, frame_count, compressed_length, raw_length) zlib(payload)
+    INFO   := blob(metadata json) blob(ResponseGameInfo) blob(ResponseData)
+    FRMS   := (game_loop, observation_length, actions_length, ResponseObservation, RequestAction)*
+
+A chunk is only written once it is complete, so a game that crashes leaves a readable file and a reader that finds a
+truncated chunk at the end simply stops before it. Reading memory maps the file and only walks the chunk headers, a
+frame is found with a binary search over the chunks and only the chunk holding it is decompressed.
+"""
+
+import json
+import mmap
+import struct
+import zlib
+from bisect import bisect_right
+from os import path
+from typing import Iterator, NamedTuple, Optional
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+MAGIC: bytes = b"NYXOBS01"
+INFO_CHUNK: bytes = b"INFO"
+FRAMES_CHUNK: bytes = b"FRMS"
+CHUNK_HEADER: struct.Struct = struct.Struct("<4sIIII")
+FRAME_HEADER: struct.Struct = struct.Struct("<III")
+BLOB_LENGTH: struct.Struct = struct.Struct("<I")
+
+DEFAULT_CHUNK_FRAMES: int = 64
+DEFAULT_COMPRESSION_LEVEL: int = 6
+
+
+class RecordedFrame(NamedTuple):
+    index: int
+    game_loop: int
+    observation: sc_pb.ResponseObservation
+    actions: sc_pb.RequestAction
+
+
+class ObservationLogWriter:
+    """Append frames to a recording, buffering `chunk_frames` frames per compressed chunk
+
+    Not thread safe, `GameRecorder` owns one writer on its background thread.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+    ):
+        self.file_path: str = file_path
+        self.chunk_frames: int = chunk_frames
+        self.compression_level: int = compression_level
+        self.frames_written: int = 0
+
+        is_new = not path.isfile(file_path) or path.getsize(file_path) == 0
+        if not is_new:
+            # appending to an existing recording, continue its frame numbering
+            with ObservationLogReader(file_path) as reader:
+                self.frames_written = len(reader)
+        self._file = open(file_path, "ab")
+        if is_new:
+            self._file.write(MAGIC)
+
+        self._buffer: list[bytes] = []
+        self._buffered_frames: int = 0
+
+    def write_info(self, metadata: dict, game_info: bytes, game_data: bytes) -> None:
+        """Static data of the game, written once before the first frame"""
+        payload = b"".join(
+            BLOB_LENGTH.pack(len(blob)) + blob for blob in (json.dumps(metadata).encode(), game_info, game_data)
+        )
+        self._write_chunk(INFO_CHUNK, self.frames_written, 0, payload)
+
+    def write_frame(self, game_loop: int, observation: bytes, actions: bytes) -> None:
+        """Add a serialized `ResponseObservation` and the `RequestAction` of everything sent that step"""
+        self._buffer.append(FRAME_HEADER.pack(game_loop, len(observation), len(actions)))
+        self._buffer.append(observation)
+        self._buffer.append(actions)
+        self._buffered_frames += 1
+        if self._buffered_frames >= self.chunk_frames:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered frames as a chunk, even if it is not full"""
+        if self._buffered_frames:
+            self._write_chunk(FRAMES_CHUNK, self.frames_written, self._buffered_frames, b"".join(self._buffer))
+            self.frames_written += self._buffered_frames
+            self._buffer = []
+            self._buffered_frames = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+    def _write_chunk(self, kind: bytes, first_frame: int, frame_count: int, payload: bytes) -> None:
+        compressed = zlib.compress(payload, self.compression_level)
+        self._file.write(CHUNK_HEADER.pack(kind, first_frame, frame_count, len(compressed), len(payload)))
+        self._file.write(compressed)
+
+
+class ObservationLogReader:
+    """Memory mapped, lazy reader of a recording
+
+    Attributes:
+        file_path: The recording
+        chunks: (first_frame, frame_count, payload offset, compressed length) of every complete frame chunk
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path: str = file_path
+        self.chunks: list[tuple[int, int, int, int]] = []
+
+        self._file = open(file_path, "rb")
+        self._map: Optional[mmap.mmap] = None
+        self._info: Optional[tuple[int, int]] = None
+        size = path.getsize(file_path)
+        if size >= len(MAGIC):
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._map[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{file_path} is not a recording")
+            self._index(size)
+        self._chunk_starts: list[int] = [chunk[0] for chunk in self.chunks]
+
+    def __enter__(self) -> "ObservationLogReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        if not self.chunks:
+            return 0
+        first_frame, frame_count, _, _ = self.chunks[-1]
+        return first_frame + frame_count
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _index(self, size: int) -> None:
+        """Walk the chunk headers only, stopping at the first incomplete chunk"""
+        offset = len(MAGIC)
+        while offset + CHUNK_HEADER.size <= size:
+            kind, first_frame, frame_count, length, _ = CHUNK_HEADER.unpack_from(self._map, offset)
+            payload_offset = offset + CHUNK_HEADER.size
+            if payload_offset + length > size:
+                break
+            if kind == FRAMES_CHUNK:
+                self.chunks.append((first_frame, frame_count, payload_offset, length))
+            elif kind == INFO_CHUNK and self._info is None:
+                self._info = (payload_offset, length)
+            offset = payload_offset + length
+
+    def _payload(self, offset: int, length: int) -> bytes:
+        return zlib.decompress(self._map[offset : offset + length])
+
+    def info(self) -> tuple[dict, sc_pb.ResponseGameInfo, sc_pb.ResponseData]:
+        """Metadata, game info and game data of the recording"""
+        if self._info is None:
+            raise ValueError(f"{self.file_path} has no game info")
+        payload = self._payload(*self._info)
+        blobs = []
+        offset = 0
+        for _ in range(3):
+            (length,) = BLOB_LENGTH.unpack_from(payload, offset)
+            offset += BLOB_LENGTH.size
+            blobs.append(payload[offset : offset + length])
+            offset += length
+
+        game_info = sc_pb.ResponseGameInfo()
+        game_info.ParseFromString(blobs[1])
+        game_data = sc_pb.ResponseData()
+        game_data.ParseFromString(blobs[2])
+        return json.loads(blobs[0]), game_info, game_data
+
+    def frames(self, start: int = 0, stop: Optional[int] = None) -> Iterator[RecordedFrame]:
+        """Yield frames from `start` up to `stop`, decompressing one chunk at a time"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        chunk_index = max(bisect_right(self._chunk_starts, start) - 1, 0)
+        for first_frame, frame_count, offset, length in self.chunks[chunk_index:]:
+            if first_frame >= stop:
+                return
+            payload = self._payload(offset, length)
+            position = 0
+            for index in range(first_frame, first_frame + frame_count):
+                game_loop, observation_length, actions_length = FRAME_HEADER.unpack_from(payload, position)
+                position += FRAME_HEADER.size
+                if start <= index < stop:
+                    observation = sc_pb.ResponseObservation()
+                    observation.ParseFromString(payload[position : position + observation_length])
+                    actions = sc_pb.RequestAction()
+                    actions.ParseFromString(
+                        payload[position + observation_length : position + observation_length + actions_length]
+                    )
+                    yield RecordedFrame(index, game_loop, observation, actions)
+                position += observation_length + actions_length
+
+    def frame(self, index: int) -> RecordedFrame:
+        """A single frame, only its chunk is decompressed"""
+        if not 0 <= index < len(self):
+            raise IndexError(f"frame {index} is out of range, the recording has {len(self)} frames")
+        return next(self.frames(index, index + 1))
+
+    def observations(self, start: int = 0) -> Iterator[sc_pb.ResponseObservation]:
+        """Just the observations, e.g. to replay them to a bot"""
+        for recorded in self.frames(start):
+            yield recorded.observation
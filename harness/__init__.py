@@ -0,0 +1,4 @@
+"""
+Offline harness: replays recorded observations to the bot through a fake SC2 client so step times can be measured
+without StarCraft II. See `harness/run_harness.py`.
+"""
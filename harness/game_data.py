@@ -0,0 +1,226 @@
+# game_data.py
+"""
+Static game data served by the replay client in place of the `RequestData` answer of a real SC2 client.
+
+Every ability, unit type and upgrade known to python-sc2 gets an entry so lookups never fail, the unit types used by
+the bundled scenarios carry real costs, health, armor and weapons. Numbers are taken from the current ladder patch,
+damage bonuses are left out as nothing in the harness needs them.
+"""
+
+from typing import NamedTuple
+
+from s2clientprotocol import data_pb2
+from s2clientprotocol import sc2api_pb2 as sc_pb
+from sc2.data import Attribute, Race, TargetType
+from sc2.dicts.unit_research_abilities import RESEARCH_INFO
+from sc2.dicts.unit_train_build_abilities import TRAIN_INFO
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.buff_id import BuffId
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.ids.upgrade_id import UpgradeId
+
+LIGHT, ARMORED, BIO, MECH, PSI, MASSIVE, STRUCTURE = (
+    Attribute.Light, Attribute.Armored, Attribute.Biological, Attribute.Mechanical, Attribute.Psionic,
+    Attribute.Massive, Attribute.Structure,
+)
+GROUND, AIR, ANY = TargetType.Ground, TargetType.Air, TargetType.Any
+
+
+class Weapon(NamedTuple):
+    target: TargetType
+    damage: float
+    range: float
+    cooldown: float
+    attacks: int = 1
+
+
+class UnitStats(NamedTuple):
+    race: Race
+    minerals: int
+    vespene: int
+    build_time: float
+    health: float
+    shield: float = 0.0
+    armor: float = 0.0
+    radius: float = 0.5
+    speed: float = 0.0
+    food_required: float = 0.0
+    food_provided: float = 0.0
+    attributes: tuple = ()
+    weapons: tuple = ()
+    sight: float = 9.0
+    footprint: float = 0.0
+
+
+P, Z, T = Race.Protoss, Race.Zerg, Race.Terran
+STRUCTURE_ATTRIBUTES = (ARMORED, STRUCTURE)
+
+UNIT_STATS: dict[UnitID, UnitStats] = {
+    # protoss
+    UnitID.NEXUS: UnitStats(P, 400, 0, 71, 1000, 1000, 1, 2.75, food_provided=15, attributes=(ARMORED, MECH, STRUCTURE), sight=11, footprint=2.5),
+    UnitID.PYLON: UnitStats(P, 100, 0, 18, 200, 200, 1, 1.125, food_provided=8, attributes=STRUCTURE_ATTRIBUTES, footprint=1.0),
+    UnitID.ASSIMILATOR: UnitStats(P, 75, 0, 21, 450, 450, 1, 1.8125, attributes=STRUCTURE_ATTRIBUTES, footprint=1.5),
+    UnitID.GATEWAY: UnitStats(P, 150, 0, 46, 500, 500, 1, 1.8125, attributes=STRUCTURE_ATTRIBUTES, footprint=1.5),
+    UnitID.WARPGATE: UnitStats(P, 150, 0, 7, 500, 500, 1, 1.8125, attributes=STRUCTURE_ATTRIBUTES, footprint=1.5),
+    UnitID.FORGE: UnitStats(P, 150, 0, 32, 400, 400, 1, 1.8125, attributes=STRUCTURE_ATTRIBUTES, footprint=1.5),
+    UnitID.CYBERNETICSCORE: UnitStats(P, 150, 0, 36, 550, 550, 1, 1.8125, attributes=STRUCTURE_ATTRIBUTES, footprint=1.5),
+    UnitID.TWILIGHTCOUNCIL: UnitStats(P, 150, 100, 36, 500, 500, 1, 1.8125, attributes=STRUCTURE_ATTRIBUTES, footprint=1.5),
+    UnitID.ROBOTICSFACILITY: UnitStats(P, 150, 100, 46, 450, 450, 1, 1.8125, attributes=STRUCTURE_ATTRIBUTES, footprint=1.5),
+    UnitID.DARKSHRINE: UnitStats(P, 150, 150, 71, 500, 500, 1, 1.125, attributes=STRUCTURE_ATTRIBUTES, footprint=1.0),
+    UnitID.SHIELDBATTERY: UnitStats(P, 100, 0, 29, 150, 150, 1, 1.125, attributes=STRUCTURE_ATTRIBUTES, footprint=1.0),
+    UnitID.PROBE: UnitStats(P, 50, 0, 12, 20, 20, 0, 0.375, 3.94, 1, attributes=(LIGHT, MECH), weapons=(Weapon(GROUND, 5, 0.1, 1.07),), sight=8),
+    UnitID.ZEALOT: UnitStats(P, 100, 0, 27, 100, 50, 1, 0.5, 3.15, 2, attributes=(LIGHT, BIO), weapons=(Weapon(GROUND, 8, 0.1, 0.86, 2),)),
+    UnitID.STALKER: UnitStats(P, 125, 50, 30, 80, 80, 1, 0.625, 4.13, 2, attributes=(ARMORED, MECH), weapons=(Weapon(ANY, 13, 6, 1.34),), sight=10),
+    UnitID.ADEPT: UnitStats(P, 100, 25, 30, 70, 70, 1, 0.5, 3.5, 2, attributes=(LIGHT, BIO), weapons=(Weapon(GROUND, 10, 4, 1.61),)),
+    UnitID.SENTRY: UnitStats(P, 50, 100, 26, 40, 40, 1, 0.5, 3.15, 2, attributes=(LIGHT, MECH, PSI), weapons=(Weapon(ANY, 6, 5, 1.0),), sight=10),
+    UnitID.IMMORTAL: UnitStats(P, 275, 100, 39, 200, 100, 1, 0.75, 3.15, 4, attributes=(ARMORED, MECH), weapons=(Weapon(GROUND, 20, 6, 1.04),)),
+    UnitID.COLOSSUS: UnitStats(P, 300, 200, 54, 200, 150, 1, 1.0, 3.15, 6, attributes=(ARMORED, MECH, MASSIVE), weapons=(Weapon(GROUND, 10, 7, 1.07, 2),), sight=10),
+    UnitID.DARKTEMPLAR: UnitStats(P, 125, 125, 39, 40, 80, 1, 0.5, 3.94, 2, attributes=(LIGHT, BIO, PSI), weapons=(Weapon(GROUND, 45, 0.1, 1.21),), sight=8),
+    UnitID.OBSERVER: UnitStats(P, 25, 75, 21, 40, 20, 0, 0.5, 2.63, 1, attributes=(LIGHT, MECH), sight=11),
+    # zerg
+    UnitID.HATCHERY: UnitStats(Z, 275, 0, 71, 1500, 0, 1, 2.75, food_provided=6, attributes=(ARMORED, BIO, STRUCTURE), sight=12, footprint=2.5),
+    UnitID.LAIR: UnitStats(Z, 150, 100, 57, 2000, 0, 1, 2.75, food_provided=6, attributes=(ARMORED, BIO, STRUCTURE), sight=12, footprint=2.5),
+    UnitID.EXTRACTOR: UnitStats(Z, 25, 0, 21, 500, 0, 1, 1.8125, attributes=(ARMORED, BIO, STRUCTURE), footprint=1.5),
+    UnitID.SPAWNINGPOOL: UnitStats(Z, 200, 0, 46, 1000, 0, 1, 1.8125, attributes=(ARMORED, BIO, STRUCTURE), footprint=1.5),
+    UnitID.ROACHWARREN: UnitStats(Z, 150, 0, 39, 850, 0, 1, 1.8125, attributes=(ARMORED, BIO, STRUCTURE), footprint=1.5),
+    UnitID.EVOLUTIONCHAMBER: UnitStats(Z, 75, 0, 25, 750, 0, 1, 1.8125, attributes=(ARMORED, BIO, STRUCTURE), footprint=1.5),
+    UnitID.DRONE: UnitStats(Z, 50, 0, 12, 40, 0, 0, 0.375, 3.94, 1, attributes=(LIGHT, BIO), weapons=(Weapon(GROUND, 5, 0.1, 1.07),), sight=8),
+    UnitID.OVERLORD: UnitStats(Z, 100, 0, 18, 200, 0, 0, 1.0, 0.902, food_provided=8, attributes=(ARMORED, BIO), sight=11),
+    UnitID.QUEEN: UnitStats(Z, 150, 0, 36, 175, 0, 1, 0.875, 1.31, 2, attributes=(BIO, PSI), weapons=(Weapon(GROUND, 4, 5, 0.71, 2), Weapon(AIR, 9, 7, 0.71))),
+    UnitID.ZERGLING: UnitStats(Z, 25, 0, 17, 35, 0, 0, 0.375, 4.13, 0.5, attributes=(LIGHT, BIO), weapons=(Weapon(GROUND, 5, 0.1, 0.497),), sight=8),
+    UnitID.ROACH: UnitStats(Z, 75, 25, 19, 145, 0, 1, 0.625, 3.15, 2, attributes=(ARMORED, BIO), weapons=(Weapon(GROUND, 16, 4, 1.43),)),
+    UnitID.RAVAGER: UnitStats(Z, 25, 75, 12, 120, 0, 1, 0.75, 3.85, 3, attributes=(BIO,), weapons=(Weapon(GROUND, 16, 6, 1.14),)),
+    UnitID.HYDRALISK: UnitStats(Z, 100, 50, 24, 90, 0, 0, 0.625, 3.15, 2, attributes=(LIGHT, BIO), weapons=(Weapon(ANY, 12, 5, 0.59),)),
+    # terran
+    UnitID.COMMANDCENTER: UnitStats(T, 400, 0, 71, 1500, 0, 1, 2.75, food_provided=15, attributes=(ARMORED, MECH, STRUCTURE), sight=11, footprint=2.5),
+    UnitID.ORBITALCOMMAND: UnitStats(T, 150, 0, 25, 1500, 0, 1, 2.75, food_provided=15, attributes=(ARMORED, MECH, STRUCTURE), sight=11, footprint=2.5),
+    UnitID.SUPPLYDEPOT: UnitStats(T, 100, 0, 21, 400, 0, 1, 1.125, food_provided=8, attributes=(ARMORED, MECH, STRUCTURE), footprint=1.0),
+    UnitID.SUPPLYDEPOTLOWERED: UnitStats(T, 100, 0, 21, 400, 0, 1, 1.125, food_provided=8, attributes=(ARMORED, MECH, STRUCTURE), footprint=1.0),
+    UnitID.REFINERY: UnitStats(T, 75, 0, 21, 500, 0, 1, 1.8125, attributes=(ARMORED, MECH, STRUCTURE), footprint=1.5),
+    UnitID.BARRACKS: UnitStats(T, 150, 0, 46, 1000, 0, 1, 1.8125, attributes=(ARMORED, MECH, STRUCTURE), footprint=1.5),
+    UnitID.BARRACKSTECHLAB: UnitStats(T, 50, 25, 18, 400, 0, 1, 1.0, attributes=(ARMORED, MECH, STRUCTURE), footprint=1.0),
+    UnitID.ENGINEERINGBAY: UnitStats(T, 125, 0, 25, 850, 0, 1, 1.8125, attributes=(ARMORED, MECH, STRUCTURE), footprint=1.5),
+    UnitID.FACTORY: UnitStats(T, 150, 100, 43, 1250, 0, 1, 1.8125, attributes=(ARMORED, MECH, STRUCTURE), footprint=1.5),
+    UnitID.STARPORT: UnitStats(T, 150, 100, 36, 1300, 0, 1, 1.8125, attributes=(ARMORED, MECH, STRUCTURE), footprint=1.5),
+    UnitID.SCV: UnitStats(T, 50, 0, 12, 45, 0, 0, 0.375, 3.94, 1, attributes=(LIGHT, BIO, MECH), weapons=(Weapon(GROUND, 5, 0.1, 1.07),), sight=8),
+    UnitID.MARINE: UnitStats(T, 50, 0, 18, 45, 0, 0, 0.375, 3.15, 1, attributes=(LIGHT, BIO), weapons=(Weapon(ANY, 6, 5, 0.61),)),
+    UnitID.MARAUDER: UnitStats(T, 100, 25, 21, 125, 0, 1, 0.5625, 3.15, 2, attributes=(ARMORED, BIO), weapons=(Weapon(GROUND, 10, 6, 1.07),), sight=10),
+    UnitID.SIEGETANK: UnitStats(T, 150, 125, 32, 175, 0, 1, 0.875, 3.15, 3, attributes=(ARMORED, MECH), weapons=(Weapon(GROUND, 15, 7, 0.74),), sight=11),
+    UnitID.SIEGETANKSIEGED: UnitStats(T, 150, 125, 32, 175, 0, 1, 0.875, 0, 3, attributes=(ARMORED, MECH), weapons=(Weapon(GROUND, 40, 13, 2.14),), sight=11),
+    UnitID.MEDIVAC: UnitStats(T, 100, 100, 30, 150, 0, 1, 0.75, 3.5, 2, attributes=(ARMORED, MECH), sight=11),
+    # neutral
+    UnitID.MINERALFIELD: UnitStats(Race.NoRace, 0, 0, 0, 0, radius=1.125, attributes=(STRUCTURE,)),
+    UnitID.VESPENEGEYSER: UnitStats(Race.NoRace, 0, 0, 0, 0, radius=1.8125, attributes=(STRUCTURE,)),
+}
+
+UPGRADE_COSTS: dict[UpgradeId, tuple[int, int, float]] = {
+    UpgradeId.WARPGATERESEARCH: (50, 50, 100),
+    UpgradeId.CHARGE: (100, 100, 100),
+    UpgradeId.BLINKTECH: (150, 150, 121),
+    UpgradeId.DARKTEMPLARBLINKUPGRADE: (100, 100, 121),
+    UpgradeId.PROTOSSGROUNDWEAPONSLEVEL1: (100, 100, 129),
+    UpgradeId.PROTOSSGROUNDWEAPONSLEVEL2: (150, 150, 154),
+    UpgradeId.PROTOSSGROUNDWEAPONSLEVEL3: (200, 200, 179),
+    UpgradeId.PROTOSSGROUNDARMORSLEVEL1: (100, 100, 129),
+    UpgradeId.PROTOSSGROUNDARMORSLEVEL2: (150, 150, 154),
+    UpgradeId.PROTOSSGROUNDARMORSLEVEL3: (200, 200, 179),
+    UpgradeId.PROTOSSSHIELDSLEVEL1: (150, 150, 129),
+    UpgradeId.PROTOSSSHIELDSLEVEL2: (225, 225, 154),
+    UpgradeId.PROTOSSSHIELDSLEVEL3: (300, 300, 179),
+}
+DEFAULT_UPGRADE_COST: tuple[int, int, float] = (100, 100, 100)
+
+def _creation_abilities() -> dict[UnitID, AbilityId]:
+    creation: dict[UnitID, AbilityId] = {}
+    for trained in TRAIN_INFO.values():
+        for unit_type, info in trained.items():
+            creation.setdefault(unit_type, info["ability"])
+    return creation
+
+
+def _research_abilities() -> dict[UpgradeId, AbilityId]:
+    research: dict[UpgradeId, AbilityId] = {}
+    for upgrades in RESEARCH_INFO.values():
+        for upgrade, info in upgrades.items():
+            research.setdefault(upgrade, info["ability"])
+    return research
+
+
+CREATION_ABILITIES: dict[UnitID, AbilityId] = _creation_abilities()
+# half the size of the structure placed by each build ability, used to answer placement queries
+BUILD_FOOTPRINTS: dict[int, float] = {
+    CREATION_ABILITIES[unit_type].value: stats.footprint
+    for unit_type, stats in UNIT_STATS.items()
+    if stats.footprint and unit_type in CREATION_ABILITIES
+}
+
+
+def build_response_data() -> sc_pb.ResponseData:
+    """Game data with an entry for every id python-sc2 knows about"""
+    response = sc_pb.ResponseData()
+
+    for ability in AbilityId:
+        if ability.value == 0:
+            continue
+        footprint = BUILD_FOOTPRINTS.get(ability.value, 0.0)
+        response.abilities.add(
+            ability_id=ability.value,
+            link_name=ability.name,
+            button_name=ability.name,
+            friendly_name=ability.name,
+            available=True,
+            target=data_pb2.AbilityData.Point if footprint else data_pb2.AbilityData.PointOrUnit,
+            is_building=bool(footprint),
+            footprint_radius=footprint,
+        )
+
+    for unit_type in UnitID:
+        if unit_type == UnitID.NOTAUNIT:
+            continue
+        stats = UNIT_STATS.get(unit_type)
+        data = response.units.add(
+            unit_id=unit_type.value,
+            name=unit_type.name.title(),
+            available=True,
+            ability_id=CREATION_ABILITIES[unit_type].value if unit_type in CREATION_ABILITIES else 0,
+        )
+        if stats is None:
+            continue
+        data.race = stats.race.value
+        data.mineral_cost = stats.minerals
+        data.vespene_cost = stats.vespene
+        data.build_time = stats.build_time * 22.4
+        data.food_required = stats.food_required
+        data.food_provided = stats.food_provided
+        data.movement_speed = stats.speed
+        data.armor = stats.armor
+        data.sight_range = stats.sight
+        data.attributes.extend(attribute.value for attribute in stats.attributes)
+        for weapon in stats.weapons:
+            data.weapons.add(
+                type=weapon.target.value,
+                damage=weapon.damage,
+                attacks=weapon.attacks,
+                range=weapon.range,
+                speed=weapon.cooldown,
+            )
+
+    research = _research_abilities()
+    for upgrade in UpgradeId:
+        if upgrade == UpgradeId.NULL:
+            continue
+        minerals, vespene, time = UPGRADE_COSTS.get(upgrade, DEFAULT_UPGRADE_COST)
+        response.upgrades.add(
+            upgrade_id=upgrade.value,
+            name=upgrade.name,
+            mineral_cost=minerals,
+            vespene_cost=vespene,
+            research_time=time * 22.4,
+            ability_id=research[upgrade].value if upgrade in research else 0,
+        )
+
+    for buff in BuffId:
+        if buff.value:
+            response.buffs.add(buff_id=buff.value, name=buff.name)
+
+    return response
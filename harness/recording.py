@@ -0,0 +1,60 @@
+# recording.py
+"""
+A recorded game as seen by one player: the static answers of the SC2 client (game info, game data and ping) and the
+observation of every step. The replay client serves a recording to the bot exactly like a real client would.
+"""
+
+from dataclasses import dataclass, field
+from os import path
+from typing import Iterable, Optional
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+from sc2.data import Result
+
+from bot.recording.observation_log import ObservationLogReader
+
+
+@dataclass
+class Recording:
+    """Everything needed to replay a game to a bot
+
+    Attributes:
+        name: Name shown in reports
+        game_info: Answer to `RequestGameInfo`
+        game_data: Answer to `RequestData`
+        frames: Observation of every step, in order, may be a lazy iterable
+        game_step: Game loops between two frames
+        player_id: Player the observations belong to
+        base_build: Client build reported by `RequestPing`
+        opening: Build order the bot should play, None to let the bot choose
+        result: Result reported once the frames run out
+        metadata: Free form details, e.g. the settings a scenario was generated with
+    """
+
+    name: str
+    game_info: sc_pb.ResponseGameInfo
+    game_data: sc_pb.ResponseData
+    frames: Iterable[sc_pb.ResponseObservation]
+    game_step: int = 2
+    player_id: int = 1
+    base_build: int = 0
+    opening: Optional[str] = None
+    result: Result = Result.Tie
+    metadata: dict = field(default_factory=dict)
+
+
+def load_recording(file_path: str) -> Recording:
+    """Open a recording written by `GameRecorder`, frames are read lazily from the memory mapped file"""
+    reader = ObservationLogReader(file_path)
+    metadata, game_info, game_data = reader.info()
+    return Recording(
+        name=path.splitext(path.basename(file_path))[0],
+        game_info=game_info,
+        game_data=game_data,
+        frames=reader.observations(),
+        game_step=metadata.get("game_step", 2),
+        player_id=metadata.get("player_id", 1),
+        base_build=metadata.get("base_build", 0),
+        opening=metadata.get("opening"),
+        metadata=metadata,
+    )
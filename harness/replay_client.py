@@ -0,0 +1,165 @@
+# replay_client.py
+"""
+A python-sc2 `Client` that answers every request from a `Recording` instead of a running SC2 client, so a bot can be
+driven through the normal `_play_game_ai` loop on a machine without StarCraft II.
+
+Every step serves the next recorded observation no matter what the bot did. Actions are accepted and stored per frame,
+queries are answered from the static map grids (placement) or with straight line distances (pathing), debug requests
+are dropped.
+"""
+
+import asyncio
+import math
+from typing import Iterator, Optional
+
+import numpy as np
+from s2clientprotocol import error_pb2, query_pb2, raw_pb2
+from s2clientprotocol import sc2api_pb2 as sc_pb
+from sc2.client import Client
+from sc2.data import Status
+from sc2.protocol import ProtocolError
+
+from harness.game_data import BUILD_FOOTPRINTS
+from harness.recording import Recording
+
+# `Protocol` insists on a websocket, nothing is ever sent through it
+_NO_SOCKET: object = object()
+DEFAULT_FOOTPRINT: float = 1.0
+
+
+class ReplayClient(Client):
+    """Serve a recording to a bot
+
+    Attributes:
+        recording: The recording being replayed
+        frame: Index of the frame currently served
+        frame_actions: Raw actions the bot issued on each frame, indexed like the frames
+        queries: Number of query requests answered
+    """
+
+    def __init__(self, recording: Recording):
+        super().__init__(_NO_SOCKET)
+        self.recording: Recording = recording
+        self.game_step: int = recording.game_step
+        self._player_id: int = recording.player_id
+        self._status = Status.in_game
+
+        self.frame: int = 0
+        self.frame_actions: list[list[raw_pb2.ActionRaw]] = [[]]
+        self.queries: int = 0
+
+        self._frames: Iterator[sc_pb.ResponseObservation] = iter(recording.frames)
+        self._current: Optional[sc_pb.ResponseObservation] = next(self._frames, None)
+        start_raw = recording.game_info.start_raw
+        self._placement: np.ndarray = np.unpackbits(
+            np.frombuffer(start_raw.placement_grid.data, dtype=np.uint8)
+        ).reshape(start_raw.map_size.y, start_raw.map_size.x)
+
+    @property
+    def actions_per_frame(self) -> list[int]:
+        return [len(frame_actions) for frame_actions in self.frame_actions]
+
+    async def _execute(self, **kwargs) -> sc_pb.Response:
+        assert len(kwargs) == 1, "Only one request allowed by the API"
+        (name, request), = kwargs.items()
+        handler = getattr(self, f"_answer_{name}", None)
+        if handler is None:
+            raise ProtocolError(f"['{name} is not supported by the replay client']")
+
+        response = sc_pb.Response()
+        handler(request, response)
+        response.status = self._status.value
+        # a real client waits on the websocket here, let background tasks of the bot run like they would in a game
+        await asyncio.sleep(0)
+        return response
+
+    def _answer_game_info(self, request, response: sc_pb.Response) -> None:
+        response.game_info.CopyFrom(self.recording.game_info)
+
+    def _answer_data(self, request, response: sc_pb.Response) -> None:
+        response.data.CopyFrom(self.recording.game_data)
+
+    def _answer_ping(self, request, response: sc_pb.Response) -> None:
+        response.ping.base_build = self.recording.base_build
+        response.ping.game_version = "replay"
+
+    def _answer_observation(self, request, response: sc_pb.Response) -> None:
+        if self._current is None:
+            # out of frames, end the game the same way a real client does
+            self._status = Status.ended
+            response.observation.player_result.add(
+                player_id=self.recording.player_id, result=self.recording.result.value
+            )
+            return
+        response.observation.CopyFrom(self._current)
+
+    def _answer_step(self, request, response: sc_pb.Response) -> None:
+        self._current = next(self._frames, None)
+        self.frame += 1
+        self.frame_actions.append([])
+        if self._current is not None:
+            response.step.simulation_loop = self._current.observation.game_loop
+
+    def _answer_action(self, request, response: sc_pb.Response) -> None:
+        actions = list(request.actions)
+        self.frame_actions[-1].extend(action.action_raw for action in actions if action.HasField("action_raw"))
+        response.action.result.extend([error_pb2.Success] * len(actions))
+
+    def _answer_query(self, request, response: sc_pb.Response) -> None:
+        self.queries += 1
+        for pathing in request.pathing:
+            response.query.pathing.add(distance=self._distance(pathing))
+        for placement in request.placements:
+            response.query.placements.add(result=self._placement_result(placement))
+        for available in request.abilities:
+            response.query.abilities.add(unit_tag=available.unit_tag)
+
+    def _answer_debug(self, request, response: sc_pb.Response) -> None:
+        pass
+
+    def _answer_leave_game(self, request, response: sc_pb.Response) -> None:
+        self._status = Status.ended
+
+    def _answer_quit(self, request, response: sc_pb.Response) -> None:
+        self._status = Status.quit
+
+    def _unit_position(self, tag: int) -> Optional[tuple[float, float]]:
+        if self._current is None:
+            return None
+        for unit in self._current.observation.raw_data.units:
+            if unit.tag == tag:
+                return unit.pos.x, unit.pos.y
+        return None
+
+    def _distance(self, pathing: query_pb2.RequestQueryPathing) -> float:
+        """Straight line distance, 0 like the real client when there is no path"""
+        if pathing.HasField("start_pos"):
+            start = pathing.start_pos.x, pathing.start_pos.y
+        else:
+            start = self._unit_position(pathing.unit_tag)
+        if start is None:
+            return 0.0
+        return math.hypot(pathing.end_pos.x - start[0], pathing.end_pos.y - start[1])
+
+    def _placement_result(self, placement: query_pb2.RequestQueryBuildingPlacement) -> int:
+        """Check the footprint against the static placement grid and every structure of the current frame"""
+        radius = BUILD_FOOTPRINTS.get(placement.ability_id, DEFAULT_FOOTPRINT)
+        x, y = placement.target_pos.x, placement.target_pos.y
+        x0, y0 = int(round(x - radius)), int(round(y - radius))
+        size = int(round(radius * 2))
+        height, width = self._placement.shape
+        if x0 < 0 or y0 < 0 or x0 + size > width or y0 + size > height:
+            return error_pb2.CantBuildLocationInvalid
+        if not self._placement[y0 : y0 + size, x0 : x0 + size].all():
+            return error_pb2.CantBuildLocationInvalid
+
+        if self._current is not None:
+            for unit in self._current.observation.raw_data.units:
+                # square footprints overlap when they are closer than the sum of the half sizes on both axes
+                if (
+                    unit.radius >= 1.0
+                    and abs(unit.pos.x - x) < radius + unit.radius
+                    and abs(unit.pos.y - y) < radius + unit.radius
+                ):
+                    return error_pb2.CantBuildLocationInvalid
+        return error_pb2.Success
@@ -0,0 +1,139 @@
+"""
+Replay the bundled scenarios to `MyBot` without StarCraft II. The bot runs its normal `on_step` with ares and every
+manager on top of the replay client, the step profiler records each part of the step and the client records the
+actions issued each frame.
+
+Reported per scenario: the wall time of every `MyBot.on_step`, of each manager update (`AttackManager`,
+`Proxy4GateManager`, ...), of `CustomBuildOrderRunner.do_step` and of every registered behavior (the macro plan,
+mining, ...), followed by the number of actions issued per frame.
+
+Games recorded by the bot (`Recorder: Enabled` in config.yml) can be replayed the same way with `--recording`.
+
+Run from the root of the repo: `python harness/run_harness.py [--scenario early_proxy] [--duration 30] [--json out.json]`
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import numpy as np
+
+sys.path.append("ares-sc2/src/ares")
+sys.path.append("ares-sc2/src")
+sys.path.append("ares-sc2")
+sys.path.append(".")
+
+from ares.consts import DEBUG, USE_DATA
+from loguru import logger
+from sc2.data import Result
+from sc2.main import _play_game_ai
+
+from bot.main import MyBot
+from bot.profiling.step_profiler import StepProfiler
+from harness.recording import Recording, load_recording
+from harness.replay_client import ReplayClient
+from harness.scenarios import SCENARIOS
+
+REPORT_COLUMNS: tuple[str, ...] = ("count", "mean", "p50", "p95", "p99", "max")
+
+
+class HarnessBot(MyBot):
+    """`MyBot` set up for a replayed game: the opening comes from the recording, nothing is saved to the opponent
+    data files and the step profiler is always on"""
+
+    def __init__(self, recording: Recording, profiler: StepProfiler):
+        super().__init__(game_step_override=recording.game_step)
+        self.recording: Recording = recording
+        self.config[USE_DATA] = False
+        self.config[DEBUG] = False
+        self.profiler = profiler
+
+    def register_managers(self) -> None:
+        super().register_managers()
+
+        if self.recording.opening:
+            self.manager_hub.data_manager.chosen_opening = self.recording.opening
+
+    async def on_start(self) -> None:
+        await super().on_start()
+
+        runner = self.build_order_runner
+        runner.do_step = self.profiler.wrap_async(f"{runner.__class__.__name__}.do_step", runner.do_step)
+
+
+async def replay(recording: Recording, report_dir: str) -> dict:
+    """Play a recording to a fresh bot and return the step times and actions"""
+    profiler = StepProfiler(report_dir=report_dir)
+    bot = HarnessBot(recording, profiler)
+    client = ReplayClient(recording)
+
+    start = time.perf_counter()
+    result: Result = await _play_game_ai(client, recording.player_id, bot, realtime=False, game_time_limit=None)
+    wall_time = time.perf_counter() - start
+
+    actions = np.array(client.actions_per_frame)
+    return {
+        "scenario": recording.name,
+        "result": result.name,
+        "frames": client.frame,
+        "wall_time": wall_time,
+        "queries": client.queries,
+        "actions": {
+            "total": int(actions.sum()),
+            "mean": float(actions.mean()),
+            "p95": float(np.percentile(actions, 95)),
+            "max": int(actions.max()),
+        },
+        "components": profiler.report(),
+    }
+
+
+def print_report(report: dict) -> None:
+    actions = report["actions"]
+    print(
+        f"\n{report['scenario']}: {report['frames']} frames in {report['wall_time']:.1f}s ({report['result']}), "
+        f"actions per frame mean {actions['mean']:.1f} p95 {actions['p95']:.0f} max {actions['max']}, "
+        f"{report['queries']} queries"
+    )
+    print(f"{'component':<48}" + "".join(f"{column:>10}" for column in REPORT_COLUMNS))
+    for component, summary in report["components"].items():
+        print(
+            f"{component:<48}{summary['count']:>10}"
+            + "".join(f"{summary[column]:>8.3f}ms" for column in REPORT_COLUMNS[1:])
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark MyBot on recorded scenarios without StarCraft II")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="default: all of them")
+    parser.add_argument("--recording", action="append", default=[], help="replay a file written by the recorder")
+    parser.add_argument("--duration", type=float, default=30.0, help="game seconds replayed per scenario")
+    parser.add_argument("--json", help="also write the reports to this file")
+    parser.add_argument("--report-dir", default="data", help="where the bot writes its own step profile")
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's info logging")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+
+    # scenarios are only generated when their turn comes
+    recordings = [lambda file_path=file_path: load_recording(file_path) for file_path in args.recording]
+    if args.scenario or not args.recording:
+        recordings += [lambda name=name: SCENARIOS[name](args.duration) for name in args.scenario or SCENARIOS]
+
+    reports = []
+    for load in recordings:
+        recording = load()
+        report = asyncio.run(replay(recording, args.report_dir))
+        print_report(report)
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
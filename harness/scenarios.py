@@ -0,0 +1,637 @@
+# scenarios.py
+"""
+Bundled scenarios for the harness. Each scenario places both players' bases, workers, structures and armies on the
+synthetic map and then plays the next few seconds with a very small simulation (armies attack move towards a point,
+shoot the closest enemy in range, structures finish building and income accumulates) to produce one observation per
+step.
+
+The observations do not react to the actions of the bot, the point is to feed the bot the same input on every run so
+step times can be compared between commits. All randomness comes from a fixed seed.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+from s2clientprotocol import common_pb2
+from s2clientprotocol import sc2api_pb2 as sc_pb
+from sc2.constants import IS_GATHERING, TARGET_AIR, TARGET_GROUND
+from sc2.data import Alliance, CloakState, DisplayType, Race
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.ids.upgrade_id import UpgradeId
+
+from harness.game_data import UNIT_STATS, build_response_data
+from harness.recording import Recording
+from harness.synthetic_map import MAP_SIZE, SyntheticMap
+
+SELF: int = 1
+ENEMY: int = 2
+NEUTRAL: int = 16
+
+LOOPS_PER_SECOND: float = 22.4
+# unit speeds in the game data are for normal game speed, ladder games run on faster
+FASTER_SPEED: float = 1.4
+PYLON_POWER_RADIUS: float = 6.5
+CREEP_RADIUS: float = 10.0
+ENERGY_REGEN: float = 0.7875
+MINERALS_PER_WORKER: float = 0.94
+VESPENE_PER_GAS_BUILDING: float = 2.7
+WORKERS_PER_GAS_BUILDING: int = 3
+
+WORKER_TYPES: set[UnitID] = {UnitID.PROBE, UnitID.DRONE, UnitID.SCV}
+TOWNHALL_TYPES: set[UnitID] = {
+    UnitID.NEXUS, UnitID.HATCHERY, UnitID.LAIR, UnitID.COMMANDCENTER, UnitID.ORBITALCOMMAND,
+}
+GAS_BUILDING_TYPES: set[UnitID] = {UnitID.ASSIMILATOR, UnitID.EXTRACTOR, UnitID.REFINERY}
+ENERGY_TYPES: set[UnitID] = {UnitID.NEXUS, UnitID.QUEEN, UnitID.SENTRY, UnitID.ORBITALCOMMAND, UnitID.MEDIVAC}
+FLYING_TYPES: set[UnitID] = {UnitID.OBSERVER, UnitID.OVERLORD, UnitID.MEDIVAC}
+CLOAKED_TYPES: set[UnitID] = {UnitID.DARKTEMPLAR, UnitID.OBSERVER}
+ALLIANCES: dict[int, int] = {SELF: Alliance.Self.value, ENEMY: Alliance.Enemy.value, NEUTRAL: Alliance.Neutral.value}
+CLOAKED: int = CloakState.Cloaked.value
+NOT_CLOAKED: int = CloakState.NotCloaked.value
+
+RACE_WORKERS: dict[Race, UnitID] = {Race.Protoss: UnitID.PROBE, Race.Zerg: UnitID.DRONE, Race.Terran: UnitID.SCV}
+RACE_TOWNHALLS: dict[Race, UnitID] = {
+    Race.Protoss: UnitID.NEXUS, Race.Zerg: UnitID.HATCHERY, Race.Terran: UnitID.COMMANDCENTER,
+}
+RACE_GAS_BUILDINGS: dict[Race, UnitID] = {
+    Race.Protoss: UnitID.ASSIMILATOR, Race.Zerg: UnitID.EXTRACTOR, Race.Terran: UnitID.REFINERY,
+}
+
+
+@dataclass
+class SimUnit:
+    """A unit of the scenario before the simulation starts
+
+    Attributes:
+        tag: Unique tag, in the same format as the game uses
+        type_id: Unit type
+        owner: Player id, `NEUTRAL` for resources
+        position: Starting position
+        build_progress: Construction progress, 1 when complete
+        destination: Point the unit attack moves towards, None to stay put
+        contents: Minerals or vespene left for resources
+        gather_tag: Resource a worker is mining from
+    """
+
+    tag: int
+    type_id: UnitID
+    owner: int
+    position: tuple[float, float]
+    build_progress: float = 1.0
+    destination: Optional[tuple[float, float]] = None
+    contents: int = 0
+    gather_tag: int = 0
+
+
+class ScenarioBuilder:
+    """Place units on the synthetic map and simulate them into a `Recording`
+
+    Attributes:
+        name: Scenario name
+        own_race: Race of the replayed player
+        enemy_race: Race of the opponent
+        start_time: Game time in seconds of the first frame
+        opening: Build order the bot should play
+        game_step: Game loops between frames
+        map: The synthetic map
+        units: Every unit of the scenario
+        minerals: Starting minerals of the replayed player
+        vespene: Starting vespene of the replayed player
+        upgrades: Completed upgrades of each player
+    """
+
+    def __init__(
+        self,
+        name: str,
+        own_race: Race,
+        enemy_race: Race,
+        start_time: float,
+        opening: Optional[str] = None,
+        game_step: int = 2,
+        seed: int = 0,
+    ):
+        self.name: str = name
+        self.own_race: Race = own_race
+        self.enemy_race: Race = enemy_race
+        self.start_time: float = start_time
+        self.opening: Optional[str] = opening
+        self.game_step: int = game_step
+        self.map: SyntheticMap = SyntheticMap()
+        self.units: list[SimUnit] = []
+        self.minerals: float = 0.0
+        self.vespene: float = 0.0
+        self.upgrades: dict[int, set[UpgradeId]] = {SELF: set(), ENEMY: set()}
+
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+        self._resources_by_position: dict[tuple[float, float], SimUnit] = {}
+        for type_id, position, contents in self.map.resource_units():
+            resource = self.add(type_id, NEUTRAL, position, contents=contents)[0]
+            self._resources_by_position[position] = resource
+
+    def race(self, owner: int) -> Race:
+        return self.own_race if owner == SELF else self.enemy_race
+
+    def base_position(self, owner: int, index: int) -> tuple[float, float]:
+        return self.map.own_bases(owner)[index].position
+
+    def toward_center(self, owner: int, index: int, distance: float) -> tuple[float, float]:
+        """A point `distance` from a base in the direction of the middle of the map"""
+        x, y = self.base_position(owner, index)
+        dx, dy = MAP_SIZE / 2 - x, MAP_SIZE / 2 - y
+        length = max(np.hypot(dx, dy), 1e-6)
+        return x + dx / length * distance, y + dy / length * distance
+
+    def add(
+        self,
+        type_id: UnitID,
+        owner: int,
+        position: tuple[float, float],
+        count: int = 1,
+        spread: float = 0.0,
+        build_progress: float = 1.0,
+        destination: Optional[tuple[float, float]] = None,
+        contents: int = 0,
+    ) -> list[SimUnit]:
+        """Add `count` units in a loose square formation around `position`"""
+        added = []
+        columns = int(np.ceil(np.sqrt(count)))
+        for i in range(count):
+            x, y = position
+            if count > 1:
+                jitter = self._rng.uniform(-0.2, 0.2, 2)
+                x += (i % columns - (columns - 1) / 2) * spread + jitter[0]
+                y += (i // columns - (columns - 1) / 2) * spread + jitter[1]
+            unit = SimUnit(
+                tag=((len(self.units) + 1) << 18) | 1,
+                type_id=type_id,
+                owner=owner,
+                position=(float(x), float(y)),
+                build_progress=build_progress,
+                destination=destination,
+                contents=contents,
+            )
+            self.units.append(unit)
+            added.append(unit)
+        return added
+
+    def add_base(
+        self,
+        owner: int,
+        index: int,
+        workers: int,
+        gas_buildings: int = 0,
+        townhall: Optional[UnitID] = None,
+        build_progress: float = 1.0,
+    ) -> None:
+        """A townhall with workers mining from its mineral line and the given number of gas buildings"""
+        base = self.map.own_bases(owner)[index]
+        race = self.race(owner)
+        self.add(townhall or RACE_TOWNHALLS[race], owner, base.position, build_progress=build_progress)
+
+        minerals = [self._resources_by_position[position] for position in base.minerals]
+        for i in range(workers):
+            mineral = minerals[i % len(minerals)]
+            # between the townhall and the mineral field the worker is mining
+            t = self._rng.uniform(0.3, 0.7)
+            position = (
+                base.position[0] + (mineral.position[0] - base.position[0]) * t,
+                base.position[1] + (mineral.position[1] - base.position[1]) * t,
+            )
+            self.add(RACE_WORKERS[race], owner, position)[0].gather_tag = mineral.tag
+
+        for position in base.geysers[:gas_buildings]:
+            geyser = self._resources_by_position[position]
+            self.add(RACE_GAS_BUILDINGS[race], owner, position, contents=geyser.contents)
+
+    def record(self, duration: float) -> Recording:
+        """Simulate `duration` seconds and return the observations"""
+        simulation = _Simulation(self)
+        frames = [simulation.observation()]
+        for _ in range(int(duration * LOOPS_PER_SECOND / self.game_step)):
+            simulation.step()
+            frames.append(simulation.observation())
+
+        return Recording(
+            name=self.name,
+            game_info=self.map.game_info(self.name, self.own_race, self.enemy_race),
+            game_data=build_response_data(),
+            frames=frames,
+            game_step=self.game_step,
+            opening=self.opening,
+            metadata={
+                "start_time": self.start_time,
+                "duration": duration,
+                "units": len(self.units),
+                "enemy_race": self.enemy_race.name,
+            },
+        )
+
+
+class _Simulation:
+    """Struct of arrays state of every unit, advanced one game step at a time"""
+
+    def __init__(self, scenario: ScenarioBuilder):
+        self.scenario: ScenarioBuilder = scenario
+        self.game_loop: int = int(scenario.start_time * LOOPS_PER_SECOND)
+        self.dt: float = scenario.game_step / LOOPS_PER_SECOND
+        self.minerals: float = scenario.minerals
+        self.vespene: float = scenario.vespene
+        self.dead_tags: list[int] = []
+
+        units = scenario.units
+        self.units: list[SimUnit] = units
+        n = len(units)
+        stats = [UNIT_STATS[unit.type_id] for unit in units]
+        self.owner = np.array([unit.owner for unit in units])
+        self.position = np.array([unit.position for unit in units], dtype=np.float64).reshape(n, 2)
+        self.radius = np.array([s.radius for s in stats])
+        self.speed = np.array([s.speed * FASTER_SPEED for s in stats])
+        self.sight = np.array([s.sight for s in stats])
+        self.health_max = np.array([s.health for s in stats], dtype=np.float64)
+        self.shield_max = np.array([s.shield for s in stats], dtype=np.float64)
+        self.progress = np.array([unit.build_progress for unit in units])
+        self.build_time = np.array([max(s.build_time, 1.0) for s in stats])
+        # structures under construction start with health in proportion to their progress
+        self.health = self.health_max * np.maximum(self.progress, 0.1)
+        self.shield = self.shield_max * np.maximum(self.progress, 0.1)
+        self.energy = np.array([50.0 if unit.type_id in ENERGY_TYPES else 0.0 for unit in units])
+        self.contents = np.array([unit.contents for unit in units], dtype=np.float64)
+        self.is_flying = np.array([unit.type_id in FLYING_TYPES for unit in units])
+        self.is_worker = np.array([unit.type_id in WORKER_TYPES for unit in units])
+        self.alive = np.ones(n, dtype=bool)
+        self.cooldown = np.zeros(n)
+        self.has_destination = np.array([unit.destination is not None for unit in units])
+        self.destination = np.array(
+            [unit.destination if unit.destination is not None else unit.position for unit in units], dtype=np.float64
+        ).reshape(n, 2)
+
+        weapon_levels = {
+            owner: sum(1 for upgrade in upgrades if "WEAPONS" in upgrade.name)
+            for owner, upgrades in scenario.upgrades.items()
+        }
+        armor_levels = {
+            owner: sum(1 for upgrade in upgrades if "ARMOR" in upgrade.name)
+            for owner, upgrades in scenario.upgrades.items()
+        }
+        self.attack_level = np.array([weapon_levels.get(unit.owner, 0) for unit in units])
+        self.armor_level = np.array([armor_levels.get(unit.owner, 0) for unit in units])
+        self.armor = np.array([s.armor for s in stats]) + self.armor_level
+        # (damage per volley, range, cooldown) against ground and air targets, 0 damage when it cannot hit
+        self.weapons = np.zeros((2, 3, n))
+        for i, s in enumerate(stats):
+            for weapon in s.weapons:
+                for layer, targets in enumerate((TARGET_GROUND, TARGET_AIR)):
+                    if weapon.target.value in targets and self.weapons[layer, 0, i] == 0:
+                        damage = (weapon.damage + self.attack_level[i]) * weapon.attacks
+                        self.weapons[layer, :, i] = (damage, weapon.range, weapon.cooldown)
+        self.can_attack = self.weapons[:, 0, :].max(axis=0) > 0
+
+        # static parts of the observation
+        self.visibility = common_pb2.ImageData(
+            bits_per_pixel=8, size=common_pb2.Size2DI(x=MAP_SIZE, y=MAP_SIZE),
+            data=np.full((MAP_SIZE, MAP_SIZE), 2, dtype=np.uint8).tobytes(),
+        )
+        self.creep = common_pb2.ImageData(
+            bits_per_pixel=1, size=common_pb2.Size2DI(x=MAP_SIZE, y=MAP_SIZE), data=np.packbits(self._creep()).tobytes()
+        )
+        self.powered = self._powered()
+        self.harvesters: dict[int, int] = self._harvesters()
+
+    def _creep(self) -> np.ndarray:
+        ys, xs = np.mgrid[0:MAP_SIZE, 0:MAP_SIZE]
+        creep = np.zeros((MAP_SIZE, MAP_SIZE), dtype=np.uint8)
+        for unit in self.units:
+            if unit.type_id in {UnitID.HATCHERY, UnitID.LAIR}:
+                creep[np.hypot(xs - unit.position[0], ys - unit.position[1]) <= CREEP_RADIUS] = 1
+        return creep & self.scenario.map.pathing
+
+    def _powered(self) -> np.ndarray:
+        pylons = np.array(
+            [unit.type_id == UnitID.PYLON and unit.owner == SELF for unit in self.units]
+        ) & (self.progress >= 1.0)
+        if not pylons.any():
+            return np.zeros(len(self.units), dtype=bool)
+        distances = np.linalg.norm(self.position[:, None, :] - self.position[None, pylons, :], axis=2)
+        return (distances <= PYLON_POWER_RADIUS).any(axis=1)
+
+    def step(self) -> None:
+        dt = self.dt
+        self.game_loop += self.scenario.game_step
+        self.dead_tags = []
+
+        # construction and energy
+        building = self.alive & (self.progress < 1.0)
+        self.progress[building] = np.minimum(self.progress[building] + dt / self.build_time[building], 1.0)
+        self.health[building] = np.maximum(self.health[building], self.health_max[building] * self.progress[building])
+        self.shield[building] = np.maximum(self.shield[building], self.shield_max[building] * self.progress[building])
+        has_energy = self.energy > 0
+        self.energy[has_energy] = np.minimum(self.energy[has_energy] + ENERGY_REGEN * dt, 200.0)
+
+        # income of the replayed player
+        own_workers = int((self.alive & self.is_worker & (self.owner == SELF)).sum())
+        gas_buildings = sum(
+            1 for i, unit in enumerate(self.units)
+            if self.alive[i] and unit.owner == SELF and unit.type_id in GAS_BUILDING_TYPES and self.progress[i] >= 1.0
+        )
+        mineral_workers = max(own_workers - gas_buildings * WORKERS_PER_GAS_BUILDING, 0)
+        self.minerals += mineral_workers * MINERALS_PER_WORKER * dt
+        self.vespene += gas_buildings * VESPENE_PER_GAS_BUILDING * dt
+
+        self._fight(dt)
+
+    def _fight(self, dt: float) -> None:
+        fighters = self.alive & (self.progress >= 1.0) & (self.owner != NEUTRAL)
+        if not fighters.any():
+            return
+
+        delta = self.position[:, None, :] - self.position[None, :, :]
+        gap = np.hypot(delta[..., 0], delta[..., 1]) - self.radius[:, None] - self.radius[None, :]
+        layer = self.is_flying.astype(int)
+        # [attacker, target] damage, range and cooldown against the layer of the target
+        damage = self.weapons[layer, 0, :].T
+        weapon_range = self.weapons[layer, 1, :].T
+        cooldown = self.weapons[layer, 2, :].T
+        hostile = (
+            (self.owner[:, None] != self.owner[None, :])
+            & fighters[:, None]
+            & fighters[None, :]
+            & (damage > 0)
+        )
+
+        in_range = hostile & (gap <= weapon_range)
+        gap_in_range = np.where(in_range, gap, np.inf)
+        target = gap_in_range.argmin(axis=1)
+        rows = np.arange(len(target))
+        has_target = np.isfinite(gap_in_range[rows, target])
+
+        fire = has_target & (self.cooldown <= 0) & self.can_attack
+        incoming = np.zeros(len(target))
+        if fire.any():
+            hits = np.maximum(damage[rows, target] - self.armor[target], 0.5)
+            np.add.at(incoming, target[fire], hits[fire])
+            self.cooldown[fire] = cooldown[rows, target][fire]
+        self.cooldown = np.maximum(self.cooldown - dt, 0.0)
+
+        absorbed = np.minimum(self.shield, incoming)
+        self.shield -= absorbed
+        self.health -= incoming - absorbed
+        # resources have no health and can never die
+        died = self.alive & (self.health <= 0) & (self.health_max > 0)
+        if died.any():
+            self.alive &= ~died
+            self.dead_tags = [self.units[i].tag for i in np.flatnonzero(died)]
+
+        # attack move: chase the closest enemy in sight, otherwise walk on, stop once something is in range
+        movers = self.alive & self.has_destination & ~has_target & (self.speed > 0)
+        if not movers.any():
+            return
+        in_sight = hostile & self.alive[None, :] & (gap <= self.sight[:, None])
+        gap_in_sight = np.where(in_sight, gap, np.inf)
+        chase = gap_in_sight.argmin(axis=1)
+        chasing = np.isfinite(gap_in_sight[rows, chase])
+        goal = np.where(chasing[:, None], self.position[chase], self.destination)
+        heading = goal - self.position
+        distance = np.hypot(heading[:, 0], heading[:, 1])
+        step = np.minimum(self.speed * dt, distance)
+        moving = movers & (distance > 0.05)
+        self.position[moving] += heading[moving] / distance[moving, None] * step[moving, None]
+
+    def observation(self) -> sc_pb.ResponseObservation:
+        response = sc_pb.ResponseObservation()
+        observation = response.observation
+        observation.game_loop = self.game_loop
+        raw = observation.raw_data
+        raw.map_state.visibility.CopyFrom(self.visibility)
+        raw.map_state.creep.CopyFrom(self.creep)
+        raw.event.dead_units.extend(self.dead_tags)
+        raw.player.upgrade_ids.extend(upgrade.value for upgrade in self.scenario.upgrades[SELF])
+
+        own_food = army_food = food_cap = 0.0
+        own_workers = army_count = warp_gates = 0
+        for i in np.flatnonzero(self.alive):
+            unit = self.units[i]
+            stats = UNIT_STATS[unit.type_id]
+            ready = self.progress[i] >= 1.0
+            owner = unit.owner
+            x, y = float(self.position[i, 0]), float(self.position[i, 1])
+            if owner == SELF and ready:
+                food_cap += stats.food_provided
+                own_food += stats.food_required
+                if unit.type_id in WORKER_TYPES:
+                    own_workers += 1
+                elif stats.food_required:
+                    army_food += stats.food_required
+                    army_count += 1
+                warp_gates += unit.type_id == UnitID.WARPGATE
+                if unit.type_id == UnitID.PYLON:
+                    raw.player.power_sources.add(pos=common_pb2.Point(x=x, y=y), radius=PYLON_POWER_RADIUS, tag=unit.tag)
+
+            proto = raw.units.add(
+                display_type=DisplayType.Visible.value,
+                alliance=ALLIANCES[owner],
+                tag=unit.tag,
+                unit_type=unit.type_id.value,
+                owner=owner,
+                pos=common_pb2.Point(x=x, y=y, z=10.0),
+                radius=float(self.radius[i]),
+                build_progress=float(self.progress[i]),
+                cloak=CLOAKED if unit.type_id in CLOAKED_TYPES else NOT_CLOAKED,
+                is_powered=bool(self.powered[i]),
+                is_flying=bool(self.is_flying[i]),
+                health=float(self.health[i]),
+                health_max=float(self.health_max[i]),
+                shield=float(self.shield[i]),
+                shield_max=float(self.shield_max[i]),
+                energy=float(self.energy[i]),
+                energy_max=200.0 if self.energy[i] > 0 else 0.0,
+                attack_upgrade_level=int(self.attack_level[i]),
+                armor_upgrade_level=int(self.armor_level[i]),
+                weapon_cooldown=float(self.cooldown[i]) * LOOPS_PER_SECOND,
+            )
+            if owner == NEUTRAL:
+                if unit.type_id == UnitID.MINERALFIELD:
+                    proto.mineral_contents = int(self.contents[i])
+                else:
+                    proto.vespene_contents = int(self.contents[i])
+            elif unit.gather_tag:
+                proto.orders.add(ability_id=IS_GATHERING.value, target_unit_tag=unit.gather_tag)
+            elif self.has_destination[i]:
+                proto.orders.add(
+                    ability_id=AbilityId.ATTACK.value,
+                    target_world_space_pos=common_pb2.Point(
+                        x=float(self.destination[i, 0]), y=float(self.destination[i, 1])
+                    ),
+                )
+            if unit.type_id in GAS_BUILDING_TYPES and ready:
+                proto.vespene_contents = int(self.contents[i])
+                proto.assigned_harvesters = proto.ideal_harvesters = WORKERS_PER_GAS_BUILDING
+            elif unit.tag in self.harvesters:
+                proto.assigned_harvesters = self.harvesters[unit.tag]
+                proto.ideal_harvesters = 16 if ready else 0
+
+        observation.player_common.MergeFrom(
+            sc_pb.PlayerCommon(
+                player_id=SELF,
+                minerals=int(self.minerals),
+                vespene=int(self.vespene),
+                food_cap=int(min(food_cap, 200.0)),
+                food_used=int(own_food),
+                food_army=int(army_food),
+                food_workers=own_workers,
+                army_count=army_count,
+                warp_gate_count=warp_gates,
+            )
+        )
+        return response
+
+    def _harvesters(self) -> dict[int, int]:
+        """Workers mining at each townhall, counted at the townhall closest to the mineral field they mine from"""
+        townhalls = [i for i, unit in enumerate(self.units) if unit.type_id in TOWNHALL_TYPES]
+        harvesters = {self.units[i].tag: 0 for i in townhalls}
+        if not townhalls:
+            return harvesters
+        tag_index = {unit.tag: i for i, unit in enumerate(self.units)}
+        for unit in self.units:
+            if unit.gather_tag:
+                candidates = [i for i in townhalls if self.units[i].owner == unit.owner]
+                mineral = self.position[tag_index[unit.gather_tag]]
+                closest = min(candidates, key=lambda i: np.hypot(*(self.position[i] - mineral)))
+                harvesters[self.units[closest].tag] += 1
+        return harvesters
+
+
+def early_proxy(duration: float = 30.0) -> Recording:
+    """2:30 proxy four gate against a zerg: gateways finishing next to the enemy natural, first zealots walking in
+    and zerglings coming out to meet them"""
+    scenario = ScenarioBuilder("early_proxy", Race.Protoss, Race.Zerg, 150.0, opening="4GateRush")
+    scenario.minerals, scenario.vespene = 350, 50
+
+    scenario.add_base(SELF, 0, workers=15, gas_buildings=1)
+    main = scenario.base_position(SELF, 0)
+    scenario.add(UnitID.PYLON, SELF, (main[0] + 6, main[1] + 6))
+    scenario.add(UnitID.CYBERNETICSCORE, SELF, (main[0] + 9.5, main[1] + 4.5), build_progress=0.6)
+
+    enemy_natural = scenario.base_position(ENEMY, 1)
+    proxy = (enemy_natural[0] - 22, enemy_natural[1] - 26)
+    scenario.add(UnitID.PYLON, SELF, proxy)
+    scenario.add(UnitID.PROBE, SELF, (proxy[0] - 2, proxy[1] - 2))
+    for i, progress in enumerate((1.0, 1.0, 0.8, 0.6)):
+        offset = (-3.5, 3.5)[i % 2], (-1.5, 2.5)[i // 2]
+        scenario.add(UnitID.GATEWAY, SELF, (proxy[0] + offset[0], proxy[1] + offset[1]), build_progress=progress)
+    scenario.add(UnitID.ZEALOT, SELF, (proxy[0], proxy[1] + 4), count=2, spread=1.2, destination=enemy_natural)
+
+    scenario.add_base(ENEMY, 0, workers=13, gas_buildings=1)
+    scenario.add_base(ENEMY, 1, workers=3, build_progress=0.7)
+    enemy_main = scenario.base_position(ENEMY, 0)
+    scenario.add(UnitID.SPAWNINGPOOL, ENEMY, (enemy_main[0] - 7.5, enemy_main[1] - 2.5))
+    scenario.add(UnitID.OVERLORD, ENEMY, (enemy_main[0] - 12, enemy_main[1] - 12), count=2, spread=20)
+    scenario.add(UnitID.QUEEN, ENEMY, (enemy_main[0] - 4, enemy_main[1] - 4))
+    scenario.add(UnitID.ZERGLING, ENEMY, enemy_natural, count=6, spread=0.8, destination=proxy)
+    return scenario.record(duration)
+
+
+def midgame_fight(duration: float = 30.0) -> Recording:
+    """6:30 against zerg at about 100 supply each, both armies meet in the middle of the map"""
+    scenario = ScenarioBuilder("midgame_fight", Race.Protoss, Race.Zerg, 390.0, opening="1GateExpand", seed=1)
+    scenario.minerals, scenario.vespene = 600, 250
+    scenario.upgrades[SELF] = {UpgradeId.WARPGATERESEARCH, UpgradeId.PROTOSSGROUNDWEAPONSLEVEL1}
+    scenario.upgrades[ENEMY] = {UpgradeId.GLIALRECONSTITUTION, UpgradeId.ZERGMISSILEWEAPONSLEVEL1}
+
+    for index, workers in enumerate((16, 16, 10)):
+        scenario.add_base(SELF, index, workers=workers, gas_buildings=2 if index < 2 else 0)
+    main = scenario.base_position(SELF, 0)
+    for i in range(6):
+        scenario.add(UnitID.PYLON, SELF, (main[0] + 4 + 3 * (i % 3), main[1] + 9 + 3 * (i // 3)))
+    for i in range(8):
+        scenario.add(UnitID.WARPGATE, SELF, (main[0] + 2.5 + 3 * (i % 4), main[1] + 15.5 + 3 * (i // 4)))
+    for i, structure in enumerate((UnitID.CYBERNETICSCORE, UnitID.TWILIGHTCOUNCIL, UnitID.FORGE, UnitID.ROBOTICSFACILITY)):
+        scenario.add(structure, SELF, (main[0] + 14.5, main[1] + 2.5 + 3 * i))
+
+    rally = scenario.toward_center(SELF, 1, 14)
+    target = scenario.toward_center(ENEMY, 2, 14)
+    scenario.add(UnitID.STALKER, SELF, rally, count=16, spread=1.4, destination=target)
+    scenario.add(UnitID.ZEALOT, SELF, (rally[0] + 4, rally[1] + 4), count=8, spread=1.2, destination=target)
+    scenario.add(UnitID.IMMORTAL, SELF, (rally[0] - 3, rally[1] - 3), count=2, spread=1.8, destination=target)
+    scenario.add(UnitID.SENTRY, SELF, (rally[0] - 2, rally[1] + 2), count=2, spread=1.2, destination=target)
+    scenario.add(UnitID.OBSERVER, SELF, (rally[0] + 6, rally[1] + 6), destination=target)
+
+    for index, workers in enumerate((16, 16, 8)):
+        scenario.add_base(ENEMY, index, workers=workers, gas_buildings=2 if index < 2 else 0,
+                          townhall=UnitID.LAIR if index == 0 else None)
+    enemy_main = scenario.base_position(ENEMY, 0)
+    for i, structure in enumerate((UnitID.SPAWNINGPOOL, UnitID.ROACHWARREN, UnitID.EVOLUTIONCHAMBER)):
+        scenario.add(structure, ENEMY, (enemy_main[0] - 8.5, enemy_main[1] - 2.5 - 3 * i))
+    scenario.add(UnitID.QUEEN, ENEMY, (enemy_main[0] - 5, enemy_main[1] - 5), count=3, spread=2)
+    scenario.add(UnitID.OVERLORD, ENEMY, (enemy_main[0] - 15, enemy_main[1] - 15), count=8, spread=12)
+    scenario.add(UnitID.ROACH, ENEMY, target, count=16, spread=1.4, destination=rally)
+    scenario.add(UnitID.RAVAGER, ENEMY, (target[0] + 3, target[1] + 3), count=6, spread=1.6, destination=rally)
+    scenario.add(UnitID.ZERGLING, ENEMY, (target[0] - 4, target[1] + 2), count=12, spread=0.8, destination=rally)
+    return scenario.record(duration)
+
+
+def lategame(duration: float = 30.0) -> Recording:
+    """13:00 maxed protoss army against terran bio and tanks, fighting in front of our fourth base"""
+    scenario = ScenarioBuilder("lategame", Race.Protoss, Race.Terran, 780.0, opening="1GateExpand", seed=2)
+    scenario.minerals, scenario.vespene = 2400, 1100
+    scenario.upgrades[SELF] = {
+        UpgradeId.WARPGATERESEARCH, UpgradeId.CHARGE, UpgradeId.BLINKTECH,
+        UpgradeId.PROTOSSGROUNDWEAPONSLEVEL1, UpgradeId.PROTOSSGROUNDWEAPONSLEVEL2,
+        UpgradeId.PROTOSSGROUNDARMORSLEVEL1, UpgradeId.PROTOSSGROUNDARMORSLEVEL2, UpgradeId.PROTOSSSHIELDSLEVEL1,
+    }
+    scenario.upgrades[ENEMY] = {
+        UpgradeId.STIMPACK, UpgradeId.SHIELDWALL, UpgradeId.PUNISHERGRENADES,
+        UpgradeId.TERRANINFANTRYWEAPONSLEVEL1, UpgradeId.TERRANINFANTRYWEAPONSLEVEL2,
+        UpgradeId.TERRANINFANTRYARMORSLEVEL1,
+    }
+
+    for index, workers in enumerate((16, 16, 16, 6)):
+        scenario.add_base(SELF, index, workers=workers, gas_buildings=2)
+    main = scenario.base_position(SELF, 0)
+    for i in range(14):
+        scenario.add(UnitID.PYLON, SELF, (main[0] + 2 + 3 * (i % 5), main[1] + 9 + 3 * (i // 5)))
+    for i in range(12):
+        scenario.add(UnitID.WARPGATE, SELF, (main[0] + 2.5 + 3 * (i % 4), main[1] - 12.5 + 3 * (i // 4)))
+    structures = (
+        UnitID.CYBERNETICSCORE, UnitID.TWILIGHTCOUNCIL, UnitID.FORGE, UnitID.FORGE,
+        UnitID.ROBOTICSFACILITY, UnitID.ROBOTICSFACILITY,
+    )
+    for i, structure in enumerate(structures):
+        scenario.add(structure, SELF, (main[0] + 14.5, main[1] - 9.5 + 3 * i))
+    scenario.add(UnitID.DARKSHRINE, SELF, (main[0] - 8, main[1] + 8))
+
+    rally = scenario.toward_center(SELF, 3, 12)
+    target = scenario.toward_center(ENEMY, 3, 12)
+    scenario.add(UnitID.STALKER, SELF, rally, count=24, spread=1.4, destination=target)
+    scenario.add(UnitID.ZEALOT, SELF, (rally[0] + 5, rally[1] + 5), count=16, spread=1.2, destination=target)
+    scenario.add(UnitID.IMMORTAL, SELF, (rally[0] - 4, rally[1] - 2), count=4, spread=1.8, destination=target)
+    scenario.add(UnitID.COLOSSUS, SELF, (rally[0] - 6, rally[1] - 6), count=4, spread=2.2, destination=target)
+    scenario.add(UnitID.DARKTEMPLAR, SELF, (rally[0] + 8, rally[1]), count=4, spread=1.2, destination=target)
+    scenario.add(UnitID.SENTRY, SELF, (rally[0] - 2, rally[1] + 3), count=2, spread=1.2, destination=target)
+    scenario.add(UnitID.OBSERVER, SELF, (rally[0] + 3, rally[1] + 8), count=2, spread=6, destination=target)
+
+    for index, workers in enumerate((16, 16, 16, 16)):
+        scenario.add_base(ENEMY, index, workers=workers, gas_buildings=2 if index < 3 else 0,
+                          townhall=UnitID.ORBITALCOMMAND if index < 3 else None)
+    enemy_main = scenario.base_position(ENEMY, 0)
+    for i in range(16):
+        scenario.add(UnitID.SUPPLYDEPOTLOWERED, ENEMY, (enemy_main[0] - 2 - 2 * (i % 8), enemy_main[1] + 8 - 2 * (i // 8)))
+    for i in range(10):
+        scenario.add(UnitID.BARRACKS, ENEMY, (enemy_main[0] - 4.5 - 3 * (i % 5), enemy_main[1] - 10.5 - 3 * (i // 5)))
+    for i, structure in enumerate((UnitID.FACTORY, UnitID.FACTORY, UnitID.STARPORT, UnitID.STARPORT,
+                                   UnitID.ENGINEERINGBAY, UnitID.ENGINEERINGBAY)):
+        scenario.add(structure, ENEMY, (enemy_main[0] + 8.5, enemy_main[1] - 14.5 + 3 * i))
+    scenario.add(UnitID.MARINE, ENEMY, target, count=40, spread=0.9, destination=rally)
+    scenario.add(UnitID.MARAUDER, ENEMY, (target[0] - 4, target[1] - 4), count=12, spread=1.2, destination=rally)
+    scenario.add(UnitID.SIEGETANK, ENEMY, (target[0] + 6, target[1] + 6), count=3, spread=2.0, destination=rally)
+    scenario.add(UnitID.SIEGETANKSIEGED, ENEMY, (target[0] + 9, target[1] + 9), count=3, spread=2.0)
+    scenario.add(UnitID.MEDIVAC, ENEMY, (target[0] + 2, target[1] + 2), count=6, spread=1.5, destination=rally)
+    return scenario.record(duration)
+
+
+SCENARIOS: dict[str, Callable[[float], Recording]] = {
+    "early_proxy": early_proxy,
+    "midgame_fight": midgame_fight,
+    "lategame": lategame,
+}
@@ -0,0 +1,216 @@
+# synthetic_map.py
+"""
+A small two player map generated in code so the harness does not need any map files. Each player has a main on high
+ground in opposite corners with a single ramp down, and the map is point symmetric so both sides have the same bases.
+
+Only what python-sc2 and ares read at the start of a game is produced: the pathing, placement and terrain height
+grids, start locations and the resources of every base.
+"""
+
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+from s2clientprotocol import common_pb2, raw_pb2
+from s2clientprotocol import sc2api_pb2 as sc_pb
+from sc2.data import Race
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+
+MAP_SIZE: int = 144
+PLAYABLE_BORDER: int = 8
+# terrain height bytes, python-sc2 converts these with -16 + 32 * h / 255
+LOW_GROUND: int = 160
+HIGH_GROUND: int = 200
+# the main plateau covers [PLAYABLE_BORDER, MAIN_EDGE) on both axes, the cliff is the next CLIFF_WIDTH cells
+MAIN_EDGE: int = 46
+CLIFF_WIDTH: int = 2
+# the ramp runs along +x out of the main over these rows
+RAMP_ROWS: tuple[int, int] = (29, 34)
+RAMP_LENGTH: int = 6
+
+MINERAL_CONTENTS: int = 1800
+VESPENE_CONTENTS: int = 2250
+
+
+@dataclass
+class Base:
+    """An expansion of the map
+
+    Attributes:
+        position: Where the townhall goes
+        direction: Unit vector from the townhall towards its mineral line
+        minerals: Position of each mineral field
+        geysers: Position of each vespene geyser
+    """
+
+    position: tuple[float, float]
+    direction: tuple[float, float]
+    minerals: list[tuple[float, float]] = field(default_factory=list)
+    geysers: list[tuple[float, float]] = field(default_factory=list)
+
+
+def mirror(position: tuple[float, float]) -> tuple[float, float]:
+    """Same position for the other player"""
+    return MAP_SIZE - position[0], MAP_SIZE - position[1]
+
+
+def _resources(base: Base) -> Base:
+    """Lay out 8 mineral fields in an arc behind the townhall and a geyser on either side"""
+    x, y = base.position
+    facing = math.atan2(base.direction[1], base.direction[0])
+    for i in range(8):
+        angle = facing + math.radians(-52.5 + 15.0 * i)
+        radius = 6.0 if i % 2 else 6.5
+        # mineral fields are 2x1, so their center is on a whole x and a half y
+        base.minerals.append(
+            (round(x + radius * math.cos(angle)), math.floor(y + radius * math.sin(angle)) + 0.5)
+        )
+    for side in (-1, 1):
+        angle = facing + side * math.radians(85.0)
+        base.geysers.append(
+            (math.floor(x + 7.0 * math.cos(angle)) + 0.5, math.floor(y + 7.0 * math.sin(angle)) + 0.5)
+        )
+    return base
+
+
+# bases of player 1, player 2 gets the mirrored ones, the first entry is the main
+PLAYER_ONE_BASES: list[tuple[tuple[float, float], tuple[float, float]]] = [
+    ((27.5, 27.5), (-0.7071, -0.7071)),
+    ((62.5, 20.5), (0.0, -1.0)),
+    ((20.5, 64.5), (-1.0, 0.0)),
+    ((98.5, 18.5), (0.0, -1.0)),
+]
+
+
+class SyntheticMap:
+    """The generated map, shared by every bundled scenario
+
+    Attributes:
+        bases: Every base of both players, player 1 bases first
+        start_locations: Main base position of player 1 and player 2
+        pathing: Pathable cells, indexed [y, x] like the SC2 grids
+        placement: Cells structures can be placed on, indexed [y, x]
+        height: Terrain height bytes, indexed [y, x]
+    """
+
+    def __init__(self):
+        own = [_resources(Base(position, direction)) for position, direction in PLAYER_ONE_BASES]
+        enemy = [
+            _resources(Base(mirror(position), (-direction[0], -direction[1])))
+            for position, direction in PLAYER_ONE_BASES
+        ]
+        self.bases: list[Base] = own + enemy
+
+        self.pathing: np.ndarray = np.zeros((MAP_SIZE, MAP_SIZE), dtype=np.uint8)
+        self.placement: np.ndarray = np.zeros((MAP_SIZE, MAP_SIZE), dtype=np.uint8)
+        self.height: np.ndarray = np.full((MAP_SIZE, MAP_SIZE), LOW_GROUND, dtype=np.uint8)
+        self._build_grids()
+
+        # townhalls go where python-sc2 will expect them, otherwise the bot would not recognise its own bases
+        for base in self.bases:
+            base.position = self._expansion_position(base)
+        self.start_locations: tuple[tuple[float, float], tuple[float, float]] = (own[0].position, enemy[0].position)
+
+    def own_bases(self, player_id: int) -> list[Base]:
+        half = len(self.bases) // 2
+        return self.bases[:half] if player_id == 1 else self.bases[half:]
+
+    def _build_grids(self) -> None:
+        inner = slice(PLAYABLE_BORDER, MAP_SIZE - PLAYABLE_BORDER)
+        self.pathing[inner, inner] = 1
+        self.placement[inner, inner] = 1
+
+        # player 1 corner, drawn once and then mirrored onto player 2 by flipping both axes
+        corner_pathing = np.zeros_like(self.pathing)
+        corner_height = np.zeros_like(self.height)
+        main = slice(PLAYABLE_BORDER, MAIN_EDGE)
+        cliff = slice(MAIN_EDGE, MAIN_EDGE + CLIFF_WIDTH)
+        corner_height[main, main] = HIGH_GROUND
+        corner_pathing[slice(PLAYABLE_BORDER, MAIN_EDGE + CLIFF_WIDTH), cliff] = 2
+        corner_pathing[cliff, slice(PLAYABLE_BORDER, MAIN_EDGE + CLIFF_WIDTH)] = 2
+        ramp_rows = slice(*RAMP_ROWS)
+        for i in range(RAMP_LENGTH):
+            column = MAIN_EDGE + i
+            corner_pathing[ramp_rows, column] = 3
+            corner_height[ramp_rows, column] = HIGH_GROUND - (i + 1) * (HIGH_GROUND - LOW_GROUND) // (RAMP_LENGTH + 1)
+
+        for pathing, height in ((corner_pathing, corner_height), (corner_pathing[::-1, ::-1], corner_height[::-1, ::-1])):
+            self.height = np.where(height > 0, height, self.height).astype(np.uint8)
+            cliffs = pathing == 2
+            ramps = pathing == 3
+            self.pathing[cliffs] = 0
+            self.placement[cliffs | ramps] = 0
+            self.pathing[ramps] = 1
+
+        # resources block pathing but not the static placement grid, like the grids a real client sends
+        for base in self.bases:
+            for x, y in base.minerals:
+                self.pathing[int(y), int(x) - 1 : int(x) + 1] = 0
+            for x, y in base.geysers:
+                self.pathing[int(y) - 1 : int(y) + 2, int(x) - 1 : int(x) + 2] = 0
+
+    def _expansion_position(self, base: Base) -> tuple[float, float]:
+        """Same search as `BotAI._find_expansion_locations`: the placeable point close to the resource center that
+        keeps 6 from every mineral field and 7 from every geyser"""
+        resources = [(position, 6.0) for position in base.minerals] + [(position, 7.0) for position in base.geysers]
+        center_x = int(sum(p[0] for p, _ in resources) / len(resources)) + 0.5
+        center_y = int(sum(p[1] for p, _ in resources) / len(resources)) + 0.5
+        candidates = []
+        for dx in range(-7, 8):
+            for dy in range(-7, 8):
+                if not 4 < math.hypot(dx, dy) <= 8:
+                    continue
+                x, y = center_x + dx, center_y + dy
+                if not self.placement[int(round(y)), int(round(x))]:
+                    continue
+                distances = [math.hypot(x - p[0], y - p[1]) for p, _ in resources]
+                if all(distance >= minimum for distance, (_, minimum) in zip(distances, resources)):
+                    candidates.append((sum(distances), (x, y)))
+        return min(candidates)[1]
+
+    def is_placeable(self, x: float, y: float, radius: float) -> bool:
+        """Whether a structure with the given footprint radius fits at (x, y) on the static grid"""
+        x0, y0 = int(round(x - radius)), int(round(y - radius))
+        size = int(round(radius * 2))
+        if x0 < 0 or y0 < 0 or x0 + size > MAP_SIZE or y0 + size > MAP_SIZE:
+            return False
+        return bool(self.placement[y0 : y0 + size, x0 : x0 + size].all())
+
+    def game_info(self, name: str, own_race: Race, enemy_race: Race, player_id: int = 1) -> sc_pb.ResponseGameInfo:
+        """The `RequestGameInfo` answer for the given player"""
+        size = common_pb2.Size2DI(x=MAP_SIZE, y=MAP_SIZE)
+        enemy_start = self.start_locations[1 if player_id == 1 else 0]
+        start_raw = raw_pb2.StartRaw(
+            map_size=size,
+            pathing_grid=common_pb2.ImageData(bits_per_pixel=1, size=size, data=np.packbits(self.pathing).tobytes()),
+            placement_grid=common_pb2.ImageData(
+                bits_per_pixel=1, size=size, data=np.packbits(self.placement).tobytes()
+            ),
+            terrain_height=common_pb2.ImageData(bits_per_pixel=8, size=size, data=self.height.tobytes()),
+            playable_area=common_pb2.RectangleI(
+                p0=common_pb2.PointI(x=PLAYABLE_BORDER, y=PLAYABLE_BORDER),
+                p1=common_pb2.PointI(x=MAP_SIZE - PLAYABLE_BORDER, y=MAP_SIZE - PLAYABLE_BORDER),
+            ),
+            start_locations=[common_pb2.Point2D(x=enemy_start[0], y=enemy_start[1])],
+        )
+        races = {player_id: own_race, 3 - player_id: enemy_race}
+        return sc_pb.ResponseGameInfo(
+            map_name=name,
+            local_map_path=f"{name}.SC2Map",
+            player_info=[
+                sc_pb.PlayerInfo(
+                    player_id=pid, type=sc_pb.Participant, race_requested=race.value, race_actual=race.value
+                )
+                for pid, race in sorted(races.items())
+            ],
+            start_raw=start_raw,
+            options=sc_pb.InterfaceOptions(raw=True, score=True, show_cloaked=True),
+        )
+
+    def resource_units(self) -> list[tuple[UnitID, tuple[float, float], int]]:
+        """(type, position, contents) of every mineral field and geyser"""
+        resources = []
+        for base in self.bases:
+            resources.extend((UnitID.MINERALFIELD, position, MINERAL_CONTENTS) for position in base.minerals)
+            resources.extend((UnitID.VESPENEGEYSER, position, VESPENE_CONTENTS) for position in base.geysers)
+        return resources
@@ -17,9 +17,6 @@ sys.path.append("ares-sc2")
 
 import yaml
 
-from bot.main import MyBot
-from ladder import run_ladder_game
-
 plt = platform.system()
 # change if non default setup / linux
 # if having issues with this, modify `map_list` below manually
@@ -43,6 +40,35 @@ MY_BOT_NAME: str = "MyBotName"
 MY_BOT_RACE: str = "MyBotRace"
 
 
+def get_map_list() -> List[str]:
+    """Maps found in `MAPS_PATH`, or recent ladder maps if there are none"""
+    map_list: List[str] = [
+        p.name.replace(f".{MAP_FILE_EXT}", "")
+        for p in Path(MAPS_PATH).glob(f"*.{MAP_FILE_EXT}")
+        if p.is_file()
+    ]
+    if len(map_list) == 0:
+        logger.error(f"Can't find maps, please check `MAPS_PATH` in `run.py'")
+        logger.info("Trying back up option")
+        logger.info(
+            f"\nLooking for maps in {MAPS_PATH} but didn't find anything. \n"
+            f"If this path is correct please ensure maps are present. \n"
+            f"If this path is incorrect please edit the `MAPS_PATH` in `run.py` \n"
+            f"Tip: If you're using linux, MAPS_PATH will definitely need updating\n"
+        )
+
+        # see if user has any recent ladder maps
+        map_list: List[str] = [
+            "AbyssalReefAIE",
+            "AutomationAIE",
+            "EphemeronAIE",
+            "InterloperAIE",
+            "ThunderbirdAIE",
+        ]
+
+    return map_list
+
+
 def main():
     bot_name: str = "MyBot"
     race: Race = Race.Random
@@ -58,38 +84,27 @@ def main():
             if MY_BOT_RACE in config:
                 race = Race[config[MY_BOT_RACE].title()]
 
+    if "--batch" in sys.argv:
+        # Many local games in parallel, see `batch_runner.py`, only the workers import and create the bot
+        from batch_runner import main as run_batch
+
+        run_batch(sys.argv[sys.argv.index("--batch") + 1 :], get_map_list(), bot_name, race)
+        return
+
+    from bot.main import MyBot
+
     bot1 = Bot(race, MyBot(), bot_name)
 
     if "--LadderServer" in sys.argv:
         # Ladder game started by LadderManager
+        from ladder import run_ladder_game
+
         print("Starting ladder game...")
         result, opponentid = run_ladder_game(bot1)
         print(result, " against opponent ", opponentid)
     else:
         # Local game
-        map_list: List[str] = [
-            p.name.replace(f".{MAP_FILE_EXT}", "")
-            for p in Path(MAPS_PATH).glob(f"*.{MAP_FILE_EXT}")
-            if p.is_file()
-        ]
-        if len(map_list) == 0:
-            logger.error(f"Can't find maps, please check `MAPS_PATH` in `run.py'")
-            logger.info("Trying back up option")
-            logger.info(
-                f"\nLooking for maps in {MAPS_PATH} but didn't find anything. \n"
-                f"If this path is correct please ensure maps are present. \n"
-                f"If this path is incorrect please edit the `MAPS_PATH` in `run.py` \n"
-                f"Tip: If you're using linux, MAPS_PATH will definitely need updating\n"
-            )
-
-            # see if user has any recent ladder maps
-            map_list: List[str] = [
-                "AbyssalReefAIE",
-                "AutomationAIE",
-                "EphemeronAIE",
-                "InterloperAIE",
-                "ThunderbirdAIE",
-            ]
+        map_list: List[str] = get_map_list()
 
         random_race = random.choice([Race.Zerg, Race.Terran, Race.Protoss])
         print("Starting local game...")
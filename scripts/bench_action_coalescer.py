@@ -0,0 +1,134 @@
+"""
+Compare the action requests of one frame of a 150 unit army fight before and after `ActionCoalescer`. The frame mixes
+the commands of the combat behaviors as they are issued during a step:
+
+- `GroupAMove` on the whole army through `give_same_action`, ares sent these as a request of their own
+- `ShootTargetInRange` on the units with a target in range, spread over a handful of enemy units
+- `StutterUnitBack` on the units on weapon cooldown, each to its own retreat position
+- `KeepUnitSafe` on the units low on shields, again to their own positions
+- `AMove` on the units with nothing better to do
+
+Before, the individual commands went through python-sc2's `combine_actions`, which only merges commands that happen to
+be issued back to back, so a unit commanded by several behaviors was also sent every one of those commands. Units are
+minimal stand ins carrying only the fields the coalescer reads.
+
+Run from the root of the repo: `python scripts/bench_action_coalescer.py`
+"""
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append("ares-sc2/src/ares")
+sys.path.append("ares-sc2/src")
+sys.path.append("ares-sc2")
+sys.path.append(".")
+
+from google.protobuf.internal import api_implementation
+from s2clientprotocol import raw_pb2, sc2api_pb2
+from sc2.action import combine_actions
+from sc2.constants import COMBINEABLE_ABILITIES
+from sc2.ids.ability_id import AbilityId
+from sc2.position import Point2
+from sc2.unit import Unit
+
+from bot.combat.action_coalescer import BEHAVIOR_PRIORITY, ActionCoalescer
+
+# the frame names its behaviors, the coalescer keys priorities by class
+PRIORITY_BY_NAME: dict[str, int] = {cls.__name__: priority for cls, priority in BEHAVIOR_PRIORITY.items()}
+
+ARMY_SIZE: int = 150
+ENEMY_TARGETS: int = 8
+ITERATIONS: int = 2_000
+
+
+def make_frame(rng: np.random.Generator) -> list[tuple[str, list]]:
+    """(behavior, commands) in the order the behaviors run, a command is (ability, tags, target)"""
+    tags = list(range(1, ARMY_SIZE + 1))
+    attack_target = Point2((120.0, 80.0))
+    in_range = [tag for tag in tags if rng.random() < 0.6]
+    on_cooldown = [tag for tag in in_range if rng.random() < 0.4]
+    low_shields = [tag for tag in tags if rng.random() < 0.1]
+    bot_object = SimpleNamespace(state=SimpleNamespace(game_loop=0))
+    enemies = [Unit(raw_pb2.Unit(tag=10_000 + i), bot_object) for i in range(ENEMY_TARGETS)]
+
+    def retreat() -> Point2:
+        return Point2((float(rng.uniform(90, 110)), float(rng.uniform(60, 80))))
+
+    return [
+        ("GroupAMove", [(AbilityId.ATTACK, tags, attack_target)]),
+        (
+            "ShootTargetInRange",
+            [(AbilityId.ATTACK, [tag], enemies[int(rng.integers(ENEMY_TARGETS))]) for tag in in_range],
+        ),
+        ("StutterUnitBack", [(AbilityId.MOVE, [tag], retreat()) for tag in on_cooldown]),
+        ("KeepUnitSafe", [(AbilityId.MOVE, [tag], retreat()) for tag in low_shields]),
+        ("AMove", [(AbilityId.ATTACK, [tag], attack_target) for tag in tags if tag not in in_range]),
+    ]
+
+
+def before(frame: list[tuple[str, list]]) -> list[sc2api_pb2.RequestAction]:
+    """`give_same_action` as its own request, everything else through `combine_actions` in issue order"""
+    same_order: list[raw_pb2.ActionRaw] = []
+    actions: list[SimpleNamespace] = []
+    for behavior, commands in frame:
+        for ability, tags, target in commands:
+            if behavior == "GroupAMove":
+                same_order.append(ActionCoalescer._raw_action(ability, target, False, tags))
+                continue
+            actions.append(
+                SimpleNamespace(
+                    unit=SimpleNamespace(tag=tags[0]),
+                    combining_tuple=(ability, target, False, ability in COMBINEABLE_ABILITIES),
+                )
+            )
+    raw = list(combine_actions(actions))
+    return [
+        sc2api_pb2.RequestAction(actions=[sc2api_pb2.Action(action_raw=action) for action in raw]),
+        sc2api_pb2.RequestAction(actions=[sc2api_pb2.Action(action_raw=action) for action in same_order]),
+    ]
+
+
+def after(frame: list[tuple[str, list]], coalescer: ActionCoalescer) -> list[sc2api_pb2.RequestAction]:
+    for behavior, commands in frame:
+        coalescer.priority = PRIORITY_BY_NAME[behavior]
+        for ability, tags, target in commands:
+            coalescer.add_same(ability, tags, target)
+    actions = coalescer.build_actions()
+    return [sc2api_pb2.RequestAction(actions=[sc2api_pb2.Action(action_raw=action) for action in actions])]
+
+
+def describe(name: str, requests: list[sc2api_pb2.RequestAction], seconds: float) -> None:
+    requests = [request for request in requests if request.actions]
+    actions = sum(len(request.actions) for request in requests)
+    unit_commands = sum(len(action.action_raw.unit_command.unit_tags) for r in requests for action in r.actions)
+    size = sum(request.ByteSize() for request in requests)
+    print(
+        f"{name:>8} {len(requests):>3} requests {actions:>5} actions {unit_commands:>5} unit commands "
+        f"{size:>7} bytes {seconds * 1e6:>8.1f}us to build"
+    )
+
+
+def time_call(func) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func()
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+if __name__ == "__main__":
+    frame = make_frame(np.random.default_rng(0))
+    ai = SimpleNamespace(
+        unit_tag_dict={tag: SimpleNamespace(tag=tag, orders=[]) for tag in range(1, ARMY_SIZE + 1)},
+        unit_tags_received_action=set(),
+    )
+    coalescer = ActionCoalescer(ai)
+
+    print(
+        f"{ARMY_SIZE} units, {sum(len(commands) for _, commands in frame)} behavior commands, "
+        f"{api_implementation.Type()} protobuf"
+    )
+    describe("before", before(frame), time_call(lambda: before(frame)))
+    describe("after", after(frame, coalescer), time_call(lambda: after(frame, coalescer)))
@@ -0,0 +1,109 @@
+"""
+Compare the mineral line threat check of `Proxy4GateManager._defend_mineral_line` before and after `BaseThreatIndex`
+as the number of bases grows: 2 to 8 bases with 8 mineral fields and 22 workers each, against 40 enemy units of which a
+handful are in the first mineral line. The old check scans every mineral field, enemy and worker once per townhall, the
+index buckets every enemy and worker to its closest mineral line in one pass. Units are minimal stand ins carrying only
+the fields the checks read.
+
+Run from the root of the repo: `python scripts/bench_base_threat_index.py`
+"""
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append("ares-sc2/src/ares")
+sys.path.append("ares-sc2/src")
+sys.path.append("ares-sc2")
+sys.path.append(".")
+
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.position import Point2
+
+from bot.combat.base_threat_index import MINERAL_FIELD_DISTANCE, BaseThreatIndex
+
+BASE_COUNTS: list[int] = [2, 4, 8]
+FIELDS_PER_BASE: int = 8
+WORKERS_PER_BASE: int = 22
+ENEMY_COUNT: int = 40
+ENEMIES_IN_MINERAL_LINE: int = 5
+ITERATIONS: int = 500
+
+
+class MineralFields(list):
+    """Stand in for `Units` with the two calls `BaseThreatIndex.add` makes"""
+
+    def closer_than(self, distance: float, unit) -> "MineralFields":
+        return MineralFields(field for field in self if field.distance_to(unit.position) < distance)
+
+    @property
+    def center(self) -> Point2:
+        return Point2((sum(f.position.x for f in self) / len(self), sum(f.position.y for f in self) / len(self)))
+
+
+def make_unit(tag: int, x: float, y: float, type_id: UnitID = UnitID.PROBE) -> SimpleNamespace:
+    position = Point2((x, y))
+    return SimpleNamespace(
+        tag=tag, type_id=type_id, is_ready=True, position=position, distance_to=position.distance_to
+    )
+
+
+def make_game(rng: np.random.Generator, bases: int) -> SimpleNamespace:
+    townhalls, fields, workers = [], MineralFields(), []
+    for b in range(bases):
+        x, y = 20.0 + 25 * (b % 4), 20.0 + 60 * (b // 4)
+        townhalls.append(make_unit(1000 + b, x, y, UnitID.NEXUS))
+        for f in range(FIELDS_PER_BASE):
+            angle = np.pi * (0.25 + 0.5 * f / (FIELDS_PER_BASE - 1))
+            fields.append(make_unit(2000 + b * 10 + f, x + 7 * np.cos(angle), y + 7 * np.sin(angle)))
+        for w in range(WORKERS_PER_BASE):
+            workers.append(make_unit(3000 + b * 100 + w, *(rng.uniform(-4, 4, size=2) + (x, y + 4))))
+
+    enemies = [make_unit(4000 + e, *(rng.uniform(-3, 3, size=2) + (20, 26))) for e in range(ENEMIES_IN_MINERAL_LINE)]
+    enemies += [
+        make_unit(4000 + e, *rng.uniform(120, 160, size=2)) for e in range(ENEMIES_IN_MINERAL_LINE, ENEMY_COUNT)
+    ]
+    return SimpleNamespace(townhalls=townhalls, mineral_field=fields, workers=workers, enemy_units=enemies)
+
+
+def old_check(game: SimpleNamespace) -> dict[int, list[int]]:
+    """`closer_than` per townhall, as the manager did"""
+    defending: dict[int, list[int]] = {}
+    for townhall in game.townhalls:
+        mineral_fields = game.mineral_field.closer_than(MINERAL_FIELD_DISTANCE, townhall)
+        center = mineral_fields.center
+        enemy_units = [u for u in game.enemy_units if u.distance_to(center) < 10]
+        if enemy_units:
+            defending[townhall.tag] = [w.tag for w in game.workers if w.distance_to(center) < 10]
+    return defending
+
+
+def time_per_frame(function, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        function(*args)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'bases':>6} {'workers':>8} {'before (us)':>12} {'after (us)':>11} {'defenders':>10}")
+    for bases in BASE_COUNTS:
+        game = make_game(rng, bases)
+        index = BaseThreatIndex()
+        for townhall in game.townhalls:
+            index.add(game, townhall)
+
+        before = time_per_frame(old_check, game)
+        after = time_per_frame(index.update, game)
+        old_defenders = sum(len(tags) for tags in old_check(game).values())
+        new_defenders = sum(len(workers) for workers in index.workers.values())
+        print(
+            f"{bases:>6} {len(game.workers):>8} {before:>12.1f} {after:>11.1f} "
+            f"{old_defenders:>4} / {new_defenders:<4}"
+        )
+
+
+if __name__ == "__main__":
+    main()
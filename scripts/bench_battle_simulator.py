@@ -0,0 +1,66 @@
+"""
+Microbenchmark for `bot.combat.battle_simulator`. Builds random stalker / zealot like armies directly as arrays and
+times a single scenario and a batch of 32 what-if scenarios at 20, 100 and 200 units per side.
+
+Run from the root of the repo: `python scripts/bench_battle_simulator.py`
+"""
+import sys
+import time
+
+import numpy as np
+
+sys.path.append("ares-sc2/src/ares")
+sys.path.append("ares-sc2/src")
+sys.path.append("ares-sc2")
+sys.path.append(".")
+
+from bot.combat.battle_simulator import ArmyArrays, simulate
+
+SIZES: list[int] = [20, 100, 200]
+SCENARIOS: int = 32
+REPEATS: int = 20
+
+
+def random_army(n: int, rng: np.random.Generator) -> ArmyArrays:
+    ranged = rng.random(n) < 0.6
+    return ArmyArrays(
+        ground_hits=np.where(ranged, 1 / 1.34, 2 / 1.2),
+        ground_damage=np.where(ranged, 13.0, 8.0),
+        air_hits=np.where(ranged, 1 / 1.34, 0.0),
+        air_damage=np.where(ranged, 13.0, 0.0),
+        range=np.where(ranged, 6.0, 0.1),
+        health=np.where(ranged, 80.0, 100.0),
+        shields=np.where(ranged, 80.0, 50.0),
+        armor=np.ones(n),
+        is_flying=np.zeros(n, dtype=bool),
+    )
+
+
+def time_call(func) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return (time.perf_counter() - start) / REPEATS * 1000.0
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"{'units/side':>10} {'1 scenario':>12} {f'{SCENARIOS} scenarios':>14} {'per scenario':>13}")
+    for size in SIZES:
+        own = random_army(size, rng)
+        enemy = random_army(size, rng)
+        # what-ifs: drop a growing number of our units, e.g. the ones that would be retreating
+        own_masks = np.ones((SCENARIOS, size), dtype=bool)
+        for s in range(SCENARIOS):
+            own_masks[s, : s * size // (SCENARIOS * 2)] = False
+
+        single = time_call(lambda: simulate(own, enemy))
+        batch = time_call(lambda: simulate(own, enemy, own_masks=own_masks))
+        print(f"{size:>10} {single:>10.2f}ms {batch:>12.2f}ms {batch / SCENARIOS:>11.3f}ms")
+
+    result = simulate(own, enemy, own_masks=own_masks)
+    print(
+        f"\n200 v 200 full army: own survivors {result.own_survivors[0]}, enemy survivors "
+        f"{result.enemy_survivors[0]}, time to kill {result.time_to_kill[0]:.1f}s"
+    )
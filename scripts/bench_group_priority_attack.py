@@ -0,0 +1,145 @@
+"""
+Time the focus fire assignment of `GroupPriorityAttack` on a 100 vs 100 fight: a mixed ground and air army against a
+zerg army with spines and queens, spread over a 30x30 area so most units have several targets in range. Reports the
+time to convert the units to arrays and to assign targets, and the overkill of the assignment against every attacker
+shooting its closest target. Units are minimal stand ins carrying only the fields the conversion reads.
+
+Run from the root of the repo: `python scripts/bench_group_priority_attack.py`
+"""
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append("ares-sc2/src/ares")
+sys.path.append("ares-sc2/src")
+sys.path.append("ares-sc2")
+sys.path.append(".")
+
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.position import Point2
+
+from bot.combat.battle_simulator import ArmyArrays
+from bot.combat.group.group_priority_attack import (
+    EXPECTED_DAMAGE_SECONDS,
+    PRIORITY_ATTACK_ORDER,
+    _positions_and_ranges,
+    assign_targets,
+    priority_weights,
+)
+
+ARMY_SIZE: int = 100
+ITERATIONS: int = 500
+
+# type, health, shields, armor, radius, ground (hits/s, damage, range), air (hits/s, damage, range), flying, structure
+OWN_TYPES: list[tuple] = [
+    (UnitID.ZEALOT, 100, 50, 1, 0.5, (2.33, 8, 0.1), (0, 0, 0), False, False),
+    (UnitID.STALKER, 80, 80, 1, 0.625, (0.74, 13, 6), (0.74, 13, 6), False, False),
+    (UnitID.IMMORTAL, 200, 100, 1, 0.75, (0.93, 20, 6), (0, 0, 0), False, False),
+    (UnitID.VOIDRAY, 150, 100, 0, 1.0, (2.78, 6, 6), (2.78, 6, 6), True, False),
+]
+ENEMY_TYPES: list[tuple] = [
+    (UnitID.ZERGLING, 35, 0, 0, 0.375, (2.01, 5, 0.1), (0, 0, 0), False, False),
+    (UnitID.ROACH, 145, 0, 1, 0.625, (0.7, 16, 4), (0, 0, 0), False, False),
+    (UnitID.HYDRALISK, 90, 0, 0, 0.625, (1.69, 12, 5), (1.69, 12, 5), False, False),
+    (UnitID.QUEEN, 175, 0, 1, 0.875, (1.41, 8, 5), (1.41, 9, 7), False, False),
+    (UnitID.SPINECRAWLER, 300, 0, 2, 1.0, (0.54, 25, 7), (0, 0, 0), False, True),
+    (UnitID.MUTALISK, 120, 0, 0, 0.5, (0.66, 9, 3), (0.66, 9, 3), True, False),
+]
+
+
+def make_army(rng: np.random.Generator, types: list[tuple], center: tuple[float, float]) -> list[SimpleNamespace]:
+    units = []
+    for i in range(ARMY_SIZE):
+        type_id, health, shields, armor, radius, ground, air, flying, structure = types[i % len(types)]
+        x, y = rng.uniform(-15, 15, size=2) + center
+        weapons = []
+        if ground[0]:
+            weapons.append(SimpleNamespace(type=1, attacks=1, speed=1 / ground[0], damage=ground[1]))
+        if air[0]:
+            weapons.append(SimpleNamespace(type=2, attacks=1, speed=1 / air[0], damage=air[1]))
+        units.append(
+            SimpleNamespace(
+                type_id=type_id,
+                position=Point2((float(x), float(y))),
+                radius=radius,
+                ground_range=ground[2],
+                air_range=air[2],
+                _weapons=weapons,
+                attack_upgrade_level=0,
+                armor_upgrade_level=0,
+                health=float(health) * rng.uniform(0.3, 1.0),
+                shield=float(shields),
+                armor=armor,
+                is_flying=flying,
+                is_structure=structure,
+            )
+        )
+    return units
+
+
+def convert(own: list, enemy: list) -> tuple:
+    attacker_positions, attacker_ranges = _positions_and_ranges(own)
+    target_positions, _ = _positions_and_ranges(enemy)
+    weights = priority_weights(
+        [u.type_id for u in enemy], np.array([u.is_structure for u in enemy], dtype=bool), PRIORITY_ATTACK_ORDER
+    )
+    return (
+        ArmyArrays.from_units(own),
+        attacker_positions,
+        attacker_ranges,
+        ArmyArrays.from_units(enemy),
+        target_positions,
+        weights,
+    )
+
+
+def closest_target(arrays: tuple) -> np.ndarray:
+    """Every attacker on the closest target it can hit"""
+    attackers, attacker_positions, _, targets, target_positions, _ = arrays
+    distance = np.hypot(
+        attacker_positions[:, 0, None] - target_positions[None, :, 0],
+        attacker_positions[:, 1, None] - target_positions[None, :, 1],
+    )
+    can_hit = np.where(targets.is_flying[None, :], attackers.air_hits[:, None], attackers.ground_hits[:, None]) > 0
+    return np.where(can_hit, distance, np.inf).argmin(axis=1)
+
+
+def overkill(arrays: tuple, assignment: np.ndarray) -> tuple[float, int]:
+    """Expected damage beyond what the targets have left, and the number of targets attacked"""
+    attackers, _, _, targets, _, _ = arrays
+    flying = targets.is_flying[assignment]
+    hits = np.where(flying, attackers.air_hits, attackers.ground_hits)
+    damage = np.where(flying, attackers.air_damage, attackers.ground_damage)
+    expected = hits * np.maximum(damage - targets.armor[assignment], 0.5) * EXPECTED_DAMAGE_SECONDS
+    dealt = np.bincount(assignment, weights=expected, minlength=len(targets))
+    remaining = targets.health + targets.shields
+    return float(np.maximum(dealt - remaining, 0).sum()), int((dealt > 0).sum())
+
+
+def time_call(func) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func()
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    own = make_army(rng, OWN_TYPES, (50.0, 50.0))
+    enemy = make_army(rng, ENEMY_TYPES, (56.0, 50.0))
+    arrays = convert(own, enemy)
+
+    conversion = time_call(lambda: convert(own, enemy))
+    assignment_time = time_call(lambda: assign_targets(*arrays))
+    print(f"{ARMY_SIZE} vs {ARMY_SIZE}")
+    print(f"{'convert':>10} {conversion:>8.1f}us")
+    print(f"{'assign':>10} {assignment_time:>8.1f}us")
+
+    assignment = assign_targets(*arrays)
+    assigned = assignment >= 0
+    for name, targets in (("closest", closest_target(arrays)[assigned]), ("focus", assignment[assigned])):
+        wasted, attacked = overkill(arrays, targets)
+        print(f"{name:>10} {attacked:>4} targets attacked {wasted:>8.1f} overkill damage per second")
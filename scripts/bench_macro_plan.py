@@ -0,0 +1,150 @@
+"""
+Compare the allocations made per step by building a new MacroPlan every step (the old `MyBot._macro`) against
+`MacroPlanCache`. Uses a minimal stand in for the bot, as only the plan construction is measured the behaviors are
+never executed.
+
+Before timing, the cached plan is stepped through the states of a game (opening, build completed, new bases, the time
+thresholds) and compared with the plan the old `_macro` built on the same step: the same behaviors with the same
+settings in the same order, and a fresh instance of every behavior that keeps state while it executes.
+
+Run from the root of the repo: `python scripts/bench_macro_plan.py`
+"""
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.append("ares-sc2/src/ares")
+sys.path.append("ares-sc2/src")
+sys.path.append("ares-sc2")
+sys.path.append(".")
+
+from ares.behaviors.macro import (
+    AutoSupply,
+    BuildWorkers,
+    ExpansionController,
+    GasBuildingController,
+    MacroPlan,
+    ProductionController,
+    RestorePower,
+    SpawnController,
+    UpgradeController,
+)
+from sc2.data import Race
+from sc2.position import Point2
+
+from bot.macro.macro_plan_cache import MacroPlanCache
+from bot.macro.protoss.chrono_controller import ChronoController
+from bot.macro.protoss.townhall_pylon_controller import TownhallPylonController
+from bot.main import ARMY_COMPS, DESIRED_UPGRADES
+
+STEPS: int = 2000
+
+
+def fake_ai() -> SimpleNamespace:
+    return SimpleNamespace(
+        race=Race.Protoss,
+        time=400.0,
+        time_formatted="06:40",
+        townhalls=[object()] * 4,
+        expansion_locations_list=[Point2((i, i)) for i in range(16)],
+        current_base_target=Point2((120.0, 30.0)),
+        build_order_runner=SimpleNamespace(build_completed=True, chosen_opening="1GateExpand"),
+    )
+
+
+def uncached_plan(ai: SimpleNamespace, build_location: Point2) -> MacroPlan:
+    """The plan exactly as the old `_macro` built it every step"""
+    macro_plan: MacroPlan = MacroPlan()
+    macro_plan.add(ChronoController())
+    macro_plan.add(RestorePower())
+    if ai.time > 120:
+        macro_plan.add(TownhallPylonController())
+    if ai.build_order_runner.chosen_opening != "4GateRush" or ai.time > 300:
+        if ai.build_order_runner.build_completed:
+            macro_plan.add(AutoSupply(base_location=build_location))
+            macro_plan.add(BuildWorkers(to_count=min(90, len(ai.townhalls) * 21 + 3)))
+            macro_plan.add(GasBuildingController(to_count=len(ai.townhalls) * 2))
+            macro_plan.add(ExpansionController(to_count=len(ai.expansion_locations_list), max_pending=2))
+            macro_plan.add(UpgradeController(DESIRED_UPGRADES[ai.race], build_location))
+            macro_plan.add(SpawnController(ARMY_COMPS[ai.race], spawn_target=ai.current_base_target))
+            if len(ai.townhalls) > 3:
+                macro_plan.add(ProductionController(ARMY_COMPS[ai.race], build_location, (400, 200)))
+    elif ai.build_order_runner.build_completed:
+        macro_plan.add(AutoSupply(base_location=build_location))
+        macro_plan.add(BuildWorkers(to_count=min(90, len(ai.townhalls) * 21 + 3)))
+        macro_plan.add(ExpansionController(to_count=len(ai.expansion_locations_list), max_pending=2))
+        macro_plan.add(SpawnController(ARMY_COMPS[ai.race], spawn_target=ai.current_base_target))
+        macro_plan.add(ProductionController(ARMY_COMPS[ai.race], build_location, (400, 200)))
+    return macro_plan
+
+
+def check_matches_uncached(cache: MacroPlanCache, build_location: Point2) -> None:
+    """Step the cache through a game and compare each plan with the one built from scratch"""
+    ai = fake_ai()
+    previous: list = []
+    for time_, townhalls, opening, build_completed in (
+        (30.0, 1, "4GateRush", False),
+        (150.0, 1, "4GateRush", False),
+        (200.0, 1, "4GateRush", True),
+        (200.0, 1, "4GateRush", True),
+        (320.0, 2, "4GateRush", True),
+        (60.0, 1, "1GateExpand", True),
+        (130.0, 3, "1GateExpand", True),
+        (130.0, 4, "1GateExpand", True),
+        (400.0, 4, "1GateExpand", True),
+    ):
+        ai.time = time_
+        ai.townhalls = [object()] * townhalls
+        ai.build_order_runner = SimpleNamespace(build_completed=build_completed, chosen_opening=opening)
+
+        macros: list = cache.get_plan(ai, build_location).macros
+        expected: list = uncached_plan(ai, build_location).macros
+        assert macros == expected, f"{time_}s {townhalls} bases {opening}: {macros} != {expected}"
+        reused = {id(behavior) for behavior in previous}
+        for behavior in macros:
+            if isinstance(behavior, (SpawnController, ProductionController)):
+                assert id(behavior) not in reused, f"{type(behavior).__name__} reused between steps"
+        previous = macros
+
+
+def time_per_step(step) -> float:
+    step()
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        step()
+    return (time.perf_counter() - start) / STEPS * 1e6
+
+
+def count_allocations(step) -> float:
+    """Average bytes allocated per step, freed or not, measured as the growth of tracemalloc's peak during a step"""
+    step()
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(STEPS):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        step()
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += max(0, peak - before)
+    tracemalloc.stop()
+    return allocated / STEPS
+
+
+if __name__ == "__main__":
+    ai = fake_ai()
+    build_location = Point2((30.0, 30.0))
+    check_matches_uncached(MacroPlanCache(ARMY_COMPS, DESIRED_UPGRADES), build_location)
+    print("cached plans match the plans built every step")
+
+    cache = MacroPlanCache(ARMY_COMPS, DESIRED_UPGRADES)
+    old_step = lambda: uncached_plan(ai, build_location)
+    new_step = lambda: cache.get_plan(ai, build_location)
+
+    print(f"{STEPS} steps, steady state (4 townhalls, build completed, 6:40)")
+    for name, step in (("uncached", old_step), ("cached", new_step)):
+        print(
+            f"{name:>10}: {count_allocations(step):10.1f} bytes allocated/step, "
+            f"{time_per_step(step):8.2f} us/step"
+        )
+    print(f"plan rebuilds with cache: {cache.rebuilds}")
@@ -0,0 +1,87 @@
+"""
+Compare `SquadClusterer` warm started from the last frame against clustering from scratch every frame, at 50, 150 and
+250 units. Units start in a few blobs and drift a little every frame, with a tenth of them running across the map, like
+an army walking to an attack target with reinforcements on the way. Reports the time per frame, how many units were
+re-clustered and how many units changed squad id from one frame to the next. From scratch, squads are numbered in scan
+order every frame, so its id changes are a lower bound. Units are minimal stand ins carrying only the fields the
+clusterer reads.
+
+Run from the root of the repo: `python scripts/bench_squad_clusterer.py`
+"""
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append("ares-sc2/src/ares")
+sys.path.append("ares-sc2/src")
+sys.path.append("ares-sc2")
+sys.path.append(".")
+
+from sc2.position import Point2
+
+from bot.combat.squad_clusterer import SquadClusterer
+
+UNIT_COUNTS: list[int] = [50, 150, 250]
+FRAMES: int = 200
+# same radius as `Proxy4GateManager`
+SQUAD_RADIUS: float = 9.0
+# distance walked per frame by most units and by the runners, roughly a stalker at 1 and 8 game loops per frame
+DRIFT: float = 0.25
+RUNNER_SPEED: float = 1.5
+RUNNER_FRACTION: float = 0.1
+BLOBS: int = 5
+
+
+def make_frames(rng: np.random.Generator, count: int) -> list[list[SimpleNamespace]]:
+    blobs = rng.uniform(20, 180, size=(BLOBS, 2))
+    positions = blobs[rng.integers(BLOBS, size=count)] + rng.normal(0, 3, size=(count, 2))
+    runners = rng.random(count) < RUNNER_FRACTION
+    heading = rng.normal(size=(count, 2))
+    heading /= np.linalg.norm(heading, axis=1, keepdims=True)
+    target = np.array([100.0, 100.0])
+
+    frames = []
+    for _ in range(FRAMES):
+        to_target = target - positions
+        to_target /= np.maximum(np.linalg.norm(to_target, axis=1, keepdims=True), 1e-9)
+        positions = positions + np.where(runners[:, None], heading * RUNNER_SPEED, to_target * DRIFT * 0.2)
+        positions += rng.normal(0, DRIFT, size=(count, 2))
+        frames.append(
+            [SimpleNamespace(tag=i, position=Point2((float(x), float(y)))) for i, (x, y) in enumerate(positions)]
+        )
+    return frames
+
+
+def run(frames: list[list[SimpleNamespace]], warm_start: bool) -> tuple[float, float, float]:
+    """Time per frame in ms, units re-clustered per frame and units changing squad id per frame"""
+    clusterer = SquadClusterer(SQUAD_RADIUS)
+    previous: dict[int, int] = {}
+    elapsed, reclustered, changed = 0.0, 0, 0
+    for units in frames:
+        if not warm_start:
+            clusterer = SquadClusterer(SQUAD_RADIUS)
+        start = time.perf_counter()
+        squads = clusterer.update(units)
+        elapsed += time.perf_counter() - start
+        reclustered += clusterer.reclustered
+
+        current = {unit.tag: squad.squad_id for squad in squads for unit in squad.squad_units}
+        changed += sum(1 for tag, squad_id in current.items() if tag in previous and previous[tag] != squad_id)
+        previous = current
+    return elapsed / len(frames) * 1e3, reclustered / len(frames), changed / len(frames)
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'units':>6} {'':>13} {'ms/frame':>9} {'reclustered':>12} {'id changes':>11}")
+    for count in UNIT_COUNTS:
+        frames = make_frames(rng, count)
+        for name, warm_start in (("from scratch", False), ("warm start", True)):
+            ms, reclustered, changed = run(frames, warm_start)
+            print(f"{count:>6} {name:>13} {ms:>9.3f} {reclustered:>12.1f} {changed:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compare the structure lookups of `CustomBuildOrderRunner.do_step` before and after `StructureIndex` on a late game
+base layout of 80 structures: the "structure near this build target" check of each persistent builder, the idle ready
+gateway check, the nexus with 50 energy for chrono and the idle structure for an add-on. Structures are minimal stand
+ins carrying only the fields the lookups read.
+
+Run from the root of the repo: `python scripts/bench_structure_index.py`
+"""
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append("ares-sc2/src/ares")
+sys.path.append("ares-sc2/src")
+sys.path.append("ares-sc2")
+sys.path.append(".")
+
+from cython_extensions import cy_distance_to_squared
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.position import Point2
+
+from bot.macro.structure_index import StructureIndex
+from bot.manager.macro.custom_build_order_runner import STRUCTURE_AT_TARGET_DISTANCE
+
+# late game protoss, 80 structures over 5 bases
+LAYOUT: dict[UnitID, int] = {
+    UnitID.NEXUS: 5,
+    UnitID.PYLON: 24,
+    UnitID.ASSIMILATOR: 10,
+    UnitID.GATEWAY: 4,
+    UnitID.WARPGATE: 12,
+    UnitID.PHOTONCANNON: 10,
+    UnitID.SHIELDBATTERY: 6,
+    UnitID.FORGE: 2,
+    UnitID.CYBERNETICSCORE: 1,
+    UnitID.TWILIGHTCOUNCIL: 1,
+    UnitID.ROBOTICSFACILITY: 3,
+    UnitID.ROBOTICSBAY: 1,
+    UnitID.STARGATE: 1,
+}
+PERSISTENT_BUILDERS: int = 2
+ITERATIONS: int = 20_000
+
+
+def make_structures(rng: np.random.Generator) -> list[SimpleNamespace]:
+    bases = rng.uniform(20, 140, size=(LAYOUT[UnitID.NEXUS], 2))
+    structures = []
+    for type_id, count in LAYOUT.items():
+        for _ in range(count):
+            x, y = bases[len(structures) % len(bases)] + rng.uniform(-10, 10, size=2)
+            ready = rng.random() > 0.05
+            structures.append(
+                SimpleNamespace(
+                    tag=len(structures) + 1,
+                    type_id=type_id,
+                    position=Point2((float(x), float(y))),
+                    is_ready=ready,
+                    build_progress=1.0 if ready else float(rng.random()),
+                    # gateways are all busy so the lookups have to look at every candidate
+                    is_idle=type_id != UnitID.GATEWAY and rng.random() > 0.5,
+                    energy=float(rng.uniform(0, 45)),
+                    footprint_radius=2.5 if type_id == UnitID.NEXUS else 1.5,
+                )
+            )
+    return structures
+
+
+def scan_step(structures: list, townhalls: list, targets: list[Point2]) -> None:
+    """The lookups as `do_step` did them, scanning every structure"""
+    for target in targets:
+        [s for s in structures if cy_distance_to_squared(s.position, target) < 6 and s.build_progress > 0.95]
+    [g for g in structures if g.type_id == UnitID.GATEWAY and g.is_ready and g.is_idle]
+    [th for th in townhalls if th.energy >= 50 and th.is_ready]
+    [s for s in structures if s.is_ready and s.is_idle and s.type_id == UnitID.ROBOTICSFACILITY]
+
+
+def index_step(index: StructureIndex, ai: SimpleNamespace, targets: list[Point2]) -> None:
+    for target in targets:
+        index.has_structure_near(ai, target, STRUCTURE_AT_TARGET_DISTANCE, min_progress=0.95)
+    index.idle_ready(ai, UnitID.GATEWAY)
+    index.ready_with_energy(ai, UnitID.NEXUS, 50)
+    index.idle_ready(ai, UnitID.ROBOTICSFACILITY)
+
+
+def time_call(func) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func()
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    structures = make_structures(rng)
+    townhalls = [s for s in structures if s.type_id == UnitID.NEXUS]
+    targets = [Point2((float(x), float(y))) for x, y in rng.uniform(20, 140, size=(PERSISTENT_BUILDERS, 2))]
+
+    index = StructureIndex()
+    for structure in structures:
+        index.add(structure)
+    ai = SimpleNamespace(unit_tag_dict={s.tag: s for s in structures})
+
+    scan = time_call(lambda: scan_step(structures, townhalls, targets))
+    indexed = time_call(lambda: index_step(index, ai, targets))
+    print(f"{len(structures)} structures, {PERSISTENT_BUILDERS} persistent builders")
+    print(f"{'scan':>10} {scan:>8.2f}us per step")
+    print(f"{'index':>10} {indexed:>8.2f}us per step ({scan / indexed:.1f}x)")
@@ -0,0 +1,34 @@
+"""
+Validate every `<race>_builds.yml` (see `bot/config/build_validation.py`).
+
+Exits with an error listing every invalid build step, run it before committing a build change. CI runs it before
+building the ladder zip.
+
+Run from the root of the repo: `python scripts/validate_builds.py`
+"""
+import sys
+from pathlib import Path
+
+sys.path.append("ares-sc2/src/ares")
+sys.path.append("ares-sc2/src")
+sys.path.append("ares-sc2")
+sys.path.append(".")
+
+from bot.config.build_validation import InvalidBuildError, validate_file
+
+
+def main() -> int:
+    failed = False
+    for file_path in sorted(Path(".").glob("*_builds.yml")):
+        try:
+            validate_file(str(file_path))
+        except InvalidBuildError as error:
+            print(error)
+            failed = True
+            continue
+        print(f"{file_path}: ok")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())